@@ -4,6 +4,8 @@ Entry point for the graph analyzer.
 Facilitates running the program from the project root.
 """
 
+import argparse
+import cProfile
 import sys
 from pathlib import Path
 
@@ -11,39 +13,102 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from src.main import *
+from src.profiling import Profiler
 from src.visualizer import visualize_graphs
 
+EXAMPLES = """\
+Examples:
+  python run.py resources/ejemplo/ejemplo_electrico.txt resources/ejemplo/ejemplo_vial.txt resources/ejemplo/ejemplo_hidrico.txt resources/ejemplo/ejemplo_consultas.txt resources/ejemplo/ejemplo_respuestas.txt
+  python run.py resources/ejemplo-48/grafo_electrico_48.txt resources/ejemplo-48/grafo_vial_48.txt resources/ejemplo-48/grafo_hidrico_48.txt resources/ejemplo-48/consultas.txt resources/ejemplo-48/respuestas.txt
+"""
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        usage="python run.py <electric_file> <road_file> <water_file> <queries_file> <output_file> [options]",
+        epilog=EXAMPLES,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("electric_file")
+    parser.add_argument("road_file")
+    parser.add_argument("water_file")
+    parser.add_argument("queries_file")
+    parser.add_argument("output_file")
+    parser.add_argument("--no-draw", action="store_true",
+                        help="Do not generate graph visualizations")
+    parser.add_argument("--snapshot", action="store_true",
+                        help="Load graphs from binary snapshots next to the text files (written on first run)")
+    parser.add_argument("--precompute", action="store_true",
+                        help="Precompute all-pairs road distances before answering queries")
+    parser.add_argument("--workers", type=int, default=1, metavar="N",
+                        help="Answer independent queries on N worker processes (default: 1, serial)")
+    parser.add_argument("--search", choices=["dijkstra", "bidireccional", "a_estrella", "ch"], default="dijkstra",
+                        help="Default CAMINO_MINIMO search strategy (default: dijkstra); "
+                             "ch uses a contraction hierarchy kept next to the road file")
+    parser.add_argument("--coords", metavar="FILE",
+                        help="Barrio coordinates (BARRIO X Y per line) for the a_estrella heuristic")
+    parser.add_argument("--backend", choices=["auto", "python", "numpy"], default="auto",
+                        help="Algorithm backend: numpy (NumPy/SciPy), python, or auto (numpy when installed)")
+    parser.add_argument("--format", choices=["text", "jsonl", "msgpack"], default="text",
+                        help="Output format: the text report (default), JSON Lines, or MessagePack "
+                             "records, one per query")
+    parser.add_argument("--profile", action="store_true",
+                        help="Print per-command timings and algorithm counters (runs queries serially)")
+    parser.add_argument("--pstats", metavar="FILE",
+                        help="Dump a cProfile of the query processing to FILE (implies --profile)")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    # Validate required arguments
-    if len(sys.argv) not in [6, 7]:
-        print("Usage: python run.py <electric_file> <road_file> <water_file> <queries_file> <output_file> [--no-draw]")
-        print("\nExamples:")
-        print("  python run.py resources/ejemplo/ejemplo_electrico.txt resources/ejemplo/ejemplo_vial.txt resources/ejemplo/ejemplo_hidrico.txt resources/ejemplo/ejemplo_consultas.txt resources/ejemplo/ejemplo_respuestas.txt")
-        print("  python run.py resources/ejemplo-48/grafo_electrico_48.txt resources/ejemplo-48/grafo_vial_48.txt resources/ejemplo-48/grafo_hidrico_48.txt resources/ejemplo-48/consultas.txt resources/ejemplo-48/respuestas.txt")
-        print("\nOptions:")
-        print("  --no-draw    Do not generate graph visualizations")
-        sys.exit(1)
-
-    electric_file = sys.argv[1]
-    road_file = sys.argv[2]
-    water_file = sys.argv[3]
-    queries_file = sys.argv[4]
-    output_file = sys.argv[5]
-
-    # Check if drawing should be disabled
-    no_draw = len(sys.argv) == 7 and sys.argv[6] == "--no-draw"
+    args = parse_args()
 
     # Load graphs
-    electric_graph = load_graph(electric_file)
-    road_graph = load_weighted_graph(road_file)
-    water_graph = load_graph(water_file)
+    load_stats = {"electric": {}, "road": {}, "water": {}}
+    electric_graph = load_graph(args.electric_file, stats=load_stats["electric"], snapshot=args.snapshot)
+    road_graph = load_weighted_graph(args.road_file, stats=load_stats["road"], snapshot=args.snapshot)
+    water_graph = load_graph(args.water_file, stats=load_stats["water"], snapshot=args.snapshot)
+
+    for name, stats in load_stats.items():
+        print(f"  → Loaded {name} graph from {stats['source']}: {stats['vertices']} vertices, "
+              f"{stats['edges']} edges in {stats['seconds']:.3f}s ({stats['edges_per_s']:,.0f} edges/s)")
+
+    profiler = Profiler() if args.profile or args.pstats else None
+    if profiler is not None:
+        for name, stats in load_stats.items():
+            profiler.tiempo("carga", f"{name} ({Path(stats['path']).name})", stats["seconds"])
+
+    # Contraction hierarchy of the road graph, read from disk or built once
+    hierarchy = None
+    if args.search == "ch":
+        ch_stats = {}
+        hierarchy = load_hierarchy(args.road_file, road_graph, stats=ch_stats)
+        print(f"  → Contraction hierarchy {'loaded' if ch_stats['source'] == 'file' else 'built'}: "
+              f"{ch_stats['edges']} upward edges in {ch_stats['seconds']:.3f}s")
+        if profiler is not None:
+            profiler.tiempo("carga", f"hierarchy ({ch_stats['source']})", ch_stats["seconds"])
 
     # Visualize graphs (if not disabled)
-    if not no_draw:
-        output_dir = str(Path(output_file).parent)
+    if not args.no_draw:
+        output_dir = str(Path(args.output_file).parent)
         visualize_graphs(electric_graph, road_graph, water_graph, output_dir)
 
-    # Process queries
-    process_queries(queries_file, output_file, electric_graph, road_graph, water_graph)
+    # Process queries, under cProfile if asked
+    cprofile = cProfile.Profile() if args.pstats else None
+    if cprofile is not None:
+        cprofile.enable()
+    process_queries(args.queries_file, args.output_file, electric_graph, road_graph, water_graph,
+                    precompute=args.precompute, workers=args.workers,
+                    busqueda=args.search.upper(),
+                    coordenadas=load_coordinates(args.coords) if args.coords else None,
+                    jerarquia=hierarchy, backend=args.backend, formato=args.format,
+                    perfil=profiler)
+    if cprofile is not None:
+        cprofile.disable()
+        cprofile.dump_stats(args.pstats)
+
+    if profiler is not None:
+        print(profiler.reporte())
+        if cprofile is not None:
+            print(f"  → cProfile stats saved to: {args.pstats} (python -m pstats {args.pstats})")
 
-    print(f"✓ Analysis completed. Results saved to: {output_file}")
+    print(f"✓ Analysis completed. Results saved to: {args.output_file}")
@@ -1,4 +1,6 @@
-from collections import deque
+from collections import Counter, deque
+from heapq import heappop, heappush
+from math import hypot
 
 
 def componentes_conexos(g: dict):
@@ -35,13 +37,17 @@ def orden_fallos(g: dict):
     return grados
 
 
-def dijkstra(gw: dict, origen: str, destino: str, bloqueados: set | None = None):
+def dijkstra(gw: dict, origen: str, destino: str, bloqueados: set | None = None, stats=None):
     """
-    Dijkstra
+    Dijkstra con heap binario (borrado perezoso), O((V + E) log V).
     gw: diccionario de adyacencia ponderado no dirigido: {u: [(v, peso), ...]}
     origen, destino: nodos
     bloqueados: conjunto de nodos a ignorar
+    stats: dict opcional donde se anotan los nodos asentados y las aristas relajadas
     Retorna: (distancia, camino)
+
+    Termina apenas se fija el destino. Los empates de distancia se resuelven
+    por el orden de los nodos en gw, igual que el barrido lineal original.
     """
 
     if bloqueados is None:
@@ -55,23 +61,36 @@ def dijkstra(gw: dict, origen: str, destino: str, bloqueados: set | None = None)
     ):
         return float("inf"), []
 
-    dist = {n: float("inf") for n in gw.keys()}
+    dist, prev = _dijkstra_heap(gw, origen, bloqueados, destino, stats)
+
+    if destino not in dist:
+        return float("inf"), []
+
+    return float(dist[destino]), reconstruir_camino(prev, origen, destino)
+
+
+def _dijkstra_heap(gw: dict, origen: str, bloqueados, destino=None, stats=None):
+    """
+    Motor de Dijkstra sobre un heap binario.
+
+    No usa decrease-key: cada mejora empuja una entrada nueva y las
+    entradas viejas se descartan al salir del heap. Las entradas son
+    (distancia, posición del nodo en gw, nodo) para desempatar igual que
+    el barrido lineal. Si destino es None expande todo lo alcanzable.
+    Retorna: (dist, prev) con las distancias y predecesores alcanzados.
+    """
+    orden = dict(zip(gw, range(len(gw))))
+    inf = float("inf")
+
+    dist = {origen: 0.0}
     prev = {}
     visitados = set()
-    dist[origen] = 0.0
-
-    while True:
-        u = None
-        mejor = float("inf")
-        for n in dist.keys():
-            if n in visitados or n in bloqueados:
-                continue
-            if dist[n] < mejor:
-                mejor = dist[n]
-                u = n
+    heap = [(0.0, orden[origen], origen)]
 
-        if u is None:
-            break
+    while heap:
+        d, _, u = heappop(heap)
+        if u in visitados:
+            continue
         if u == destino:
             break
 
@@ -80,14 +99,49 @@ def dijkstra(gw: dict, origen: str, destino: str, bloqueados: set | None = None)
         for v, w in gw[u]:
             if v in visitados or v in bloqueados:
                 continue
-            nd = dist[u] + float(w)
-            if nd < dist[v]:
+            nd = d + float(w)
+            if nd < dist.get(v, inf):
                 dist[v] = nd
                 prev[v] = u
+                heappush(heap, (nd, orden[v], v))
+
+    if stats is not None:
+        # Las aristas se cuentan al final para no pagar nada sin stats
+        stats["asentados"] = len(visitados)
+        stats["relajadas"] = sum(len(gw[u]) for u in visitados)
+    return dist, prev
+
 
-    if dist[destino] == float("inf"):
+def arbol_caminos_minimos(gw: dict, origen: str, bloqueados: set | None = None, stats=None):
+    """
+    Árbol de caminos mínimos desde origen (Dijkstra completo, sin corte).
+    stats: dict opcional, como en dijkstra
+    Retorna: (dist, prev) para todos los nodos alcanzables sin pasar por bloqueados.
+    """
+    if bloqueados is None:
+        bloqueados = set()
+
+    if origen not in gw or origen in bloqueados:
+        if stats is not None:
+            stats.update(asentados=0, relajadas=0)
+        return {}, {}
+
+    return _dijkstra_heap(gw, origen, bloqueados, stats=stats)
+
+
+def camino_en_arbol(dist: dict, prev: dict, origen: str, destino: str):
+    """
+    Camino origen -> destino dentro de un árbol de caminos mínimos ya expandido.
+    Retorna: (distancia, camino), igual que dijkstra.
+    """
+    if destino not in dist:
         return float("inf"), []
 
+    return float(dist[destino]), reconstruir_camino(prev, origen, destino)
+
+
+def reconstruir_camino(prev: dict, origen: str, destino: str):
+    """Reconstruye el camino origen -> destino siguiendo los predecesores."""
     camino = []
     cur = destino
 
@@ -97,51 +151,346 @@ def dijkstra(gw: dict, origen: str, destino: str, bloqueados: set | None = None)
 
     camino.append(origen)
     camino.reverse()
-    return float(dist[destino]), camino
+    return camino
+
+
+def dijkstra_bidireccional(gw: dict, origen: str, destino: str, bloqueados: set | None = None,
+                           stats=None):
+    """
+    Dijkstra bidireccional: una búsqueda desde origen y otra desde destino
+    (la red es no dirigida), expandiendo siempre el lado con el heap más
+    bajo. Termina cuando la suma de los dos topes de heap alcanza el mejor
+    camino encontrado, así que asienta del orden de dos "bolas" de radio
+    d/2 en lugar de una de radio d.
+    Retorna: (distancia, camino), igual que dijkstra. La distancia es la
+    misma; entre caminos empatados puede elegir otro.
+    """
+    if bloqueados is None:
+        bloqueados = set()
+
+    if (
+        origen not in gw
+        or destino not in gw
+        or origen in bloqueados
+        or destino in bloqueados
+    ):
+        return float("inf"), []
+
+    if origen == destino:
+        if stats is not None:
+            stats["asentados"] = 0
+        return 0.0, [origen]
+
+    inf = float("inf")
+
+    # Índice 0: búsqueda hacia adelante (desde origen); 1: hacia atrás (desde destino)
+    dist = ({origen: 0.0}, {destino: 0.0})
+    prev = ({}, {})
+    visitados = (set(), set())
+    heaps = ([(0.0, 0, origen)], [(0.0, 0, destino)])
+    contador = 1
+
+    mejor = inf
+    encuentro = None
+
+    while heaps[0] and heaps[1]:
+        if heaps[0][0][0] + heaps[1][0][0] >= mejor:
+            break
+
+        lado = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+        d, _, u = heappop(heaps[lado])
+        if u in visitados[lado]:
+            continue
+        visitados[lado].add(u)
+
+        dist_lado, dist_otro = dist[lado], dist[1 - lado]
+        prev_lado, heap = prev[lado], heaps[lado]
+        vistos = visitados[lado]
+
+        for v, w in gw[u]:
+            if v in vistos or v in bloqueados:
+                continue
+            nd = d + float(w)
+            if nd < dist_lado.get(v, inf):
+                dist_lado[v] = nd
+                prev_lado[v] = u
+                contador += 1
+                heappush(heap, (nd, contador, v))
+
+                if v in dist_otro and nd + dist_otro[v] < mejor:
+                    mejor = nd + dist_otro[v]
+                    encuentro = v
+
+    if stats is not None:
+        stats["asentados"] = len(visitados[0]) + len(visitados[1])
+        stats["relajadas"] = sum(len(gw[u]) for lado in visitados for u in lado)
+
+    if encuentro is None:
+        return inf, []
+
+    camino = reconstruir_camino(prev[0], origen, encuentro)
+    cur = encuentro
+    while cur != destino:
+        cur = prev[1][cur]
+        camino.append(cur)
+
+    return float(mejor), camino
+
+
+def escala_heuristica(gw: dict, coordenadas: dict):
+    """
+    Minutos por unidad de distancia euclídea que A* puede usar sin
+    sobreestimar: el mínimo de peso / largo sobre todas las aristas. Con
+    esa escala la heurística es consistente (por desigualdad triangular).
+    Retorna 0.0 (A* se comporta como Dijkstra) si algún barrio no tiene
+    coordenadas, porque entonces no hay cota válida.
+    """
+    escala = inf = float("inf")
+
+    for u, vecinos in gw.items():
+        if u not in coordenadas:
+            return 0.0
+        ux, uy = coordenadas[u]
+        for v, w in vecinos:
+            if v not in coordenadas:
+                return 0.0
+            vx, vy = coordenadas[v]
+            largo = hypot(ux - vx, uy - vy)
+            if largo > 0 and w / largo < escala:
+                escala = w / largo
+
+    return 0.0 if escala == inf else float(escala)
+
+
+def a_estrella(gw: dict, origen: str, destino: str, coordenadas: dict | None = None,
+               escala: float | None = None, bloqueados: set | None = None, stats=None):
+    """
+    A* con la distancia euclídea al destino como heurística.
+    coordenadas: {barrio: (x, y)}; sin coordenadas la búsqueda es un Dijkstra
+    escala: ver escala_heuristica (se calcula si no se pasa, O(E))
+    Retorna: (distancia, camino), igual que dijkstra. La distancia es la
+    misma; entre caminos empatados puede elegir otro.
+    """
+    if bloqueados is None:
+        bloqueados = set()
+
+    if (
+        origen not in gw
+        or destino not in gw
+        or origen in bloqueados
+        or destino in bloqueados
+    ):
+        return float("inf"), []
+
+    if coordenadas and escala is None:
+        escala = escala_heuristica(gw, coordenadas)
+
+    if coordenadas and escala and destino in coordenadas:
+        tx, ty = coordenadas[destino]
+
+        def h(v):
+            x, y = coordenadas[v]
+            return escala * hypot(x - tx, y - ty)
+    else:
+        def h(v):
+            return 0.0
+
+    inf = float("inf")
+    dist = {origen: 0.0}
+    prev = {}
+    asentados = 0
+    heap = [(h(origen), 0, 0.0, origen)]
+    contador = 0
+    encontrado = False
+
+    while heap:
+        _, _, d, u = heappop(heap)
+        if d > dist[u]:
+            continue  # entrada vieja
+        if u == destino:
+            encontrado = True
+            break
+
+        asentados += 1
+
+        for v, w in gw[u]:
+            if v in bloqueados:
+                continue
+            nd = d + float(w)
+            if nd < dist.get(v, inf):
+                dist[v] = nd
+                prev[v] = u
+                contador += 1
+                heappush(heap, (nd + h(v), contador, nd, v))
+
+    if stats is not None:
+        stats["asentados"] = asentados
+
+    if not encontrado:
+        return inf, []
+
+    return float(dist[destino]), reconstruir_camino(prev, origen, destino)
+
+
+def vecinos_ordenados(g: dict):
+    """
+    Vecinos de cada barrio de la red vial en orden alfabético, sin pesos.
+    Retorna: {barrio: [vecinos]}
+    """
+    return {u: sorted(v for v, _ in vecinos) for u, vecinos in g.items()}
+
+
+def ruta_recoleccion(g: dict, vecinos: dict | None = None):
+    """
+    Recorrido DFS de la red vial desde el primer barrio en orden alfabético,
+    visitando los vecinos también en orden alfabético.
+    Retorna: lista de barrios en orden de visita
+
+    DFS iterativa con pila de iteradores (sin límite de recursión), en el
+    mismo orden que la versión recursiva. vecinos es el resultado de
+    vecinos_ordenados(g), para no ordenar de nuevo en cada recorrido.
+    """
+    if vecinos is None:
+        vecinos = vecinos_ordenados(g)
+
+    start = min(g)
+    visit = {start}
+    camino = [start]
+    pila = [iter(vecinos[start])]
+
+    while pila:
+        for v in pila[-1]:
+            if v not in visit:
+                visit.add(v)
+                camino.append(v)
+                pila.append(iter(vecinos[v]))
+                break
+        else:
+            pila.pop()
+
+    return camino
+
+
+def distancia_bfs(grafo, origen, stats=None):
+    """
+    Return BFS distances in an unweighted graph.
+
+    If a stats dict is given, the size of every BFS level is appended to
+    its "fronteras" list.
+    """
+    dist = {n: float("inf") for n in grafo}
+    dist[origen] = 0
+    q = deque([origen])
+
+    while q:
+        u = q.popleft()
+        for v in grafo[u]:
+            if dist[v] == float("inf"):
+                dist[v] = dist[u] + 1
+                q.append(v)
+
+    if stats is not None:
+        _anotar_fronteras(stats, dist.values())
+    return dist
+
+
+def _anotar_fronteras(stats, distancias):
+    """Agrega a stats["fronteras"] el tamaño de cada nivel de un BFS, según sus distancias en saltos."""
+    niveles = Counter(d for d in distancias if d != float("inf"))
+    stats.setdefault("fronteras", []).extend(niveles[d] for d in sorted(niveles))
+
+
+def plantas_asignadas(g: dict, plantas):
+    """
+    BFS multi-origen desde las plantas de agua.
+    Cada barrio queda asignado a la planta más cercana (en saltos); los
+    empates se resuelven por el nombre de planta menor.
+    Retorna: {barrio: planta}
+    """
+    dist = {n: float("inf") for n in g}
+    asign = {}
+    q = deque()
+
+    for p in plantas:
+        dist[p] = 0
+        asign[p] = p
+        q.append(p)
+
+    while q:
+        u = q.popleft()
+        for v in g[u]:
+            if dist[v] > dist[u] + 1:
+                dist[v] = dist[u] + 1
+                asign[v] = asign[u]
+                q.append(v)
+            elif dist[v] == dist[u] + 1:
+                asign[v] = min(asign[v], asign[u])
+
+    return asign
 
 
 def tarjan(g: dict):
     """
     Detecta puentes y puntos de articulación en un grafo no dirigido.
     Retorna: (lista_puentes, lista_articulaciones)
+
+    DFS iterativa con pila explícita (sin límite de recursión). Recorre los
+    vecinos en el mismo orden que la versión recursiva, así que cada puente
+    sale orientado (padre, hijo) igual que antes. Sólo se ignora una vez la
+    arista hacia el padre: si hay aristas paralelas, la otra copia cuenta
+    como arista de retorno y ese par deja de ser puente.
     """
 
     tiempo = 0
-    visitado = set()
-    disc = {}   
-    bajo = {}  
-    padre = {} 
+    disc = {}
+    bajo = {}
     puentes = []
     articulaciones = set()
 
-    def dfs(u):
-        nonlocal tiempo
-        visitado.add(u)
-        tiempo += 1
-        disc[u] = bajo[u] = tiempo
-        hijos = 0 
+    for raiz in g.keys():
+        if raiz in disc:
+            continue
 
-        for v in g[u]:
-            if v not in visitado:
-                padre[v] = u
-                hijos += 1
-                dfs(v)
-                bajo[u] = min(bajo[u], bajo[v])
-                if bajo[v] > disc[u]:
-                    puentes.append((u, v))
-
-                if padre.get(u) is not None and bajo[v] >= disc[u]:
-                    articulaciones.add(u)
-
-            elif v != padre.get(u):
-                bajo[u] = min(bajo[u], disc[v])
-
-        if padre.get(u) is None and hijos > 1:
-            articulaciones.add(u)
-
-    for nodo in g.keys():
-        if nodo not in visitado:
-            dfs(nodo)
+        tiempo += 1
+        disc[raiz] = bajo[raiz] = tiempo
+        hijos_raiz = 0
+
+        # Cada marco: [nodo, padre, iterador de vecinos, arista al padre ya ignorada]
+        pila = [[raiz, None, iter(g[raiz]), False]]
+
+        while pila:
+            marco = pila[-1]
+            u, p = marco[0], marco[1]
+
+            for v in marco[2]:
+                if v not in disc:
+                    tiempo += 1
+                    disc[v] = bajo[v] = tiempo
+                    pila.append([v, u, iter(g[v]), False])
+                    break
+
+                if v == p and not marco[3]:
+                    marco[3] = True
+                elif disc[v] < bajo[u]:
+                    bajo[u] = disc[v]
+            else:
+                # Todos los vecinos de u procesados: propagar al padre
+                pila.pop()
+                if p is None:
+                    continue
+
+                if bajo[u] < bajo[p]:
+                    bajo[p] = bajo[u]
+                if bajo[u] > disc[p]:
+                    puentes.append((p, u))
+
+                if p == raiz:
+                    hijos_raiz += 1
+                elif bajo[u] >= disc[p]:
+                    articulaciones.add(p)
+
+        if hijos_raiz > 1:
+            articulaciones.add(raiz)
 
     puentes = sorted(puentes)
     articulaciones = sorted(list(articulaciones))
@@ -0,0 +1,224 @@
+"""
+All-pairs shortest paths over the weighted road graph.
+
+The distances and predecessors of every origin are stored in flat numeric
+arrays indexed by vertex id, so after the precomputation any CAMINO_MINIMO
+is an O(1) lookup plus walking the predecessor row.
+"""
+
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from src.algos import arbol_caminos_minimos
+
+# Floyd-Warshall is only worth it for small, dense graphs
+FLOYD_MAX_VERTICES = 256
+FLOYD_MIN_DENSITY = 0.25
+
+# Below this many vertices a process pool costs more than it saves
+POOL_MIN_VERTICES = 2000
+
+INF = float("inf")
+
+
+class DistanceMatrix:
+    """
+    All-pairs distances and predecessors of a weighted adjacency dict.
+
+    Row i of dist/pred (positions i*n .. i*n + n - 1) holds the shortest-path
+    tree from vertex i: dist[i*n + j] is the distance to j and pred[i*n + j]
+    the id of j's predecessor on that path (-1 for i itself or unreachable j).
+    Predecessors follow the same tie-breaking as algos.dijkstra.
+    """
+
+    def __init__(self, names, dist, pred, method):
+        self.names = names
+        self.index = {name: i for i, name in enumerate(names)}
+        self.dist = dist
+        self.pred = pred
+        self.method = method
+
+    def distancia(self, origen, destino):
+        i, j = self.index.get(origen), self.index.get(destino)
+        if i is None or j is None:
+            return INF
+        return self.dist[i * len(self.names) + j]
+
+    def camino(self, origen, destino):
+        """
+        Same contract as algos.dijkstra: returns (distancia, camino).
+        """
+        i, j = self.index.get(origen), self.index.get(destino)
+        if i is None or j is None:
+            return INF, []
+
+        n = len(self.names)
+        d = self.dist[i * n + j]
+        if d == INF:
+            return INF, []
+
+        camino = []
+        row = i * n
+        while j != i:
+            camino.append(self.names[j])
+            j = self.pred[row + j]
+        camino.append(origen)
+        camino.reverse()
+        return float(d), camino
+
+    def as_dict(self) -> dict:
+        """Returns {origen: {destino: distancia}}, as format_matriz_distancias expects."""
+        n = len(self.names)
+        return {
+            origen: dict(zip(self.names, self.dist[i * n:(i + 1) * n]))
+            for i, origen in enumerate(self.names)
+        }
+
+
+def all_pairs(gw: dict, method="auto", workers=None) -> DistanceMatrix:
+    """
+    Computes all-pairs shortest paths of a weighted adjacency dict.
+
+    Args:
+        gw: Weighted adjacency dict {u: [(v, peso), ...]}
+        method: "dijkstra", "floyd" or "auto" (Floyd-Warshall for small
+            dense graphs with integer weights, repeated Dijkstra otherwise)
+        workers: Processes for the repeated Dijkstra. None picks the CPU
+            count for large graphs and runs serially for small ones.
+
+    Returns:
+        DistanceMatrix
+    """
+    if method == "auto":
+        method = "floyd" if _prefer_floyd(gw) else "dijkstra"
+
+    if method == "floyd":
+        names, dist, pred = _floyd_warshall(gw)
+    elif method == "dijkstra":
+        names, dist, pred = _repeated_dijkstra(gw, workers)
+    else:
+        raise ValueError(f"Unknown all-pairs method: {method}")
+
+    return DistanceMatrix(names, dist, pred, method)
+
+
+def _prefer_floyd(gw):
+    n = len(gw)
+    if n < 2 or n > FLOYD_MAX_VERTICES:
+        return False
+
+    # Predecessors are derived from exact distance equalities, which only
+    # hold when sums are exact in floating point, and the Dijkstra settle
+    # order is only implied by distances when every weight is positive
+    if any(w <= 0 or float(w) != int(w) for adj in gw.values() for _, w in adj):
+        return False
+
+    edges = sum(len(adj) for adj in gw.values())
+    return edges / (n * (n - 1)) >= FLOYD_MIN_DENSITY
+
+
+# ===============================================================
+# REPEATED DIJKSTRA
+# ===============================================================
+
+_worker_graph = None
+_worker_index = None
+
+
+def _init_worker(gw):
+    global _worker_graph, _worker_index
+    _worker_graph = gw
+    _worker_index = {name: i for i, name in enumerate(gw)} if gw is not None else None
+
+
+def _dijkstra_row(origen):
+    """Dijkstra from origen over the graph sent to this worker, as flat rows."""
+    index = _worker_index
+    dist_map, prev_map = arbol_caminos_minimos(_worker_graph, origen)
+
+    dist = array("d", [INF]) * len(index)
+    pred = array("q", [-1]) * len(index)
+    for v, d in dist_map.items():
+        dist[index[v]] = d
+    for v, u in prev_map.items():
+        pred[index[v]] = index[u]
+    return dist, pred
+
+
+def _repeated_dijkstra(gw, workers):
+    names = list(gw)
+    n = len(names)
+
+    if workers is None:
+        workers = (os.cpu_count() or 1) if n >= POOL_MIN_VERTICES else 1
+
+    if workers > 1:
+        # The graph is shipped once per worker, not once per origin
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(gw,)) as pool:
+            rows = list(pool.map(_dijkstra_row, names, chunksize=max(1, n // (workers * 4))))
+    else:
+        _init_worker(gw)
+        rows = [_dijkstra_row(origen) for origen in names]
+        _init_worker(None)
+
+    dist = array("d")
+    pred = array("q")
+    for d, p in rows:
+        dist.extend(d)
+        pred.extend(p)
+    return names, dist, pred
+
+
+# ===============================================================
+# FLOYD-WARSHALL
+# ===============================================================
+
+def _floyd_warshall(gw):
+    names = list(gw)
+    n = len(names)
+    index = {name: i for i, name in enumerate(names)}
+
+    rows = []
+    for i, u in enumerate(names):
+        row = array("d", [INF]) * n
+        row[i] = 0.0
+        for v, w in gw[u]:
+            j = index[v]
+            if j != i and float(w) < row[j]:
+                row[j] = float(w)
+        rows.append(row)
+
+    for k in range(n):
+        row_k = rows[k]
+        for i in range(n):
+            d_ik = rows[i][k]
+            if d_ik == INF or i == k:
+                continue
+            rows[i] = array("d", [
+                a if a <= d_ik + b else d_ik + b for a, b in zip(rows[i], row_k)
+            ])
+
+    # Predecessor of v from s: the neighbor u on a shortest path that
+    # Dijkstra settles first, i.e. the smallest (dist[s][u], id(u))
+    dist = array("d")
+    pred = array("q", [-1]) * (n * n)
+    for s in range(n):
+        row = rows[s]
+        base = s * n
+        for v, name in enumerate(names):
+            d_v = row[v]
+            if v == s or d_v == INF:
+                continue
+            best = None
+            for u_name, w in gw[name]:
+                u = index[u_name]
+                d_u = row[u]
+                if u == v or d_u + float(w) != d_v:
+                    continue
+                if best is None or (d_u, u) < (row[best], best):
+                    best = u
+            pred[base + v] = best
+        dist.extend(row)
+
+    return names, dist, pred
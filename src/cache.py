@@ -0,0 +1,100 @@
+"""
+Shortest-path tree cache for repeated CAMINO_MINIMO queries.
+
+Expanding the full shortest-path tree from an origin costs about the same
+as one point-to-point Dijkstra, and afterwards every destination from that
+origin is answered by walking the predecessor map.
+"""
+
+from collections import OrderedDict
+
+from src.algos import arbol_caminos_minimos, camino_en_arbol
+
+
+class ShortestPathTreeCache:
+    """
+    LRU cache of shortest-path trees keyed by (graph version, origin, blocked set).
+
+    Args:
+        max_trees: Maximum number of cached trees
+        max_nodes: Memory cap, as the total number of nodes stored across
+            all cached trees. The most recent tree is always kept.
+    """
+
+    def __init__(self, max_trees=128, max_nodes=2_000_000):
+        self.max_trees = max_trees
+        self.max_nodes = max_nodes
+        self.trees = OrderedDict()  # key -> (dist, prev)
+        self.nodes = 0
+
+        # Counters exposed for tuning
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def tree(self, gw, origen, bloqueados=None, version=0, expand=arbol_caminos_minimos, stats=None):
+        """
+        Returns the (dist, prev) shortest-path tree from origen, expanding it on a miss
+        with expand(gw, origen, bloqueados). A stats dict, if given, is passed
+        to expand and stays empty on a hit.
+        """
+        key = (version, origen, frozenset(bloqueados) if bloqueados else frozenset())
+
+        entry = self.trees.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.trees.move_to_end(key)
+            return entry
+
+        self.misses += 1
+        entry = expand(gw, origen, bloqueados) if stats is None else expand(gw, origen, bloqueados,
+                                                                            stats=stats)
+        self.trees[key] = entry
+        self.nodes += len(entry[0])
+        self._evict()
+        return entry
+
+    def camino(self, gw, origen, destino, bloqueados=None, version=0):
+        """
+        Same contract as algos.dijkstra: returns (distancia, camino).
+        """
+        if (
+            origen not in gw
+            or destino not in gw
+            or (bloqueados and (origen in bloqueados or destino in bloqueados))
+        ):
+            return float("inf"), []
+
+        dist, prev = self.tree(gw, origen, bloqueados, version)
+        return camino_en_arbol(dist, prev, origen, destino)
+
+    def invalidate(self, version=None):
+        """
+        Drops every cached tree, or only those built for the given graph version.
+        """
+        if version is None:
+            self.trees.clear()
+            self.nodes = 0
+            return
+
+        for key in [k for k in self.trees if k[0] == version]:
+            self.nodes -= len(self.trees.pop(key)[0])
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "evictions": self.evictions,
+            "trees": len(self.trees),
+            "nodes": self.nodes,
+        }
+
+    def _evict(self):
+        while len(self.trees) > 1 and (
+            len(self.trees) > self.max_trees or self.nodes > self.max_nodes
+        ):
+            _, (dist, _) = self.trees.popitem(last=False)
+            self.nodes -= len(dist)
+            self.evictions += 1
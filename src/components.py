@@ -0,0 +1,176 @@
+"""
+Connected-component index over a disjoint-set forest.
+
+The index is built once from an adjacency dict and then kept up to date
+as edges come and go, so COMPONENTES_CONEXOS and connectivity questions
+never traverse the graph. Adding an edge is a union; removing one can
+split a component, which disjoint sets cannot express, so only the
+affected component is re-labelled with a BFS.
+"""
+
+from collections import deque
+
+
+class ComponentIndex:
+    """
+    Union-find (union by rank, path compression) over the vertices of a graph.
+
+    Args:
+        weighted: True if adjacency lists hold (neighbor, weight) tuples
+    """
+
+    def __init__(self, weighted=False):
+        self.weighted = weighted
+        self.parent = {}
+        self.rank = {}
+        self._components = None  # cached components(), dropped on every change
+
+    @classmethod
+    def from_graph(cls, g: dict, weighted=False):
+        """Builds the index of an adjacency dict."""
+        index = cls(weighted=weighted)
+        for u in g:
+            index.add_vertex(u)
+        for u, neighbors in g.items():
+            for v in index._neighbors(neighbors):
+                index.add_edge(u, v)
+        return index
+
+    @classmethod
+    def from_labels(cls, names, labels, weighted=False):
+        """
+        Builds the index from precomputed component labels (one per name),
+        e.g. from the NumPy backend, without a union per edge.
+        """
+        index = cls(weighted=weighted)
+        raices = {}
+        tamanos = {}
+        for v, label in zip(names, labels):
+            root = raices.setdefault(label, v)
+            index.parent[v] = root
+            index.rank[v] = 0
+            tamanos[root] = tamanos.get(root, 0) + 1
+        for root, tamano in tamanos.items():
+            index.rank[root] = 1 if tamano > 1 else 0
+        return index
+
+    def _neighbors(self, neighbors):
+        return (v for v, _ in neighbors) if self.weighted else neighbors
+
+    def add_vertex(self, v) -> None:
+        if v not in self.parent:
+            self.parent[v] = v
+            self.rank[v] = 0
+            self._components = None
+
+    def discard(self, v) -> None:
+        """
+        Forgets an isolated vertex (one that is alone in its component).
+        """
+        if v in self.parent:
+            del self.parent[v]
+            del self.rank[v]
+            self._components = None
+
+    def find(self, v):
+        """Returns the representative of v's component."""
+        parent = self.parent
+        root = v
+        while parent[root] != root:
+            root = parent[root]
+
+        # Path compression
+        while parent[v] != root:
+            parent[v], v = root, parent[v]
+        return root
+
+    def add_edge(self, u, v) -> None:
+        """Merges the components of u and v (creating them if needed)."""
+        self.add_vertex(u)
+        self.add_vertex(v)
+
+        ru, rv = self.find(u), self.find(v)
+        if ru == rv:
+            return
+
+        if self.rank[ru] < self.rank[rv]:
+            ru, rv = rv, ru
+        self.parent[rv] = ru
+        if self.rank[ru] == self.rank[rv]:
+            self.rank[ru] += 1
+        self._components = None
+
+    def remove_edge(self, g: dict, u, v) -> None:
+        """
+        Updates the index after the edge u-v was removed from g.
+
+        If u and v are still connected nothing changes; otherwise the old
+        component is re-labelled as the two parts reachable from u and v.
+        """
+        alcanzados = self._bfs(g, u, stop=v)
+        if v in alcanzados:
+            return
+
+        self._relabel(alcanzados, u)
+        self._relabel(self._bfs(g, v), v)
+        self._components = None
+
+    def remove_vertex(self, g: dict, v, neighbors) -> None:
+        """
+        Updates the index after vertex v (with the given former neighbors)
+        was removed from g.
+        """
+        del self.parent[v]
+        del self.rank[v]
+
+        # Each former neighbor may now head its own component
+        vistos = set()
+        for u in self._neighbors(neighbors):
+            if u in vistos or u not in self.parent:
+                continue
+            alcanzados = self._bfs(g, u)
+            vistos |= alcanzados
+            self._relabel(alcanzados, u)
+        self._components = None
+
+    def _bfs(self, g, start, stop=None):
+        vistos = {start}
+        q = deque([start])
+        while q:
+            x = q.popleft()
+            for y in self._neighbors(g.get(x, ())):
+                if y not in vistos:
+                    if y == stop:
+                        vistos.add(y)
+                        return vistos
+                    vistos.add(y)
+                    q.append(y)
+        return vistos
+
+    def _relabel(self, vertices, root) -> None:
+        for x in vertices:
+            self.parent[x] = root
+            self.rank[x] = 0
+        self.rank[root] = 1 if len(vertices) > 1 else 0
+
+    def connected(self, u, v) -> bool:
+        """True if u and v belong to the same component."""
+        if u not in self.parent or v not in self.parent:
+            return False
+        return self.find(u) == self.find(v)
+
+    def components(self):
+        """
+        Returns the components as sorted lists, ordered by their smallest
+        vertex (the same result as algos.componentes_conexos).
+        """
+        if self._components is None:
+            grupos = {}
+            for v in self.parent:
+                grupos.setdefault(self.find(v), []).append(v)
+
+            comps = [sorted(grupo) for grupo in grupos.values()]
+            comps.sort(key=lambda comp: comp[0])
+            self._components = comps
+
+        return self._components
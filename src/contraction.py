@@ -0,0 +1,387 @@
+"""
+Contraction hierarchy over the weighted road graph.
+
+Preprocessing contracts the vertices one by one, from least to most
+important, adding a shortcut u-w (through v) whenever contracting v would
+break the only shortest u-w path. A query then runs a bidirectional
+Dijkstra that only climbs towards more important vertices, so it settles a
+few hundred vertices however large the city is. Shortcuts remember the
+vertex they skip and are unpacked back into the original road path.
+
+The hierarchy is persisted next to the road graph file (".gch"), with the
+same fingerprint of the source file as the binary snapshots, and rebuilt
+when that file changes.
+"""
+
+import mmap
+import os
+import struct
+import zlib
+from array import array
+from heapq import heapify, heappop, heappush
+
+from src.graphs.snapshot import source_fingerprint
+
+INF = float("inf")
+
+# Witness searches give up after settling this many vertices; a missed
+# witness only costs a redundant shortcut, never a wrong answer
+WITNESS_MAX_SETTLED = 60
+
+MAGIC = b"CGCH\x00\x00\x00\x01"
+FORMAT_VERSION = 1
+
+FLAG_FLOAT_WEIGHTS = 1
+
+# magic, version, flags, vertices, upward edges, names bytes,
+# source mtime_ns, source size, source sha256, payload crc32
+HEADER = struct.Struct("<8sHHQQQQQ32sI4x")
+
+SUFFIX = ".gch"
+
+
+class ContractionHierarchy:
+    """
+    Upward graph of a contraction hierarchy.
+
+    up[v] lists (u, weight, middle) for every edge or shortcut from v to a
+    vertex u contracted after v; middle is the id of the vertex a shortcut
+    skips, or -1 for an original road.
+
+    Args:
+        names: Vertex names, indexed by id
+        rank: Contraction position of every vertex
+        up: Upward adjacency lists, indexed by id
+    """
+
+    def __init__(self, names, rank, up):
+        self.names = names
+        self.index = {name: i for i, name in enumerate(names)}
+        self.rank = rank
+        self.up = up
+
+        # (lower id, upper id) -> vertex skipped by that shortcut
+        self.medio = {}
+        for v, edges in enumerate(up):
+            for u, _, m in edges:
+                if m >= 0:
+                    self.medio[(v, u)] = m
+
+    @classmethod
+    def build(cls, gw: dict):
+        """Contracts every vertex of a weighted adjacency dict."""
+        names = list(gw)
+        index = {name: i for i, name in enumerate(names)}
+        n = len(names)
+
+        # Remaining graph, with the lightest of any parallel edges
+        adj = [{} for _ in range(n)]
+        for u, neighbors in gw.items():
+            i = index[u]
+            for v, w in neighbors:
+                j = index[v]
+                if i != j and w < adj[i].get(j, INF):
+                    adj[i][j] = w
+
+        medio = {}  # (i, j) with i < j -> middle vertex of the current shortcut
+        borrados = [0] * n  # contracted neighbors, to spread contraction evenly
+        rank = [0] * n
+        up = [None] * n
+
+        heap = [(_prioridad(adj, v, borrados), v) for v in range(n)]
+        heapify(heap)
+
+        nivel = 0
+        while heap:
+            _, v = heappop(heap)
+
+            # Lazy update: re-check the priority against the next candidate
+            prioridad = _prioridad(adj, v, borrados)
+            if heap and prioridad > heap[0][0]:
+                heappush(heap, (prioridad, v))
+                continue
+
+            rank[v] = nivel
+            nivel += 1
+
+            vecinos = adj[v]
+            up[v] = [(u, w, medio.get((min(u, v), max(u, v)), -1)) for u, w in vecinos.items()]
+
+            for u, w, peso in _atajos(adj, v):
+                if peso < adj[u].get(w, INF):
+                    adj[u][w] = adj[w][u] = peso
+                    medio[(min(u, w), max(u, w))] = v
+
+            for u in vecinos:
+                del adj[u][v]
+                borrados[u] += 1
+            adj[v] = {}
+
+        return cls(names, rank, up)
+
+    def camino(self, origen, destino, stats=None):
+        """
+        Same contract as algos.dijkstra: returns (distancia, camino).
+
+        If a stats dict is given it gets the number of settled vertices.
+        """
+        s, t = self.index.get(origen), self.index.get(destino)
+        if s is None or t is None:
+            return INF, []
+        if s == t:
+            if stats is not None:
+                stats["asentados"] = 0
+            return 0.0, [origen]
+
+        up = self.up
+        dist = ({s: 0.0}, {t: 0.0})
+        prev = ({}, {})
+        heaps = ([(0.0, s)], [(0.0, t)])
+        hechos = (set(), set())
+        mejor, encuentro = INF, None
+
+        # Each side climbs until its heap top cannot improve the best meeting
+        while heaps[0] or heaps[1]:
+            lado = 0 if heaps[0] and (not heaps[1] or heaps[0][0][0] <= heaps[1][0][0]) else 1
+            heap = heaps[lado]
+            d, v = heappop(heap)
+            if d >= mejor:
+                heap.clear()
+                continue
+            if v in hechos[lado]:
+                continue
+            hechos[lado].add(v)
+
+            otro = dist[1 - lado].get(v)
+            if otro is not None and d + otro < mejor:
+                mejor, encuentro = d + otro, v
+
+            dist_lado, prev_lado = dist[lado], prev[lado]
+            for u, w, _ in up[v]:
+                nd = d + w
+                if nd < dist_lado.get(u, INF):
+                    dist_lado[u] = nd
+                    prev_lado[u] = v
+                    heappush(heap, (nd, u))
+
+        if stats is not None:
+            stats["asentados"] = len(hechos[0]) + len(hechos[1])
+
+        if encuentro is None:
+            return INF, []
+
+        # Ids along the upward paths s -> encuentro <- t
+        ids = [encuentro]
+        while ids[-1] != s:
+            ids.append(prev[0][ids[-1]])
+        ids.reverse()
+        while ids[-1] != t:
+            ids.append(prev[1][ids[-1]])
+
+        camino = [ids[0]]
+        for a, b in zip(ids, ids[1:]):
+            self._desempacar(a, b, camino)
+        return float(mejor), [self.names[i] for i in camino]
+
+    def _desempacar(self, a, b, camino):
+        """Appends the original vertices of edge a -> b (after a) to camino."""
+        pila = [(a, b)]
+        while pila:
+            a, b = pila.pop()
+            m = self.medio.get((a, b) if self.rank[a] < self.rank[b] else (b, a))
+            if m is None:
+                camino.append(b)
+            else:
+                pila.append((m, b))
+                pila.append((a, m))
+
+    def edges(self) -> int:
+        """Number of upward edges, original roads plus shortcuts."""
+        return sum(len(edges) for edges in self.up)
+
+
+def _prioridad(adj, v, borrados):
+    """Edge difference (shortcuts added - edges removed) plus contracted neighbors."""
+    return len(_atajos(adj, v)) - len(adj[v]) + borrados[v]
+
+
+def _atajos(adj, v):
+    """
+    Shortcuts needed to contract v: [(u, w, peso)] for every pair of
+    neighbors u-w whose only shortest path goes through v.
+    """
+    vecinos = list(adj[v].items())
+    atajos = []
+
+    for k, (u, wu) in enumerate(vecinos[:-1]):
+        destinos = vecinos[k + 1:]
+        limite = wu + max(ww for _, ww in destinos)
+        alcanzados = _testigos(adj, u, v, limite)
+        for w, ww in destinos:
+            if alcanzados.get(w, INF) > wu + ww:
+                atajos.append((u, w, wu + ww))
+
+    return atajos
+
+
+def _testigos(adj, origen, excluido, limite):
+    """Bounded Dijkstra from origen avoiding excluido; returns tentative distances."""
+    dist = {origen: 0}
+    heap = [(0, origen)]
+    asentados = 0
+
+    while heap:
+        d, u = heappop(heap)
+        if d > dist[u]:
+            continue
+        if d > limite or asentados >= WITNESS_MAX_SETTLED:
+            break
+        asentados += 1
+
+        for x, w in adj[u].items():
+            if x == excluido:
+                continue
+            nd = d + w
+            if nd < dist.get(x, INF):
+                dist[x] = nd
+                heappush(heap, (nd, x))
+
+    return dist
+
+
+# ===============================================================
+# PERSISTENCE
+# ===============================================================
+
+def hierarchy_path(source) -> str:
+    """Returns the hierarchy path kept next to a road graph text file."""
+    return str(source) + SUFFIX
+
+
+def _pad(n):
+    return -n % 8
+
+
+def write_hierarchy(ch: ContractionHierarchy, source, path=None) -> str:
+    """
+    Writes ch tied to the road graph text file it was built from.
+
+    Layout (little endian, 8-byte aligned): header, names separated by
+    "\\n", rank int64[V], offsets int64[V + 1], then targets, weights and
+    middles of the upward edges.
+
+    Returns:
+        The hierarchy path
+    """
+    path = path or hierarchy_path(source)
+
+    offsets = array("q", [0])
+    targets = array("q")
+    middles = array("q")
+    pesos = []
+    for edges in ch.up:
+        for u, w, m in edges:
+            targets.append(u)
+            pesos.append(w)
+            middles.append(m)
+        offsets.append(len(targets))
+
+    flags = 0
+    try:
+        weights = array("q", pesos)
+    except TypeError:
+        weights = array("d", pesos)
+        flags |= FLAG_FLOAT_WEIGHTS
+
+    names = "\n".join(ch.names).encode("utf-8")
+    sections = [
+        names + b"\0" * _pad(len(names)),
+        array("q", ch.rank).tobytes(),
+        offsets.tobytes(),
+        targets.tobytes(),
+        weights.tobytes(),
+        middles.tobytes(),
+    ]
+    crc = 0
+    for section in sections:
+        crc = zlib.crc32(section, crc)
+
+    mtime_ns, size, digest = source_fingerprint(source)
+    header = HEADER.pack(
+        MAGIC, FORMAT_VERSION, flags, len(ch.names), len(targets),
+        len(names), mtime_ns, size, digest, crc,
+    )
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as file:
+        file.write(header)
+        for section in sections:
+            file.write(section)
+    os.replace(tmp, path)
+    return path
+
+
+def read_hierarchy(source, path=None):
+    """
+    Opens the hierarchy of a road graph text file.
+
+    Returns:
+        A ContractionHierarchy, or None when the file is missing, stale
+        (the source changed since it was built) or corrupt.
+    """
+    path = path or hierarchy_path(source)
+    try:
+        file = open(path, "rb")
+    except FileNotFoundError:
+        return None
+
+    with file:
+        try:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            return None
+
+    with mapped:
+        if len(mapped) < HEADER.size:
+            return None
+
+        (magic, version, flags, vertices, entries, names_len,
+         mtime_ns, size, digest, crc) = HEADER.unpack_from(mapped)
+
+        if magic != MAGIC or version != FORMAT_VERSION:
+            return None
+
+        cur_mtime_ns, cur_size, _ = source_fingerprint(source, with_hash=False)
+        if cur_size != size:
+            return None
+        if cur_mtime_ns != mtime_ns and source_fingerprint(source)[2] != digest:
+            return None
+
+        names_start = HEADER.size
+        rank_start = names_start + names_len + _pad(names_len)
+        offsets_start = rank_start + 8 * vertices
+        targets_start = offsets_start + 8 * (vertices + 1)
+        weights_start = targets_start + 8 * entries
+        middles_start = weights_start + 8 * entries
+        end = middles_start + 8 * entries
+
+        if len(mapped) != end or zlib.crc32(mapped[names_start:]) != crc:
+            return None
+
+        def section(start, stop, typecode="q"):
+            values = array(typecode)
+            values.frombytes(mapped[start:stop])
+            return values
+
+        names = mapped[names_start:names_start + names_len].decode("utf-8")
+        rank = section(rank_start, offsets_start).tolist()
+        offsets = section(offsets_start, targets_start)
+        targets = section(targets_start, weights_start)
+        weights = section(weights_start, middles_start, "d" if flags & FLAG_FLOAT_WEIGHTS else "q")
+        middles = section(middles_start, end)
+
+    up = [
+        list(zip(targets[a:b], weights[a:b], middles[a:b]))
+        for a, b in zip(offsets, offsets[1:])
+    ]
+    return ContractionHierarchy(names.split("\n") if vertices else [], rank, up)
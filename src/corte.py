@@ -0,0 +1,64 @@
+"""
+What-if road closures for CAMINO_MINIMO_SIMULAR_CORTE.
+
+Closing barrios can only make paths longer, so whenever the shortest path
+of the open network avoids every closed barrio it is still the answer.
+Operators try hundreds of closures from the same origins, and most of them
+do not touch the path in question, so each simulation starts from the
+cached shortest-path tree of the open network and only expands a tree
+with the closure applied when the cached path runs into it.
+"""
+
+from src.algos import camino_en_arbol
+
+
+class SimulacionCorte:
+    """
+    Shortest paths from one origin with a set of blocked barrios.
+
+    Args:
+        origen: Origin barrio
+        bloqueados: Blocked barrios
+        arbol: (dist, prev) shortest-path tree of the open network from origen
+        arbol_bloqueado: Callable returning the (dist, prev) tree with the
+            closure applied; called at most once, only if needed
+        exacto: Whether a cached path that avoids the closure is exactly the
+            path a search with the closure would return. That holds with
+            positive weights, where ties are broken the same way in both
+            searches; with zero-weight roads every query is recomputed.
+    """
+
+    def __init__(self, origen, bloqueados, arbol, arbol_bloqueado, exacto=True):
+        self.origen = origen
+        self.bloqueados = frozenset(bloqueados)
+        self.arbol = arbol
+        self.exacto = exacto
+        self._arbol_bloqueado = arbol_bloqueado
+        self._bloqueado = None
+
+        # Counters exposed for tuning
+        self.reutilizados = 0
+        self.recalculados = 0
+
+    def toca(self, camino) -> bool:
+        """True if the path goes through a blocked barrio (one set lookup per barrio)."""
+        return not self.bloqueados.isdisjoint(camino)
+
+    def camino(self, destino):
+        """
+        Same contract as algos.dijkstra with bloqueados: returns (distancia, camino).
+        """
+        if self.exacto:
+            dist, camino = camino_en_arbol(*self.arbol, self.origen, destino)
+            if not camino:
+                # Unreachable in the open network, so also with the closure
+                self.reutilizados += 1
+                return dist, camino
+            if not self.toca(camino):
+                self.reutilizados += 1
+                return dist, camino
+
+        self.recalculados += 1
+        if self._bloqueado is None:
+            self._bloqueado = self._arbol_bloqueado()
+        return camino_en_arbol(*self._bloqueado, self.origen, destino)
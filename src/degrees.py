@@ -0,0 +1,76 @@
+"""
+Degree index for ORDEN_FALLOS.
+
+Vertices are kept in buckets by degree, each bucket sorted by name, so the
+failure order (by degree, then name) is just the buckets read in degree
+order: no sort per query, and the k most fragile vertices come from the
+first buckets alone. The index is built once at load time and each edge
+change moves only the vertices whose degree changed.
+"""
+
+from bisect import bisect_left, insort
+
+
+class DegreeIndex:
+    """
+    Vertices of a graph bucketed by degree (length of their adjacency list,
+    as algos.orden_fallos counts it).
+    """
+
+    def __init__(self):
+        self.grado = {}  # vertex -> degree
+        self.buckets = {}  # degree -> vertices sorted by name
+
+    @classmethod
+    def from_graph(cls, g: dict):
+        """Builds the index of an adjacency dict."""
+        index = cls()
+        for v in sorted(g):
+            d = len(g[v])
+            index.grado[v] = d
+            index.buckets.setdefault(d, []).append(v)
+        return index
+
+    def update(self, g: dict, v) -> None:
+        """
+        Moves v to the bucket of its current degree in g, or drops it if it
+        is no longer in g (vertices without edges leave the adjacency dict).
+        """
+        nuevo = len(g[v]) if v in g else None
+        viejo = self.grado.get(v)
+        if nuevo == viejo:
+            return
+
+        if viejo is not None:
+            bucket = self.buckets[viejo]
+            del bucket[bisect_left(bucket, v)]
+            if not bucket:
+                del self.buckets[viejo]
+
+        if nuevo is None:
+            del self.grado[v]
+        else:
+            self.grado[v] = nuevo
+            insort(self.buckets.setdefault(nuevo, []), v)
+
+    def grupos(self, k=None):
+        """
+        Returns [(grado, [vertices])] by increasing degree, vertices sorted
+        by name, covering the k lowest-degree vertices (all by default).
+        """
+        grupos = []
+        restantes = len(self.grado) if k is None else k
+        for d in sorted(self.buckets):
+            if restantes <= 0:
+                break
+            bucket = self.buckets[d]
+            grupos.append((d, bucket[:restantes]))
+            restantes -= len(bucket)
+        return grupos
+
+    def orden_fallos(self, k=None):
+        """Same result as algos.orden_fallos (its first k entries if given)."""
+        return [(v, d) for d, vertices in self.grupos(k) for v in vertices]
+
+    def __len__(self):
+        return len(self.grado)
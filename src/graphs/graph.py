@@ -13,6 +13,16 @@ class Graph(ABC):
         """
         pass
 
+    def add_edges(self, edges) -> None:
+        """
+        Adds every edge of an iterable of (u, v) or (u, v, w) tuples.
+
+        Args:
+            edges: Iterable of edges, consumed in a single pass.
+        """
+        for edge in edges:
+            self.add_edge(*edge)
+
     @abstractmethod
     def add_vertex(self, v) -> None:
         """
@@ -33,39 +43,45 @@ class Graph(ABC):
         """
         pass
 
-    # @abstractmethod
-    # def remove_vertex(self, v):
-    #    """
-    #    Removes a vertex from the graph.
-
-    #    Args:
-    #        v: The vertex to remove.
-    #    """
-    #    pass
+    @abstractmethod
+    def remove_vertex(self, v) -> None:
+        """
+        Removes a vertex and every edge incident to it. Does nothing if the
+        vertex does not exist.
 
-    # @abstractmethod
-    # def remove_edge(self, u, v):
-    #     pass
+        Args:
+            v: The vertex to remove.
+        """
+        pass
 
-    # @abstractmethod
-    # def has_edge(self, u, v):
-    #     pass
+    @abstractmethod
+    def remove_edge(self, u, v) -> bool:
+        """
+        Removes the edge between u and v (both directions if undirected).
 
-    # @abstractmethod
-    # def add_vertex(self, v):
-    #     pass
+        Args:
+            u: The source vertex.
+            v: The destination vertex.
 
-    # @abstractmethod
-    # def remove_vertex(self, v):
-    #     pass
+        Returns:
+            True if the edge existed.
+        """
+        pass
 
-    # @abstractmethod
-    # def order(self):
-    #     pass
+    @abstractmethod
+    def has_edge(self, u, v) -> bool:
+        """
+        Checks whether there is an edge from u to v.
 
-    # def get_vertexes(self):
-    #     pass
+        Args:
+            u: The source vertex.
+            v: The destination vertex.
+        """
+        pass
 
-    # @abstractmethod
-    # def get_adjacency_list(self, v):
-    #     pass
+    @abstractmethod
+    def order(self) -> int:
+        """
+        Returns the number of vertices in the graph.
+        """
+        pass
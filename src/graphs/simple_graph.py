@@ -43,6 +43,38 @@ class SimpleGraph(Graph):
                 value
             )
 
+    def remove_vertex(self, v):
+        if v not in self.vertices:
+            return
+
+        i = self.vertices.index(v)
+        self.vertices.pop(i)
+        self.adjacency_matrix.pop(i)
+        for row in self.adjacency_matrix:
+            if len(row) > i:
+                row.pop(i)
+
+    def remove_edge(self, u, v):
+        if not self.has_edge(u, v):
+            return False
+
+        value = 0 if self.weighted else False
+        self.adjacency_matrix[self.vertices.index(u)][self.vertices.index(v)] = value
+
+        if not self.directed:
+            self.adjacency_matrix[self.vertices.index(v)][self.vertices.index(u)] = (
+                value
+            )
+        return True
+
+    def has_edge(self, u, v):
+        if u not in self.vertices or v not in self.vertices:
+            return False
+        return bool(self.adjacency_matrix[self.vertices.index(u)][self.vertices.index(v)])
+
+    def order(self):
+        return len(self.vertices)
+
     def get_adjacency_dict(self) -> dict:
         adjacency_dict = dict()
 
@@ -0,0 +1,206 @@
+"""
+Binary snapshots of a frozen SparseGraph.
+
+Layout (little endian, every section 8-byte aligned):
+
+    header      magic, format version, flags, counts, section sizes,
+                source file mtime/size/sha256 and a CRC32 of the payload
+    names       vertex names, UTF-8, separated by "\\n"
+    offsets     int64[vertices + 1]
+    targets     int64[entries]
+    weights     int64 or float64 [entries] (weighted graphs only)
+
+Snapshots are opened with mmap and the CSR arrays are used in place as
+memoryviews, so only the name table is copied into Python objects. The
+returned SparseGraph owns the mapping; close it (or use the graph as a
+context manager) when done.
+
+The query engine works on adjacency dicts, though: the loaders in
+src.main copy the mapped CSR into one with get_adjacency_dict and then
+close the mapping. A snapshot saves the text parsing and the dict-based
+build of the graph, not the memory of the adjacency dict.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import zlib
+from array import array
+
+from .sparse_graph import SparseGraph
+
+MAGIC = b"CGSNAP\x00\x01"
+FORMAT_VERSION = 1
+
+FLAG_WEIGHTED = 1
+FLAG_FLOAT_WEIGHTS = 2
+FLAG_DIRECTED = 4
+
+# magic, version, flags, vertices, entries, names bytes,
+# source mtime_ns, source size, source sha256, payload crc32
+HEADER = struct.Struct("<8sHHQQQQQ32sI4x")
+
+SUFFIX = ".gsnap"
+
+
+def snapshot_path(source) -> str:
+    """Returns the snapshot path kept next to a graph text file."""
+    return str(source) + SUFFIX
+
+
+def source_fingerprint(source, with_hash=True):
+    """Returns (mtime_ns, size, sha256) of a source file; the hash is zeroed if not requested."""
+    st = os.stat(source)
+    digest = b"\0" * 32
+    if with_hash:
+        h = hashlib.sha256()
+        with open(source, "rb") as file:
+            for block in iter(lambda: file.read(1 << 20), b""):
+                h.update(block)
+        digest = h.digest()
+    return st.st_mtime_ns, st.st_size, digest
+
+
+def _pad(n):
+    return -n % 8
+
+
+def write_snapshot(graph: SparseGraph, source, path=None) -> str:
+    """
+    Writes a snapshot of graph, tied to the text file it was loaded from.
+
+    The file is written under a temporary name and renamed into place, so a
+    concurrent reader never sees a half-written snapshot.
+
+    Returns:
+        The snapshot path
+    """
+    path = path or snapshot_path(source)
+    graph.freeze()
+
+    names = "\n".join(graph.vertices).encode("utf-8")
+    weights = graph.weights if graph.weighted else array("q")
+
+    flags = 0
+    if graph.weighted:
+        flags |= FLAG_WEIGHTED
+        if weights.typecode == "d":
+            flags |= FLAG_FLOAT_WEIGHTS
+    if graph.directed:
+        flags |= FLAG_DIRECTED
+
+    sections = [
+        names + b"\0" * _pad(len(names)),
+        graph.offsets.tobytes(),
+        graph.targets.tobytes(),
+        weights.tobytes(),
+    ]
+    crc = 0
+    for section in sections:
+        crc = zlib.crc32(section, crc)
+
+    mtime_ns, size, digest = source_fingerprint(source)
+    header = HEADER.pack(
+        MAGIC, FORMAT_VERSION, flags, len(graph.vertices), len(graph.targets),
+        len(names), mtime_ns, size, digest, crc,
+    )
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as file:
+        file.write(header)
+        for section in sections:
+            file.write(section)
+    os.replace(tmp, path)
+    return path
+
+
+def read_snapshot(source, weighted, path=None, verify=True):
+    """
+    Opens the snapshot of a graph text file.
+
+    The snapshot is only used when it belongs to the current source file:
+    same size and mtime, or same size and SHA-256 if only the mtime moved.
+
+    Args:
+        source: Graph text file the snapshot was built from
+        weighted: Whether a weighted graph is expected
+        path: Snapshot path (defaults to snapshot_path(source))
+        verify: Check the payload CRC32 before using it
+
+    Returns:
+        A frozen SparseGraph backed by the mapped file (see
+        SparseGraph.close), or None when the snapshot is missing, stale or
+        corrupt.
+    """
+    path = path or snapshot_path(source)
+    try:
+        file = open(path, "rb")
+    except FileNotFoundError:
+        return None
+
+    with file:
+        try:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            return None
+
+    try:
+        graph = _map_graph(mapped, source, weighted, verify)
+    except BaseException:
+        mapped.close()
+        raise
+    if graph is None:
+        mapped.close()
+    return graph
+
+
+def _map_graph(mapped, source, weighted, verify):
+    """The SparseGraph of a mapped snapshot, or None if it cannot be used."""
+    if len(mapped) < HEADER.size:
+        return None
+
+    (magic, version, flags, vertices, entries, names_len,
+     mtime_ns, size, digest, crc) = HEADER.unpack_from(mapped)
+
+    if magic != MAGIC or version != FORMAT_VERSION:
+        return None
+    if bool(flags & FLAG_WEIGHTED) != weighted:
+        return None
+
+    cur_mtime_ns, cur_size, _ = source_fingerprint(source, with_hash=False)
+    if cur_size != size:
+        return None
+    if cur_mtime_ns != mtime_ns and source_fingerprint(source)[2] != digest:
+        return None
+
+    names_start = HEADER.size
+    offsets_start = names_start + names_len + _pad(names_len)
+    targets_start = offsets_start + 8 * (vertices + 1)
+    weights_start = targets_start + 8 * entries
+    end = weights_start + (8 * entries if weighted else 0)
+
+    if len(mapped) != end:
+        return None
+
+    # Only the CSR casts may outlive this function: anything else still
+    # pointing into the mapping would keep close() from releasing it
+    with memoryview(mapped) as view:
+        if verify:
+            with view[names_start:] as payload:
+                if zlib.crc32(payload) != crc:
+                    return None
+
+        names = bytes(view[names_start:names_start + names_len]).decode("utf-8")
+        offsets = view[offsets_start:targets_start].cast("q")
+        targets = view[targets_start:weights_start].cast("q")
+        weights = None
+        if weighted:
+            weights = view[weights_start:end].cast("d" if flags & FLAG_FLOAT_WEIGHTS else "q")
+
+    return SparseGraph.from_csr(
+        names.split("\n") if vertices else [],
+        offsets, targets, weights,
+        isDirected=bool(flags & FLAG_DIRECTED),
+        buffer=mapped,
+    )
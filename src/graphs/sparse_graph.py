@@ -0,0 +1,291 @@
+from array import array
+from bisect import bisect_left
+
+from .graph import Graph
+
+
+class SparseGraph(Graph):
+    """
+    Sparse graph backed by a name -> id hash index and per-vertex adjacency.
+
+    While the graph is being built every vertex keeps a small dict
+    {neighbor_id: weight}, so adding a vertex or an edge is O(1). Calling
+    freeze() packs the adjacency into CSR arrays (offsets, targets, weights)
+    with neighbors ordered by vertex id and releases the per-vertex dicts.
+    Changing a frozen graph thaws it again.
+
+    Removed vertices leave a tombstone (None in vertices) so that ids stay
+    stable and removal costs O(deg); freeze() compacts them away.
+    """
+
+    def __init__(self, isDirected=False, weighted=False):
+        self.vertices = list()  # id -> vertex name
+        self.index = dict()  # vertex name -> id
+        self.adjacency = list()  # id -> {neighbor_id: weight}, None when frozen
+        self.directed = isDirected  # True if the graph is directed, False otherwise
+        self.weighted = weighted
+        self.removed = 0  # tombstones waiting for the next freeze()
+
+        # CSR arrays, only valid while the graph is frozen
+        self.offsets = None
+        self.targets = None
+        self.weights = None
+
+        # Mapped file the CSR arrays point into (snapshots), released by close()
+        self._buffer = None
+
+    @classmethod
+    def from_csr(cls, vertices, offsets, targets, weights=None, isDirected=False, buffer=None):
+        """
+        Builds a frozen graph straight from CSR arrays.
+
+        The arrays are used as given (array.array or memoryview), without
+        copying; weights is None for unweighted graphs. buffer is the mmap
+        the memoryviews point into, if any; the graph then owns it and
+        close() releases it.
+        """
+        graph = cls(isDirected=isDirected, weighted=weights is not None)
+        graph.vertices = list(vertices)
+        graph.index = {name: i for i, name in enumerate(graph.vertices)}
+        graph.adjacency = None
+        graph.offsets = offsets
+        graph.targets = targets
+        graph.weights = weights
+        graph._buffer = buffer
+        return graph
+
+    def add_vertex(self, v):
+        if v in self.index:
+            return
+
+        if self.adjacency is None:
+            self._thaw()
+
+        self.index[v] = len(self.vertices)
+        self.vertices.append(v)
+        self.adjacency.append(dict())
+
+    def add_edge(self, u, v, w=1):
+        if self.adjacency is None:
+            self._thaw()
+
+        iu = self.index.get(u)
+        if iu is None:
+            self.add_vertex(u)
+            iu = len(self.vertices) - 1
+
+        iv = self.index.get(v)
+        if iv is None:
+            self.add_vertex(v)
+            iv = len(self.vertices) - 1
+
+        value = w if self.weighted else True
+        self.adjacency[iu][iv] = value
+
+        if not self.directed:
+            self.adjacency[iv][iu] = value
+
+    def add_edges(self, edges):
+        # Bulk version of add_edge with everything bound to locals; each name
+        # is looked up in the index once per occurrence
+        if self.adjacency is None:
+            self._thaw()
+
+        index = self.index
+        vertices = self.vertices
+        adjacency = self.adjacency
+        weighted = self.weighted
+        directed = self.directed
+
+        for edge in edges:
+            u, v = edge[0], edge[1]
+            if weighted:
+                value = edge[2] if len(edge) > 2 else 1
+            else:
+                value = True
+
+            iu = index.get(u)
+            if iu is None:
+                iu = index[u] = len(vertices)
+                vertices.append(u)
+                adjacency.append(dict())
+
+            iv = index.get(v)
+            if iv is None:
+                iv = index[v] = len(vertices)
+                vertices.append(v)
+                adjacency.append(dict())
+
+            adjacency[iu][iv] = value
+            if not directed:
+                adjacency[iv][iu] = value
+
+    def remove_vertex(self, v):
+        i = self.index.pop(v, None)
+        if i is None:
+            return
+
+        if self.adjacency is None:
+            self._thaw()
+
+        if self.directed:
+            for row in self.adjacency:
+                row.pop(i, None)
+        else:
+            for j in list(self.adjacency[i]):
+                self.adjacency[j].pop(i, None)
+
+        self.adjacency[i] = dict()
+        self.vertices[i] = None
+        self.removed += 1
+
+    def remove_edge(self, u, v):
+        if not self.has_edge(u, v):
+            return False
+
+        if self.adjacency is None:
+            self._thaw()
+
+        iu, iv = self.index[u], self.index[v]
+        del self.adjacency[iu][iv]
+        if not self.directed:
+            self.adjacency[iv].pop(iu, None)
+        return True
+
+    def has_edge(self, u, v):
+        iu, iv = self.index.get(u), self.index.get(v)
+        if iu is None or iv is None:
+            return False
+
+        if self.adjacency is not None:
+            return iv in self.adjacency[iu]
+
+        # Frozen: neighbors are sorted by id
+        start, end = self.offsets[iu], self.offsets[iu + 1]
+        pos = bisect_left(self.targets, iv, start, end)
+        return pos < end and self.targets[pos] == iv
+
+    def order(self) -> int:
+        """Returns the number of vertices in the graph."""
+        return len(self.index)
+
+    def freeze(self) -> None:
+        """
+        Packs the adjacency into CSR arrays and drops the per-vertex dicts.
+
+        After freezing, the neighbors of vertex i are
+        targets[offsets[i]:offsets[i + 1]], sorted by vertex id, with their
+        weights at the same positions in weights (weighted graphs only).
+        """
+        if self.adjacency is None:
+            return
+
+        if self.removed:
+            self._compact()
+
+        offsets = array("q", [0])
+        targets = array("q")
+        values = []
+
+        for row in self.adjacency:
+            ids = sorted(row)
+            targets.extend(ids)
+            if self.weighted:
+                values.extend(map(row.__getitem__, ids))
+            offsets.append(len(targets))
+
+        if self.weighted:
+            try:
+                self.weights = array("q", values)
+            except TypeError:
+                self.weights = array("d", values)
+
+        self.offsets = offsets
+        self.targets = targets
+        self.adjacency = None
+
+    def _compact(self) -> None:
+        """Drops removed vertices and renumbers the rest, keeping their order."""
+        remap = {}
+        for i, name in enumerate(self.vertices):
+            if name is not None:
+                remap[i] = len(remap)
+
+        self.vertices = [name for name in self.vertices if name is not None]
+        self.index = {name: i for i, name in enumerate(self.vertices)}
+        self.adjacency = [
+            {remap[j]: w for j, w in row.items()}
+            for i, row in enumerate(self.adjacency)
+            if i in remap
+        ]
+        self.removed = 0
+
+    def _thaw(self) -> None:
+        """Rebuilds the per-vertex dicts from the CSR arrays."""
+        adjacency = []
+        for i in range(len(self.vertices)):
+            start, end = self.offsets[i], self.offsets[i + 1]
+            if self.weighted:
+                row = dict(zip(self.targets[start:end], self.weights[start:end]))
+            else:
+                row = dict.fromkeys(self.targets[start:end], True)
+            adjacency.append(row)
+
+        self.adjacency = adjacency
+        self.offsets = self.targets = self.weights = None
+
+    def get_adjacency_dict(self) -> dict:
+        self.freeze()
+
+        adjacency_dict = dict()
+        names = self.vertices
+        offsets = self.offsets
+
+        # Resolve every target once, then hand out per-vertex slices
+        flat = list(map(names.__getitem__, self.targets))
+        if self.weighted:
+            flat = list(zip(flat, self.weights))
+
+        for i, name in enumerate(names):
+            start, end = offsets[i], offsets[i + 1]
+            if start != end:
+                adjacency_dict[name] = flat[start:end]
+
+        return adjacency_dict
+
+    def close(self) -> None:
+        """
+        Releases the mapped file of a snapshot graph. A graph still frozen
+        on it has no edges afterwards; copy it (get_adjacency_dict) or
+        change it (which thaws it into dicts) first.
+        """
+        if self._buffer is None:
+            return
+        for view in (self.offsets, self.targets, self.weights):
+            if isinstance(view, memoryview):
+                view.release()
+        if self.adjacency is None:
+            self.offsets = array("q", [0] * (len(self.vertices) + 1))
+            self.targets = array("q")
+            self.weights = array("q") if self.weighted else None
+        self._buffer.close()
+        self._buffer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __repr__(self) -> str:
+        if len(self.index) == 0:
+            return "Grafo vacío"
+
+        if self.adjacency is None:
+            edges = len(self.targets)
+        else:
+            edges = sum(len(row) for row in self.adjacency)
+
+        if not self.directed:
+            edges //= 2
+        return f"SparseGraph({len(self.index)} vértices, {edges} aristas)"
@@ -1,229 +1,267 @@
 """
 Graph analysis module for Buenos Aires city networks.
-Students must implement all functions marked with TODO.
+
+Loaders for the three networks (plain or weighted edge lists, optionally
+through binary snapshots), the barrio coordinates and the road contraction
+hierarchy, and process_queries, which parses a queries file, answers it
+with a QueryEngine and writes the answers file.
 """
 
 # -----------------------------
 # Graph loading
 # -----------------------------
+import gc
+import threading
+import time
+from contextlib import contextmanager
+
+from src.algos import distancia_bfs  # BFS helper, kept importable from here
+from src.contraction import ContractionHierarchy, read_hierarchy, write_hierarchy
 from src.graphs.simple_graph import SimpleGraph
-from src.algos import (
-    componentes_conexos,
-    orden_fallos,
-    dijkstra,
-    tarjan,
-)
-from src.output import (
-    format_camino_minimo,
-    format_componentes_conexos,
-    format_orden_fallos,
-    format_plantas_asignadas,
-    format_puentes_y_articulaciones,
-    format_ruta_recoleccion,
-    format_simulacion_corte,
-)
+from src.graphs.snapshot import read_snapshot, write_snapshot
+from src.graphs.sparse_graph import SparseGraph
+from src.queries import QueryEngine, parse_query
+from src.writer import FORMATS, OutputWriter, RecordWriter
 
 
 # ===============================================================
 # LOADERS
 # ===============================================================
 
-def load_graph(path):
-    """Load an unweighted simple graph."""
-    graph = SimpleGraph(isDirected=False)
-
-    with open(path, "r") as file:
-        for line in file:
-            if not line or line[0] == "#":
-                continue
+# Graph storages selectable by the loaders
+STORAGES = {
+    "matrix": SimpleGraph,
+    "sparse": SparseGraph,
+}
 
-            line = line.strip()
-            if not line:
-                continue
 
-            u, v = line.split(" ")
-            graph.add_edge(u, v)
+# Characters read per chunk by the streaming loader
+CHUNK_SIZE = 1 << 20
 
-    return graph.get_adjacency_dict()
 
+def read_edges(path, weighted=False, chunk_size=CHUNK_SIZE):
+    """
+    Streams the edges of a graph text file.
 
-def load_weighted_graph(path):
-    """Load weighted graph."""
-    graph = SimpleGraph(isDirected=False, weighted=True)
+    The file is read in large chunks and split on any whitespace, so tabs or
+    repeated spaces between fields are fine. Blank lines and lines starting
+    with '#' are skipped.
 
-    with open(path, "r") as file:
-        for line in file:
-            if not line or line[0] == "#":
-                continue
+    Yields:
+        (u, v) tuples, or (u, v, weight) tuples when weighted
+    """
+    fields = 3 if weighted else 2
+    lineno = 0
+    tail = ""
 
-            line = line.strip()
-            if not line:
+    with open(path, "r", encoding="utf-8") as file:
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                lines = [tail] if tail else []
+            else:
+                lines = (tail + chunk).split("\n")
+                tail = lines.pop()
+
+            for line in lines:
+                lineno += 1
+                parts = line.split()
+                if not parts or parts[0][0] == "#":
+                    continue
+
+                if len(parts) != fields:
+                    raise ValueError(f"{path}:{lineno}: expected {fields} fields, got {line.strip()!r}")
+
+                if weighted:
+                    yield parts[0], parts[1], int(parts[2])
+                else:
+                    yield parts[0], parts[1]
+
+            if not chunk:
+                return
+
+
+# The GC switch is process-wide and loads can overlap (the query server
+# reloads on its own thread): the first pause records the state and the
+# last one to end puts it back
+_gc_lock = threading.Lock()
+_gc_pauses = 0
+_gc_was_enabled = True
+
+
+@contextmanager
+def _gc_paused():
+    """Disables the cyclic GC for the block, then puts back the state it had before."""
+    global _gc_pauses, _gc_was_enabled
+    with _gc_lock:
+        if _gc_pauses == 0:
+            _gc_was_enabled = gc.isenabled()
+            gc.disable()
+        _gc_pauses += 1
+    try:
+        yield
+    finally:
+        with _gc_lock:
+            _gc_pauses -= 1
+            if _gc_pauses == 0 and _gc_was_enabled:
+                gc.enable()
+
+
+def _load(path, weighted, storage, stats, snapshot):
+    start = time.perf_counter()
+    source = "text"
+
+    # Loading allocates millions of small objects and no cycles; the cyclic
+    # GC would otherwise rescan them over and over
+    with _gc_paused():
+        graph = None
+        if snapshot and storage == "sparse":
+            graph = read_snapshot(path, weighted)
+
+        if graph is not None:
+            # The algorithms work on adjacency dicts: the mapped CSR is
+            # copied into one and the mapping closed
+            source = "snapshot"
+            with graph:
+                adjacency = graph.get_adjacency_dict()
+        else:
+            graph = STORAGES[storage](isDirected=False, weighted=weighted)
+            graph.add_edges(read_edges(path, weighted=weighted))
+            adjacency = graph.get_adjacency_dict()
+            if snapshot and storage == "sparse":
+                write_snapshot(graph, path)
+
+    if stats is not None:
+        elapsed = time.perf_counter() - start
+        edges = sum(len(neighbors) for neighbors in adjacency.values()) // 2
+        stats.update({
+            "path": str(path),
+            "source": source,
+            "vertices": len(adjacency),
+            "edges": edges,
+            "seconds": elapsed,
+            "edges_per_s": edges / elapsed if elapsed else float("inf"),
+        })
+
+    return adjacency
+
+
+def load_graph(path, storage="sparse", stats=None, snapshot=False):
+    """
+    Load an unweighted simple graph.
+
+    If a stats dict is given it is filled with the vertex/edge counts, load
+    time and throughput (edges/s).
+
+    With snapshot=True (sparse storage only) the graph is read from the
+    binary snapshot next to the file when it is still current, and the
+    snapshot is (re)written after parsing the text otherwise.
+    """
+    return _load(path, False, storage, stats, snapshot)
+
+
+def load_weighted_graph(path, storage="sparse", stats=None, snapshot=False):
+    """Load weighted graph. Same options as load_graph."""
+    return _load(path, True, storage, stats, snapshot)
+
+
+def load_coordinates(path):
+    """
+    Load barrio coordinates for the A_ESTRELLA search.
+
+    One "BARRIO X Y" line per barrio, in any planar unit; blank lines and
+    lines starting with '#' are skipped.
+
+    Returns:
+        {barrio: (x, y)}
+    """
+    coordenadas = {}
+    with open(path, "r", encoding="utf-8") as file:
+        for lineno, line in enumerate(file, 1):
+            parts = line.split()
+            if not parts or parts[0][0] == "#":
                 continue
-
-            u, v, w = line.split(" ")
-            graph.add_edge(u, v, int(w))
-
-    return graph.get_adjacency_dict()
-
-
-# ===============================================================
-# BFS helper for PLANTAS_ASIGNADAS
-# ===============================================================
-
-def distancia_bfs(grafo, origen):
-    """Return BFS distances in an unweighted graph."""
-    from collections import deque
-    dist = {n: float("inf") for n in grafo}
-    dist[origen] = 0
-    q = deque([origen])
-
-    while q:
-        u = q.popleft()
-        for v in grafo[u]:
-            if dist[v] == float("inf"):
-                dist[v] = dist[u] + 1
-                q.append(v)
-
-    return dist
+            if len(parts) != 3:
+                raise ValueError(f"{path}:{lineno}: expected 3 fields, got {line.strip()!r}")
+            coordenadas[parts[0]] = (float(parts[1]), float(parts[2]))
+    return coordenadas
+
+
+def load_hierarchy(path, road_graph, stats=None):
+    """
+    Load the contraction hierarchy of a road graph file.
+
+    The hierarchy is read from the ".gch" file next to path while the text
+    file is unchanged; otherwise it is built from road_graph (the adjacency
+    dict loaded from path) and written there for the next run. If a stats
+    dict is given it is filled with the source ("file"/"built"), upward
+    edge count and seconds.
+    """
+    start = time.perf_counter()
+    source = "file"
+
+    ch = read_hierarchy(path)
+    if ch is None or len(ch.names) != len(road_graph):
+        source = "built"
+        ch = ContractionHierarchy.build(road_graph)
+        write_hierarchy(ch, path)
+
+    if stats is not None:
+        stats.update({
+            "path": str(path),
+            "source": source,
+            "edges": ch.edges(),
+            "seconds": time.perf_counter() - start,
+        })
+
+    return ch
 
 
 # ===============================================================
 # MAIN QUERY PROCESSOR
 # ===============================================================
 
-def process_queries(queries_file, output_file, electric_graph, road_graph, water_graph):
+def process_queries(queries_file, output_file, electric_graph, road_graph, water_graph,
+                    spt_cache=None, precompute=False, workers=1, busqueda="DIJKSTRA",
+                    coordenadas=None, jerarquia=None, backend="auto", formato="text", perfil=None):
 
     print(">> Entrando a process_queries")
 
-    graphs = {
-        "ELECTRICA": electric_graph,
-        "VIAL": road_graph,
-        "HIDRICA": water_graph,
+    if formato not in FORMATS:
+        raise ValueError(f"Unknown output format: {formato!r}")
+
+    if perfil is not None and workers > 1:
+        print(">> --profile: consultas resueltas en serie")
+
+    engine = QueryEngine(electric_graph, road_graph, water_graph,
+                         spt_cache=spt_cache, precompute=precompute,
+                         busqueda=busqueda, coordenadas=coordenadas, jerarquia=jerarquia,
+                         backend=backend, records=formato != "text", perfil=perfil)
+
+    # Parse the whole file first so the engine can plan shared work
+    with open(queries_file, "r", encoding="utf-8") as qf:
+        queries = [q for q in map(parse_query, qf) if q is not None]
+
+    # Text answers, or one structured record per query (jsonl / msgpack),
+    # written as the engine produces them
+    plan = {}
+    answers = engine.answers(queries, workers=workers, plan_stats=plan)
+    writer = OutputWriter(output_file) if formato == "text" else RecordWriter(output_file, formato)
+    with writer as out:
+        if perfil is None:
+            out.write_all(answers)
+        else:
+            for output in answers:
+                inicio = time.perf_counter()
+                out.write(output)
+                perfil.tiempo("escritura", formato, time.perf_counter() - inicio)
+
+    print(f">> {plan['queries']} consultas, {plan['units']} cálculos "
+          f"({plan['deduplicated']} deduplicados)")
+
+    return {
+        "status": "OK",
+        "message": "Consultas procesadas correctamente",
+        "plan": plan,
+        "spt_cache": engine.spt_cache.stats(),
     }
-
-    with open(queries_file, "r", encoding="utf-8") as qf, open(output_file, "w", encoding="utf-8") as out:
-        for line in qf:
-            line = line.strip()
-
-            if not line or line.startswith("#"):
-                continue
-
-            parts = line.split()
-            comando = parts[0].upper()
-
-            # ===============================================================
-            # COMPONENTES CONEXOS
-            # ===============================================================
-            if comando in ("CONEXOS", "COMPONENTES_CONEXOS"):
-                tipo = parts[1].upper()
-                g = graphs[tipo]
-                comps = componentes_conexos(g)
-                out.write(format_componentes_conexos(comps))
-                out.write("\n")
-
-            # ===============================================================
-            # ORDEN DE FALLOS
-            # ===============================================================
-            elif comando == "ORDEN_FALLOS":
-                tipo = parts[1].upper()
-                g = graphs[tipo]
-                fallos = orden_fallos(g)
-                out.write(format_orden_fallos(fallos))
-                out.write("\n")
-
-            # ===============================================================
-            # CAMINO MINIMO (Dijkstra sobre la red VIAL)
-            # ===============================================================
-            elif comando == "CAMINO_MINIMO":
-                origen = parts[1]
-                destino = parts[2]
-                dist, camino = dijkstra(road_graph, origen, destino)
-                out.write(format_camino_minimo(origen, destino, dist, camino))
-                out.write("\n")
-
-            # ===============================================================
-            # CAMINO_MINIMO_SIMULAR_CORTE
-            # ===============================================================
-            elif comando == "CAMINO_MINIMO_SIMULAR_CORTE":
-                # Formato: {A,B,C} origen destino
-                corte_str = parts[1].strip("{}")
-                bloqueados = set(corte_str.split(",")) if corte_str else set()
-
-                origen = parts[2]
-                destino = parts[3]
-
-                dist, camino = dijkstra(road_graph, origen, destino, bloqueados=bloqueados)
-                out.write(format_simulacion_corte(origen, destino, bloqueados, dist, camino))
-                out.write("\n")
-
-            # ===============================================================
-            # CAMINO_RECOLECCION_BASURA
-            # ===============================================================
-            elif comando == "CAMINO_RECOLECCION_BASURA":
-                g = road_graph
-
-                visit = set()
-                camino = []
-
-                def dfs(u):
-                    visit.add(u)
-                    camino.append(u)
-                    vecinos = sorted([v for v, _ in g[u]])
-                    for v in vecinos:
-                        if v not in visit:
-                            dfs(v)
-
-                start = sorted(g.keys())[0]   
-                dfs(start)
-
-                out.write(format_ruta_recoleccion(camino))
-                out.write("\n")
-
-            # ===============================================================
-            # PLANTAS_ASIGNADAS (multi-source BFS)
-            # ===============================================================
-            elif comando == "PLANTAS_ASIGNADAS":
-                plantas = parts[1:]
-                g = water_graph
-
-                from collections import deque
-                dist = {n: float("inf") for n in g}
-                asign = {}
-                q = deque()
-                
-                for p in plantas:
-                    dist[p] = 0
-                    asign[p] = p
-                    q.append(p)
-
-                while q:
-                    u = q.popleft()
-                    for v in g[u]:
-                        if dist[v] > dist[u] + 1:
-                            dist[v] = dist[u] + 1
-                            asign[v] = asign[u]
-                            q.append(v)
-                        elif dist[v] == dist[u] + 1:
-                            asign[v] = min(asign[v], asign[u])
-
-                out.write(format_plantas_asignadas(plantas, asign))
-                out.write("\n")
-
-            # ===============================================================
-            # PUENTES Y ARTICULACIONES
-            # ===============================================================
-            elif comando == "PUENTES_Y_ARTICULACIONES":
-                g = water_graph
-
-                puentes, articulaciones = tarjan(g)
-
-                out.write(format_puentes_y_articulaciones(articulaciones, puentes))
-                out.write("\n")
-
-            # ===============================================================
-            # COMANDO DESCONOCIDO
-            # ===============================================================
-            else:
-                out.write(f"ERROR: comando desconocido → {line}\n\n")
-
-    return {"status": "OK", "message": "Consultas procesadas correctamente"}
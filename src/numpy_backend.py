@@ -0,0 +1,235 @@
+"""
+Optional NumPy/SciPy backend for the graph algorithms.
+
+An adjacency dict is converted once into a scipy.sparse CSR matrix, and
+components, BFS levels, degree ordering and shortest-path trees then run
+in compiled code or as whole-array operations. Every function returns
+exactly what its pure-Python counterpart in src.algos returns, including
+tie-breaking, so the backend can be swapped in without changing a byte of
+output. NumPy and SciPy are optional (pip install tp-matdis[fast]); when
+they are missing HAVE_NUMPY is False and callers keep the Python path.
+"""
+
+from src.algos import arbol_caminos_minimos
+
+try:
+    import numpy as np
+    from scipy.sparse import csgraph, csr_matrix
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+HAVE_NUMPY = np is not None
+
+BACKENDS = ("auto", "python", "numpy")
+
+
+def resolve_backend(backend="auto") -> str:
+    """
+    Returns the backend to use: "numpy" or "python".
+
+    Raises:
+        ValueError: Unknown backend, or "numpy" without NumPy/SciPy installed
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend: {backend!r}")
+    if backend == "auto":
+        return "numpy" if HAVE_NUMPY else "python"
+    if backend == "numpy" and not HAVE_NUMPY:
+        raise ValueError("The numpy backend needs numpy and scipy installed")
+    return backend
+
+
+class NumpyGraph:
+    """
+    CSR view of an adjacency dict.
+
+    Vertex ids follow the order of the dict, which is the order the Python
+    algorithms use to break ties. Parallel edges keep the lightest weight.
+
+    Args:
+        g: Adjacency dict, {u: [v]} or {u: [(v, peso)]}
+        weighted: True for (neighbor, weight) adjacency lists
+    """
+
+    def __init__(self, g: dict, weighted=False):
+        self.names = list(g)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        n = len(self.names)
+
+        # Degrees as the Python algorithms count them (list lengths)
+        self.grados = np.fromiter(map(len, g.values()), dtype=np.int64, count=n)
+
+        index = self.index
+        if weighted:
+            cols = np.fromiter((index[v] for vecinos in g.values() for v, _ in vecinos),
+                               dtype=np.int64, count=int(self.grados.sum()))
+            pesos = [w for vecinos in g.values() for _, w in vecinos]
+            self.enteros = all(type(w) is int for w in pesos)
+            data = np.array(pesos, dtype=np.float64)
+        else:
+            cols = np.fromiter((index[v] for vecinos in g.values() for v in vecinos),
+                               dtype=np.int64, count=int(self.grados.sum()))
+            self.enteros = True
+            data = np.ones(len(cols), dtype=np.float64)
+        rows = np.repeat(np.arange(n, dtype=np.int64), self.grados)
+
+        # Drop parallel edges, keeping the lightest, so CSR entries are unique
+        order = np.lexsort((data, cols, rows))
+        rows, cols, data = rows[order], cols[order], data[order]
+        keep = np.ones(len(rows), dtype=bool)
+        keep[1:] = (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])
+        rows, cols, data = rows[keep], cols[keep], data[keep]
+
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+
+        self.rows = rows
+        self.matrix = csr_matrix((data, cols, indptr), shape=(n, n))
+        self.positivos = bool((data > 0).all())
+
+    # ===============================================================
+    # COMPONENTS AND DEGREES
+    # ===============================================================
+
+    def etiquetas(self):
+        """Component label of every vertex id."""
+        _, labels = csgraph.connected_components(self.matrix, directed=False)
+        return labels
+
+    def componentes_conexos(self):
+        """Same result as algos.componentes_conexos."""
+        names = np.array(self.names, dtype=object)
+        por_nombre = np.argsort(np.array(self.names))
+        labels = self.etiquetas()[por_nombre]
+
+        # Stable sort by label keeps every component in name order
+        orden = np.argsort(labels, kind="stable")
+        ids = por_nombre[orden]
+        cortes = np.flatnonzero(np.diff(labels[orden])) + 1
+
+        comps = [grupo.tolist() for grupo in np.split(names[ids], cortes)] if len(ids) else []
+        comps.sort(key=lambda comp: comp[0])
+        return comps
+
+    def orden_fallos(self):
+        """Same result as algos.orden_fallos: [(barrio, grado)] by (grado, barrio)."""
+        rango = np.empty(len(self.names), dtype=np.int64)
+        rango[np.argsort(np.array(self.names))] = np.arange(len(self.names))
+        orden = np.lexsort((rango, self.grados))
+        return [(self.names[i], g) for i, g in zip(orden.tolist(), self.grados[orden].tolist())]
+
+    # ===============================================================
+    # BFS
+    # ===============================================================
+
+    def _vecinos_de(self, frontera):
+        """(origins, neighbors) of every CSR entry in the rows of frontera."""
+        indptr, indices = self.matrix.indptr, self.matrix.indices
+        inicios = indptr[frontera]
+        cuentas = indptr[frontera + 1] - inicios
+        total = int(cuentas.sum())
+        offsets = np.repeat(inicios - np.cumsum(cuentas) + cuentas, cuentas) + np.arange(total)
+        return np.repeat(frontera, cuentas), indices[offsets]
+
+    def distancia_bfs(self, origen):
+        """Same result as algos.distancia_bfs: hops from origen, inf if unreachable."""
+        dist = csgraph.shortest_path(self.matrix, method="D", unweighted=True,
+                                     indices=self.index[origen])
+        return {
+            name: int(d) if d != np.inf else float("inf")
+            for name, d in zip(self.names, dist.tolist())
+        }
+
+    def matriz_bfs(self, ids, lejos):
+        """
+        Hop distances from every id in ids to every vertex, as an int32
+        array of shape (len(ids), V); unreachable vertices get lejos.
+        """
+        dist = csgraph.shortest_path(self.matrix, method="D", unweighted=True,
+                                     indices=np.asarray(ids, dtype=np.int64))
+        dist = np.atleast_2d(dist)
+        dist[np.isinf(dist)] = lejos
+        return dist.astype(np.int32)
+
+    def plantas_asignadas(self, plantas):
+        """Same result as algos.plantas_asignadas."""
+        ranking = sorted(set(plantas))
+        planta = self.asignar_plantas([self.index[p] for p in ranking])
+        reached = np.flatnonzero(planta >= 0).tolist()
+        return {self.names[i]: ranking[planta[i]] for i in reached}
+
+    def asignar_plantas(self, ids, stats=None):
+        """
+        Multi-source BFS from the plant ids, which must be sorted by plant
+        name. The BFS runs level by level: the whole frontier is expanded at
+        once, and every newly reached barrio takes the smallest plant among
+        its neighbors on the previous level, which is the Python
+        tie-breaking rule.
+
+        If a stats dict is given, the size of every level is appended to its
+        "fronteras" list.
+
+        Returns:
+            Array with the position in ids of every vertex's plant, -1 if unreachable
+        """
+        n = len(self.names)
+        ids = np.asarray(ids, dtype=np.int64)
+
+        sin_planta = len(ids)
+        planta = np.full(n, sin_planta, dtype=np.int64)
+        planta[ids] = np.arange(len(ids))
+        alcanzado = np.zeros(n, dtype=bool)
+        alcanzado[ids] = True
+
+        frontera = np.unique(ids)
+        while len(frontera):
+            if stats is not None:
+                stats.setdefault("fronteras", []).append(len(frontera))
+            origenes, vecinos = self._vecinos_de(frontera)
+            nuevos = ~alcanzado[vecinos]
+            origenes, vecinos = origenes[nuevos], vecinos[nuevos]
+            np.minimum.at(planta, vecinos, planta[origenes])
+            frontera = np.unique(vecinos)
+            alcanzado[frontera] = True
+
+        planta[~alcanzado] = -1
+        return planta
+
+    # ===============================================================
+    # SHORTEST PATHS
+    # ===============================================================
+
+    def arbol_caminos_minimos(self, gw, origen, bloqueados=None, stats=None):
+        """
+        Same result as algos.arbol_caminos_minimos(gw, origen, bloqueados).
+
+        Distances come from SciPy's Dijkstra. Predecessors are derived the
+        way the heap Dijkstra picks them: among the neighbors u with
+        dist[u] + w == dist[v], the one settled first, i.e. the smallest
+        (dist[u], id of u). That is only exact for positive integer
+        weights and no blocked vertices; anything else runs in Python.
+        """
+        if bloqueados or not (self.positivos and self.enteros) or origen not in self.index:
+            return arbol_caminos_minimos(gw, origen, bloqueados, stats)
+
+        s = self.index[origen]
+        dist = csgraph.dijkstra(self.matrix, directed=True, indices=s)
+
+        m = self.matrix
+        du, dv = dist[self.rows], dist[m.indices]
+        tight = np.isfinite(du) & (du + m.data == dv) & (m.indices != s)
+        v, u, d_u = m.indices[tight], self.rows[tight], du[tight]
+
+        orden = np.lexsort((u, d_u, v))
+        v, u = v[orden], u[orden]
+        primeros = np.flatnonzero(np.r_[True, v[1:] != v[:-1]]) if len(v) else v
+
+        names = self.names
+        reached = np.flatnonzero(np.isfinite(dist))
+        dist_map = {names[i]: d for i, d in zip(reached.tolist(), dist[reached].tolist())}
+        prev_map = {names[a]: names[b] for a, b in zip(v[primeros].tolist(), u[primeros].tolist())}
+        if stats is not None:
+            # A full expansion settles every reached vertex and scans all its edges
+            stats["asentados"] = len(reached)
+            stats["relajadas"] = int(np.diff(m.indptr)[reached].sum())
+        return dist_map, prev_map
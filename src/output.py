@@ -3,6 +3,14 @@ Módulo de formatters para presentación de resultados de análisis de grafos.
 Proporciona funciones para formatear diferentes tipos de salidas de manera legible.
 """
 
+# Nombres para mostrar de cada red
+NOMBRES_REDES = {
+    "ELECTRICA": "ELÉCTRICA",
+    "VIAL": "VIAL",
+    "HIDRICA": "HÍDRICA",
+}
+
+
 def wrap_list(items, prefix="  ", max_width=72):
     """
     Envuelve una lista de items en múltiples líneas si es necesario.
@@ -15,25 +23,34 @@ def wrap_list(items, prefix="  ", max_width=72):
     Returns:
         String formateado con saltos de línea apropiados
     """
+    # Cada línea se arma como lista de partes y se une una sola vez; ancho
+    # lleva el largo que tendría la línea concatenada
     lines = []
-    line = prefix
+    line = [prefix]
+    ancho = len(prefix)
+    ultimo = len(items) - 1
     for j, item in enumerate(items):
-        if len(line) + len(item) + 2 > max_width:
-            lines.append(line)
-            line = prefix
-        line += item
-        if j < len(items) - 1:
-            line += ", "
-    lines.append(line)
+        if ancho + len(item) + 2 > max_width:
+            lines.append("".join(line))
+            line = [prefix]
+            ancho = len(prefix)
+        line.append(item)
+        ancho += len(item)
+        if j < ultimo:
+            line.append(", ")
+            ancho += 2
+    lines.append("".join(line))
     return "\n".join(lines)
 
 
-def format_componentes_conexos(componentes):
+def format_componentes_conexos(componentes, ordenados=False):
     """
     Formatea la salida de componentes conexos.
 
     Args:
         componentes: Lista de listas, cada una representa un componente conexo
+        ordenados: True si cada componente ya viene ordenado alfabéticamente
+            (como los devuelve ComponentIndex), para no volver a ordenarlos
 
     Returns:
         String formateado con los componentes conexos
@@ -45,7 +62,7 @@ def format_componentes_conexos(componentes):
 
     # Ordenar componentes: primero por tamaño (desc), luego lexicográficamente por primer nodo
     componentes_sorted = sorted(
-        [sorted(comp) for comp in componentes],
+        componentes if ordenados else [sorted(comp) for comp in componentes],
         key=lambda c: (-len(c), c[0] if c else "")
     )
 
@@ -57,30 +74,111 @@ def format_componentes_conexos(componentes):
     return "\n".join(output)
 
 
-def format_orden_fallos(nodos_grados):
+def format_conectados(red, origen, destino, conectados):
+    """
+    Formatea la respuesta a si dos nodos están en el mismo componente.
+
+    Args:
+        red: Nombre de la red (ELECTRICA, VIAL o HIDRICA)
+        origen: Primer nodo
+        destino: Segundo nodo
+        conectados: True si están en el mismo componente conexo
+
+    Returns:
+        String formateado con el resultado
+    """
+    output = []
+    output.append("-" * 60)
+    output.append(f"CONECTIVIDAD - RED {NOMBRES_REDES.get(red, red)}: {origen} ↔ {destino}")
+    output.append("-" * 60)
+
+    if conectados:
+        output.append("Resultado: CONECTADOS (mismo componente)")
+    else:
+        output.append("Resultado: NO CONECTADOS")
+
+    output.append("")
+    return "\n".join(output)
+
+
+def format_modificacion(accion, red, detalle, resultado):
+    """
+    Formatea el resultado de una modificación de una red (agregar o quitar
+    aristas y nodos).
+
+    Args:
+        accion: Operación realizada (ej. "AGREGAR ARISTA")
+        red: Nombre de la red (ELECTRICA, VIAL o HIDRICA)
+        detalle: Elementos afectados (ej. "Palermo ↔ Retiro")
+        resultado: Descripción del resultado
+
+    Returns:
+        String formateado con la modificación
+    """
+    output = []
+    output.append("-" * 60)
+    output.append(f"{accion} - RED {NOMBRES_REDES.get(red, red)}: {detalle}")
+    output.append("-" * 60)
+    output.append(f"Resultado: {resultado}")
+    output.append("")
+    return "\n".join(output)
+
+
+def format_orden_fallos(nodos_grados, ordenado=False, red="ELECTRICA"):
     """
     Formatea la salida de orden de fallos agrupado por grado.
 
     Args:
         nodos_grados: Lista de tuplas (nodo, grado)
+        ordenado: True si la lista ya viene ordenada por (grado, nodo), como
+            la devuelve orden_fallos, para no volver a ordenarla
+        red: Nombre de la red (ELECTRICA, VIAL o HIDRICA)
 
     Returns:
         String formateado con el orden de fallos
     """
     from itertools import groupby
 
+    # Asegurar orden determinista: por grado, luego alfabéticamente
+    if ordenado:
+        nodos_grados_sorted = nodos_grados
+    else:
+        nodos_grados_sorted = sorted(nodos_grados, key=lambda x: (x[1], x[0]))
+
+    grupos = [
+        (grado, [n[0] for n in nodos_grupo])
+        for grado, nodos_grupo in groupby(nodos_grados_sorted, key=lambda x: x[1])
+    ]
+    return format_orden_fallos_agrupado(grupos, red=red)
+
+
+def format_orden_fallos_agrupado(grupos, total=None, red="ELECTRICA"):
+    """
+    Formatea el orden de fallos a partir de los nodos ya agrupados por
+    grado (como los devuelve DegreeIndex.grupos), sin volver a ordenar.
+
+    Args:
+        grupos: Lista de tuplas (grado, [nodos]) por grado creciente, con
+            los nodos de cada grado ordenados alfabéticamente
+        total: Cantidad de nodos de la red, si grupos sólo trae los más
+            críticos (consulta TOP k)
+        red: Nombre de la red (ELECTRICA, VIAL o HIDRICA)
+
+    Returns:
+        String formateado con el orden de fallos
+    """
     output = []
     output.append("=" * 60)
-    output.append("ORDEN DE FALLOS - RED ELÉCTRICA")
+    output.append(f"ORDEN DE FALLOS - RED {NOMBRES_REDES.get(red, red)}")
     output.append("=" * 60)
-    output.append("Nodos ordenados por criticidad (menor grado = más crítico):")
+    if total is None:
+        output.append("Nodos ordenados por criticidad (menor grado = más crítico):")
+    else:
+        mostrados = sum(len(nodos) for _, nodos in grupos)
+        output.append(f"Los {mostrados} nodos más críticos de {total} (menor grado = más crítico):")
     output.append("")
 
-    # Asegurar orden determinista: por grado, luego alfabéticamente
-    nodos_grados_sorted = sorted(nodos_grados, key=lambda x: (x[1], x[0]))
-
-    for grado, nodos_grupo in groupby(nodos_grados_sorted, key=lambda x: x[1]):
-        nodos_list = sorted([n[0] for n in nodos_grupo])
+    for grado, nodos_list in grupos:
         output.append(f"Grado {grado} ({len(nodos_list)} nodos):")
         output.append(wrap_list(nodos_list))
         output.append("")
@@ -148,34 +246,98 @@ def format_simulacion_corte(origen, destino, cortes, distancia, camino):
     return "\n".join(output)
 
 
-def format_ruta_recoleccion(camino, nodos_por_linea=8):
+def format_ruta_recoleccion(camino, nodos_por_linea=8, minutos=None, modo=None):
     """
     Formatea la salida de una ruta de recolección.
 
     Args:
         camino: Lista de nodos en el camino de recolección
         nodos_por_linea: Cantidad de nodos a mostrar por línea
+        minutos: Tiempo total de la ruta, incluyendo los tramos de regreso
+            (se omite si es None)
+        modo: Modo con que se armó la ruta (DFS o MEJORADA), para el título
 
     Returns:
         String formateado con la ruta de recolección
     """
     output = []
     output.append("=" * 60)
-    output.append("RUTA DE RECOLECCIÓN DE BASURA")
+    output.append("RUTA DE RECOLECCIÓN DE BASURA" + (f" ({modo})" if modo else ""))
     output.append("=" * 60)
     output.append(f"Total de paradas: {len(camino)}")
     output.append(f"Inicio: {camino[0]}")
     output.append(f"Fin: {camino[-1]}")
+    if minutos is not None:
+        output.append(f"Tiempo total: {minutos} minutos")
     output.append("")
     output.append("Recorrido completo:")
 
-    # Dividir en grupos para mejor legibilidad
+    output.extend(lineas_recorrido(camino, nodos_por_linea))
+
+    output.append("")
+    return "\n".join(output)
+
+
+def lineas_recorrido(camino, nodos_por_linea=8):
+    """
+    Divide un recorrido en líneas de nodos_por_linea nodos unidos por flechas.
+
+    Returns:
+        Lista de líneas
+    """
+    lineas = []
     for i in range(0, len(camino), nodos_por_linea):
         grupo = camino[i:i+nodos_por_linea]
         line = f"  {' → '.join(grupo)}"
         if i + nodos_por_linea < len(camino):
             line += " →"
-        output.append(line)
+        lineas.append(line)
+    return lineas
+
+
+def format_recorrido_calles(recorrido, nodos_por_linea=8):
+    """
+    Formatea un recorrido cerrado que pasa por todas las calles de la red vial.
+
+    Args:
+        recorrido: Resultado de RutaRecoleccion.calles (None si la red vial
+            no es conexa)
+        nodos_por_linea: Cantidad de nodos a mostrar por línea
+
+    Returns:
+        String formateado con el recorrido
+    """
+    output = []
+    output.append("=" * 60)
+    output.append("RECORRIDO DE CALLES - RED VIAL")
+    output.append("=" * 60)
+
+    if recorrido is None:
+        output.append("Resultado: NO HAY RECORRIDO (la red vial no es conexa)")
+        output.append("")
+        return "\n".join(output)
+
+    circuito = recorrido["circuito"]
+    repetido = recorrido["minutos"] - recorrido["minutos_calles"]
+    output.append(f"Calles: {recorrido['calles']} ({recorrido['minutos_calles']} minutos)")
+    output.append(f"Barrios de grado impar: {recorrido['impares']}")
+    output.append(f"Tiempo total: {recorrido['minutos']} minutos ({repetido} minutos repetidos)")
+    if not recorrido["exacto"]:
+        output.append("  Aproximado: los barrios impares se emparejaron con una búsqueda local")
+    output.append(f"Inicio y fin: {circuito[0]}")
+    output.append("")
+
+    repetidas = recorrido["repetidas"]
+    output.append(f"CALLES REPETIDAS ({len(repetidas)}):")
+    if repetidas:
+        for u, v, veces in repetidas:
+            output.append(f"  • {u} ↔ {v} (+{veces})")
+    else:
+        output.append("  Ninguna")
+    output.append("")
+
+    output.append(f"Recorrido completo ({len(circuito) - 1} tramos):")
+    output.extend(lineas_recorrido(circuito, nodos_por_linea))
 
     output.append("")
     return "\n".join(output)
@@ -189,6 +351,26 @@ def format_plantas_asignadas(plantas, asignaciones):
         plantas: Lista de nombres de plantas
         asignaciones: Diccionario {barrio: planta_asignada}
 
+    Returns:
+        String formateado con las asignaciones
+    """
+    # Agrupar por planta en una sola pasada, barrios en orden alfabético
+    grupos = {}
+    for barrio in sorted(asignaciones):
+        grupos.setdefault(asignaciones[barrio], []).append(barrio)
+
+    return format_plantas_agrupadas(plantas, grupos)
+
+
+def format_plantas_agrupadas(plantas, grupos):
+    """
+    Igual que format_plantas_asignadas, pero con las asignaciones ya
+    agrupadas por planta (como las devuelve ParticionVoronoi.asignar).
+
+    Args:
+        plantas: Lista de nombres de plantas
+        grupos: Diccionario {planta: [barrios ordenados alfabéticamente]}
+
     Returns:
         String formateado con las asignaciones
     """
@@ -201,9 +383,49 @@ def format_plantas_asignadas(plantas, asignaciones):
     output.append(f"Plantas disponibles: {', '.join(plantas_sorted)}")
     output.append("")
 
-    # Agrupar por planta, ordenar barrios alfabéticamente
     for planta in plantas_sorted:
-        barrios = sorted([b for b, p in asignaciones.items() if p == planta])
+        barrios = grupos.get(planta, [])
+        output.append(f"Planta {planta} ({len(barrios)} barrios):")
+        output.append(wrap_list(barrios))
+        output.append("")
+
+    output.append("")
+    return "\n".join(output)
+
+
+def format_ubicacion_plantas(ubicacion, grupos):
+    """
+    Formatea la ubicación elegida para k plantas de agua.
+
+    Args:
+        ubicacion: Resultado de UbicadorPlantas.ubicar
+        grupos: Diccionario {planta: [barrios]} con los barrios que abastece
+            cada planta elegida
+
+    Returns:
+        String formateado con la ubicación
+    """
+    criterio = ubicacion["criterio"]
+    descripcion = "menor distancia máxima" if criterio == "CENTRO" else "menor distancia total"
+
+    output = []
+    output.append("=" * 60)
+    output.append(f"UBICACIÓN DE PLANTAS - RED HÍDRICA (k = {ubicacion['k']}, {criterio})")
+    output.append("=" * 60)
+    output.append(f"Criterio: {descripcion}")
+    if ubicacion.get("limitadas"):
+        output.append(f"Candidatas evaluadas: {ubicacion['candidatas']} (los barrios de mayor grado)")
+    else:
+        output.append(f"Candidatas evaluadas: {ubicacion['candidatas']}")
+    output.append(f"Plantas elegidas: {', '.join(ubicacion['plantas'])}")
+    output.append(f"Distancia máxima: {ubicacion['distancia_maxima']} saltos")
+    output.append(f"Distancia total: {ubicacion['distancia_total']} saltos")
+    output.append(f"Barrios sin cobertura: {ubicacion['sin_cobertura']}")
+    output.append(f"Intercambios de búsqueda local: {ubicacion['intercambios']}")
+    output.append("")
+
+    for planta in ubicacion["plantas"]:
+        barrios = grupos.get(planta, [])
         output.append(f"Planta {planta} ({len(barrios)} barrios):")
         output.append(wrap_list(barrios))
         output.append("")
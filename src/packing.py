@@ -0,0 +1,175 @@
+"""
+Minimal MessagePack encoder and decoder for the msgpack output.
+
+Covers exactly the types query records use: None, booleans, integers,
+floats, strings, lists/tuples and dicts with string keys. The bytes follow
+the MessagePack specification, so any MessagePack library can read the
+output; unpack is here so the project can read it back without one.
+A msgpack output file is the concatenation of one packed record per query.
+"""
+
+import struct
+
+_FLOAT = struct.Struct(">Bf")
+_DOUBLE = struct.Struct(">Bd")
+
+
+def pack(obj) -> bytes:
+    """Encodes obj as MessagePack."""
+    buf = bytearray()
+    _pack(obj, buf)
+    return bytes(buf)
+
+
+def _pack(obj, buf):
+    if obj is None:
+        buf.append(0xC0)
+    elif obj is True:
+        buf.append(0xC3)
+    elif obj is False:
+        buf.append(0xC2)
+    elif isinstance(obj, int):
+        _pack_int(obj, buf)
+    elif isinstance(obj, float):
+        # Distances are mostly small whole minutes: float32 when it is exact
+        try:
+            corto = _FLOAT.pack(0xCA, obj)
+        except OverflowError:
+            corto = None
+        if corto is not None and (_FLOAT.unpack(corto)[1] == obj or obj != obj):
+            buf += corto
+        else:
+            buf += _DOUBLE.pack(0xCB, obj)
+    elif isinstance(obj, str):
+        data = obj.encode("utf-8")
+        n = len(data)
+        if n < 32:
+            buf.append(0xA0 | n)
+        elif n < 1 << 8:
+            buf += struct.pack(">BB", 0xD9, n)
+        elif n < 1 << 16:
+            buf += struct.pack(">BH", 0xDA, n)
+        else:
+            buf += struct.pack(">BI", 0xDB, n)
+        buf += data
+    elif isinstance(obj, (list, tuple)):
+        _pack_header(len(obj), 0x90, 0xDC, buf)
+        for item in obj:
+            _pack(item, buf)
+    elif isinstance(obj, dict):
+        _pack_header(len(obj), 0x80, 0xDE, buf)
+        for key, value in obj.items():
+            _pack(key, buf)
+            _pack(value, buf)
+    else:
+        raise TypeError(f"Cannot pack {type(obj).__name__}")
+
+
+def _pack_header(n, fix, code16, buf):
+    """Array or map header; code16 + 1 is the 32-bit variant."""
+    if n < 16:
+        buf.append(fix | n)
+    elif n < 1 << 16:
+        buf += struct.pack(">BH", code16, n)
+    else:
+        buf += struct.pack(">BI", code16 + 1, n)
+
+
+def _pack_int(n, buf):
+    if 0 <= n < 0x80:
+        buf.append(n)
+    elif -32 <= n < 0:
+        buf.append(n & 0xFF)
+    elif n >= 0:
+        if n < 1 << 8:
+            buf += struct.pack(">BB", 0xCC, n)
+        elif n < 1 << 16:
+            buf += struct.pack(">BH", 0xCD, n)
+        elif n < 1 << 32:
+            buf += struct.pack(">BI", 0xCE, n)
+        else:
+            buf += struct.pack(">BQ", 0xCF, n)
+    elif n >= -(1 << 7):
+        buf += struct.pack(">Bb", 0xD0, n)
+    elif n >= -(1 << 15):
+        buf += struct.pack(">Bh", 0xD1, n)
+    elif n >= -(1 << 31):
+        buf += struct.pack(">Bi", 0xD2, n)
+    else:
+        buf += struct.pack(">Bq", 0xD3, n)
+
+
+# ===============================================================
+# DECODING
+# ===============================================================
+
+# Fixed-size values: code -> (struct format, size)
+_FIJOS = {
+    0xCA: (">f", 4), 0xCB: (">d", 8),
+    0xCC: (">B", 1), 0xCD: (">H", 2), 0xCE: (">I", 4), 0xCF: (">Q", 8),
+    0xD0: (">b", 1), 0xD1: (">h", 2), 0xD2: (">i", 4), 0xD3: (">q", 8),
+}
+
+
+def unpack(data):
+    """Yields every object of a stream of concatenated MessagePack values."""
+    data = memoryview(data)
+    pos = 0
+    while pos < len(data):
+        obj, pos = _unpack(data, pos)
+        yield obj
+
+
+def _unpack(data, pos):
+    code = data[pos]
+    pos += 1
+
+    if code < 0x80:
+        return code, pos
+    if code >= 0xE0:
+        return code - 0x100, pos
+    if code & 0xE0 == 0xA0:
+        return _str(data, pos, code & 0x1F)
+    if code & 0xF0 == 0x90:
+        return _array(data, pos, code & 0x0F)
+    if code & 0xF0 == 0x80:
+        return _map(data, pos, code & 0x0F)
+    if code == 0xC0:
+        return None, pos
+    if code == 0xC2:
+        return False, pos
+    if code == 0xC3:
+        return True, pos
+    if code in _FIJOS:
+        fmt, size = _FIJOS[code]
+        return struct.unpack_from(fmt, data, pos)[0], pos + size
+    if code in (0xD9, 0xDA, 0xDB):
+        fmt, size = {0xD9: (">B", 1), 0xDA: (">H", 2), 0xDB: (">I", 4)}[code]
+        return _str(data, pos + size, struct.unpack_from(fmt, data, pos)[0])
+    if code in (0xDC, 0xDD):
+        size = 2 if code == 0xDC else 4
+        return _array(data, pos + size, struct.unpack_from(">H" if size == 2 else ">I", data, pos)[0])
+    if code in (0xDE, 0xDF):
+        size = 2 if code == 0xDE else 4
+        return _map(data, pos + size, struct.unpack_from(">H" if size == 2 else ">I", data, pos)[0])
+    raise ValueError(f"Unsupported MessagePack type 0x{code:02x} at byte {pos - 1}")
+
+
+def _str(data, pos, n):
+    return str(data[pos:pos + n], "utf-8"), pos + n
+
+
+def _array(data, pos, n):
+    items = []
+    for _ in range(n):
+        item, pos = _unpack(data, pos)
+        items.append(item)
+    return items, pos
+
+
+def _map(data, pos, n):
+    result = {}
+    for _ in range(n):
+        key, pos = _unpack(data, pos)
+        result[key], pos = _unpack(data, pos)
+    return result, pos
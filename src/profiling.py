@@ -0,0 +1,87 @@
+"""
+Timings and algorithm counters for run.py --profile.
+
+A Profiler collects samples while a batch runs: wall time per query
+command, per unit of work and per answer rendering, loader time per file,
+and the counters the algorithms fill in their stats dicts (vertices
+settled and edges relaxed by Dijkstra, BFS frontier sizes). Nothing here
+runs unless a Profiler is handed to the engine, so a normal run pays one
+None check per unit of work.
+"""
+
+# Sample groups, in report order
+GRUPOS = (
+    ("carga", "graph file loading"),
+    ("consulta", "query wall time (its unit of work + its rendering)"),
+    ("calculo", "unit of work"),
+    ("formato", "answer rendering (path extraction + formatting)"),
+    ("escritura", "output file writing"),
+)
+
+# Counters from the algorithm stats dicts -> report name
+CONTADORES = {
+    "asentados": "vertices settled",
+    "relajadas": "edges relaxed",
+    "fronteras": "BFS frontier size",
+}
+
+
+class Profiler:
+    def __init__(self):
+        self.tiempos = {}  # (grupo, nombre) -> [seconds]
+        self.valores = {}  # (algoritmo, contador) -> [values]
+
+    def tiempo(self, grupo, nombre, segundos) -> None:
+        """Adds one timing sample."""
+        self.tiempos.setdefault((grupo, nombre), []).append(segundos)
+
+    def registrar(self, algoritmo, stats) -> None:
+        """
+        Adds the counters of one algorithm run, from the stats dict it
+        filled (frontier sizes come as a list, one value per BFS level).
+        """
+        for contador, valor in stats.items():
+            muestras = self.valores.setdefault((algoritmo, contador), [])
+            if isinstance(valor, list):
+                muestras.extend(valor)
+            else:
+                muestras.append(valor)
+
+    def reporte(self) -> str:
+        """Summary tables: count, total, p50/p95/max per group and name."""
+        lineas = []
+
+        filas = []
+        for grupo, descripcion in GRUPOS:
+            nombres = sorted(nombre for g, nombre in self.tiempos if g == grupo)
+            for nombre in nombres:
+                muestras = sorted(self.tiempos[grupo, nombre])
+                filas.append((grupo, nombre, len(muestras), f"{sum(muestras):.3f}",
+                              *(f"{s * 1000:.3f}" for s in _resumen(muestras))))
+        if filas:
+            lineas += _tabla(("stage", "name", "n", "total s", "p50 ms", "p95 ms", "max ms"), filas)
+            lineas.append("")
+            lineas += [f"  {grupo}: {descripcion}" for grupo, descripcion in GRUPOS]
+
+        filas = []
+        for (algoritmo, contador), muestras in sorted(self.valores.items()):
+            muestras = sorted(muestras)
+            filas.append((algoritmo, CONTADORES.get(contador, contador), len(muestras), sum(muestras),
+                          *_resumen(muestras)))
+        if filas:
+            lineas.append("")
+            lineas += _tabla(("algorithm", "counter", "n", "total", "p50", "p95", "max"), filas)
+
+        return "\n".join(lineas)
+
+
+def _resumen(ordenadas):
+    """(p50, p95, max) of a sorted non-empty list."""
+    n = len(ordenadas)
+    return ordenadas[(n - 1) // 2], ordenadas[min(n - 1, n * 95 // 100)], ordenadas[-1]
+
+
+def _tabla(header, rows):
+    widths = [max(len(str(x)) for x in col) for col in zip(header, *rows)]
+    line = "  ".join(f"{{:<{w}}}" if i < 2 else f"{{:>{w}}}" for i, w in enumerate(widths))
+    return [line.format(*header)] + [line.format(*row) for row in rows]
@@ -0,0 +1,939 @@
+"""
+Query planning and execution.
+
+The whole query file is parsed first and every query is mapped to a unit
+of work (graph, operation, origin, blocked set). Each distinct unit is
+computed once, and the answers are emitted back in the original order.
+"""
+
+import multiprocessing
+import time
+from bisect import insort
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from src.algos import (
+    a_estrella,
+    camino_en_arbol,
+    dijkstra_bidireccional,
+    escala_heuristica,
+    tarjan,
+)
+from src.apsp import DistanceMatrix, all_pairs
+from src.cache import ShortestPathTreeCache
+from src.components import ComponentIndex
+from src.contraction import ContractionHierarchy
+from src.degrees import DegreeIndex
+from src.corte import SimulacionCorte
+from src.numpy_backend import NumpyGraph, resolve_backend
+from src.recoleccion import MODOS, RutaRecoleccion
+from src.records import (
+    record_camino_minimo,
+    record_componentes_conexos,
+    record_conectados,
+    record_error,
+    record_matriz_distancias,
+    record_modificacion,
+    record_orden_fallos,
+    record_plantas_asignadas,
+    record_puentes_y_articulaciones,
+    record_recorrido_calles,
+    record_ruta_recoleccion,
+    record_simulacion_corte,
+    record_ubicacion_plantas,
+)
+from src.ubicacion import CRITERIOS, UbicadorPlantas, max_candidatas
+from src.voronoi import ParticionVoronoi
+from src.output import (
+    format_camino_minimo,
+    format_componentes_conexos,
+    format_conectados,
+    format_matriz_distancias,
+    format_modificacion,
+    format_orden_fallos_agrupado,
+    format_plantas_agrupadas,
+    format_recorrido_calles,
+    format_puentes_y_articulaciones,
+    format_ruta_recoleccion,
+    format_simulacion_corte,
+    format_ubicacion_plantas,
+)
+
+# Alternative spellings accepted for some commands
+ALIASES = {
+    "CONEXOS": "COMPONENTES_CONEXOS",
+}
+
+# Commands that change a network; every query after one sees the new graph
+MUTATIONS = ("AGREGAR_ARISTA", "QUITAR_ARISTA", "QUITAR_NODO")
+
+# Point-to-point search strategies for CAMINO_MINIMO. DIJKSTRA answers from
+# cached shortest-path trees (or the all-pairs matrix); the others run one
+# search per origin/destination pair, CH over the contraction hierarchy.
+BUSQUEDAS = ("DIJKSTRA", "BIDIRECCIONAL", "A_ESTRELLA", "CH")
+
+
+def parse_query(line):
+    """
+    Parses one line of the query file.
+
+    Returns:
+        (comando, args) with the command normalized, None for blank lines
+        and comments, or ("ERROR", (line,)) for unknown commands and
+        ("ERROR", (line, motivo)) for arguments that are known to be wrong
+    """
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+
+    parts = line.split()
+    comando = parts[0].upper()
+    comando = ALIASES.get(comando, comando)
+
+    if comando == "COMPONENTES_CONEXOS":
+        return comando, (parts[1].upper(),)
+
+    if comando == "ORDEN_FALLOS":
+        # Formato: ORDEN_FALLOS <red> [TOP k]
+        if len(parts) > 2:
+            if len(parts) != 4 or parts[2].upper() != "TOP":
+                return "ERROR", (line,)
+            if not _natural(parts[3]):
+                return "ERROR", (line, "k debe ser un entero no negativo")
+            return comando, (parts[1].upper(), int(parts[3]))
+        return comando, (parts[1].upper(), None)
+
+    if comando == "CONECTADOS":
+        # Formato: CONECTADOS <red> A B
+        if len(parts) != 4:
+            return "ERROR", (line, "se esperaba CONECTADOS <red> A B")
+        return comando, (parts[1].upper(), parts[2], parts[3])
+
+    if comando == "CAMINO_MINIMO":
+        # Formato: CAMINO_MINIMO origen destino [DIJKSTRA|BIDIRECCIONAL|A_ESTRELLA|CH]
+        busqueda = parts[3].upper() if len(parts) > 3 else None
+        if busqueda is not None and busqueda not in BUSQUEDAS:
+            return "ERROR", (line,)
+        return comando, (parts[1], parts[2], busqueda)
+
+    if comando == "CAMINO_MINIMO_SIMULAR_CORTE":
+        # Formato: {A,B,C} origen destino
+        corte_str = parts[1].strip("{}")
+        bloqueados = frozenset(corte_str.split(",")) if corte_str else frozenset()
+        return comando, (bloqueados, parts[2], parts[3])
+
+    if comando == "PLANTAS_ASIGNADAS":
+        return comando, tuple(parts[1:])
+
+    if comando == "UBICAR_PLANTAS":
+        # Formato: UBICAR_PLANTAS k [CENTRO|MEDIANA] [candidata1 candidata2 ...]
+        if len(parts) < 2 or not _natural(parts[1]):
+            return "ERROR", (line, "k debe ser un entero no negativo")
+        criterio = "MEDIANA"
+        candidatas = parts[2:]
+        if candidatas and candidatas[0].upper() in CRITERIOS:
+            criterio = candidatas[0].upper()
+            candidatas = candidatas[1:]
+        return comando, (int(parts[1]), criterio, frozenset(candidatas))
+
+    if comando == "CAMINO_RECOLECCION_BASURA":
+        # Formato: CAMINO_RECOLECCION_BASURA [DFS|MEJORADA]
+        modo = parts[1].upper() if len(parts) > 1 else None
+        if modo is not None and modo not in MODOS:
+            return "ERROR", (line,)
+        return comando, (modo,)
+
+    if comando in ("CAMINO_RECOLECCION_CALLES", "PUENTES_Y_ARTICULACIONES", "MATRIZ_DISTANCIAS"):
+        return comando, ()
+
+    if comando == "AGREGAR_ARISTA":
+        # Formato: AGREGAR_ARISTA <red> A B [peso]
+        if len(parts) not in (4, 5):
+            return "ERROR", (line, "se esperaba AGREGAR_ARISTA <red> A B [peso]")
+        # Every search assumes non-negative minutes; 0 would also tie routes
+        if len(parts) == 5 and not (_natural(parts[4]) and int(parts[4]) > 0):
+            return "ERROR", (line, "el peso debe ser un entero positivo")
+        peso = int(parts[4]) if len(parts) == 5 else 1
+        return comando, (parts[1].upper(), parts[2], parts[3], peso)
+
+    if comando == "QUITAR_ARISTA":
+        # Formato: QUITAR_ARISTA <red> A B
+        if len(parts) != 4:
+            return "ERROR", (line, "se esperaba QUITAR_ARISTA <red> A B")
+        return comando, (parts[1].upper(), parts[2], parts[3])
+
+    if comando == "QUITAR_NODO":
+        # Formato: QUITAR_NODO <red> A
+        if len(parts) != 3:
+            return "ERROR", (line, "se esperaba QUITAR_NODO <red> A")
+        return comando, (parts[1].upper(), parts[2])
+
+    return "ERROR", (line,)
+
+
+def _natural(texto):
+    """Whether texto is a non-negative decimal integer."""
+    return texto.isascii() and texto.isdigit()
+
+
+class QueryEngine:
+    """
+    Answers parsed queries over the three city networks.
+
+    Args:
+        electric_graph, road_graph, water_graph: Adjacency dicts from the loaders
+        spt_cache: ShortestPathTreeCache shared across batches (a new one by default)
+        precompute: Compute all-pairs road distances up front
+        busqueda: Default CAMINO_MINIMO strategy, one of BUSQUEDAS
+        coordenadas: {barrio: (x, y)} used by the A_ESTRELLA heuristic
+        jerarquia: ContractionHierarchy of the road graph for CH searches
+            (built on first use if not given)
+        backend: "python", "numpy" (NumPy/SciPy, same answers) or "auto"
+            (numpy when installed)
+        records: Answer with record dicts (see src.records) instead of
+            formatted text
+        perfil: src.profiling.Profiler that gets the timings and algorithm
+            counters of every query; batches then run serially
+    """
+
+    def __init__(self, electric_graph, road_graph, water_graph, spt_cache=None, precompute=False,
+                 busqueda="DIJKSTRA", coordenadas=None, jerarquia=None, backend="auto",
+                 records=False, perfil=None):
+        self.records = records
+        self.perfil = perfil
+
+        self.graphs = {
+            "ELECTRICA": electric_graph,
+            "VIAL": road_graph,
+            "HIDRICA": water_graph,
+        }
+
+        # Union-find component index of every network, kept up to date on edge
+        # changes instead of re-running a BFS per COMPONENTES_CONEXOS query
+        self.backend = resolve_backend(backend)
+        self._numpy = {}  # red -> NumpyGraph, built on first use and dropped on changes
+
+        self.componentes = {tipo: self._component_index(tipo) for tipo in self.graphs}
+
+        # Vertices bucketed by degree, kept up to date on edge changes, so
+        # ORDEN_FALLOS (and its TOP k form) never sorts the whole network
+        self.grados = {tipo: DegreeIndex.from_graph(g) for tipo, g in self.graphs.items()}
+
+        # Water network prepared for PLANTAS_ASIGNADAS and UBICAR_PLANTAS,
+        # built on first use
+        self._voronoi = None
+        self._ubicador = None
+
+        # Shortest-path trees of the road graph, shared by every CAMINO_MINIMO query
+        self.spt_cache = spt_cache if spt_cache is not None else ShortestPathTreeCache()
+
+        # All-pairs road distances: built up front in precompute mode, otherwise
+        # only when a MATRIZ_DISTANCIAS query first needs them
+        self.precompute = precompute
+        self.distancias = all_pairs(road_graph) if precompute else None
+
+        # Point-to-point search; the A* scale is derived from the road graph
+        # on first use and dropped when it changes
+        if busqueda not in BUSQUEDAS:
+            raise ValueError(f"Unknown search strategy: {busqueda!r}")
+        self.busqueda = busqueda
+        self.coordenadas = coordenadas
+        self._escala = None
+
+        # Contraction hierarchy; it describes one version of the road graph,
+        # so it is dropped on road changes and rebuilt if CH is asked again
+        self.jerarquia = jerarquia
+
+        # Collection routes with the road neighbor lists sorted once
+        self._rutas = None
+
+        # Whether every road weight is positive; closures can then reuse the
+        # open-network trees (see SimulacionCorte)
+        self._positivos = None
+
+        # Bumped on every change to a network; keys the shortest-path trees
+        self.version = 0
+
+        # Position of every vertex in its network, so neighbor lists keep the
+        # same order a reload of the edited file would give them
+        self._orden = {tipo: {v: i for i, v in enumerate(g)} for tipo, g in self.graphs.items()}
+        self._siguiente = {tipo: len(g) for tipo, g in self.graphs.items()}
+
+    def _numpy_graph(self, red):
+        ng = self._numpy.get(red)
+        if ng is None:
+            ng = self._numpy[red] = NumpyGraph(self.graphs[red], weighted=red == "VIAL")
+        return ng
+
+    def _component_index(self, red):
+        g = self.graphs[red]
+        if self.backend == "numpy":
+            return ComponentIndex.from_labels(g, self._numpy_graph(red).etiquetas(),
+                                              weighted=red == "VIAL")
+        return ComponentIndex.from_graph(g, weighted=red == "VIAL")
+
+    def _particion(self):
+        if self._voronoi is None:
+            numpy_graph = self._numpy_graph("HIDRICA") if self.backend == "numpy" else None
+            self._voronoi = ParticionVoronoi(self.graphs["HIDRICA"], numpy_graph)
+        return self._voronoi
+
+    def _recoleccion(self):
+        if self._rutas is None:
+            self._rutas = RutaRecoleccion(self.graphs["VIAL"])
+        return self._rutas
+
+    def _tree(self, origen, bloqueados=None):
+        """Shortest-path tree of the road graph, through the cache."""
+        stats = self._stats()
+        if self.backend == "numpy":
+            tree = self.spt_cache.tree(self.graphs["VIAL"], origen, bloqueados, version=self.version,
+                                       expand=self._numpy_graph("VIAL").arbol_caminos_minimos,
+                                       stats=stats)
+        else:
+            tree = self.spt_cache.tree(self.graphs["VIAL"], origen, bloqueados, version=self.version,
+                                       stats=stats)
+        self._registrar("dijkstra", stats)
+        return tree
+
+    def _stats(self):
+        """A stats dict for the algorithms when profiling; None otherwise, so nothing is counted."""
+        return {} if self.perfil is not None else None
+
+    def _registrar(self, algoritmo, stats):
+        if stats:  # empty on cache hits
+            self.perfil.registrar(algoritmo, stats)
+
+    # ===============================================================
+    # PLANNING
+    # ===============================================================
+
+    def unit_key(self, query, use_matrix=False):
+        """
+        Returns the unit of work a query needs; queries with equal keys share
+        one computation. None means there is nothing to compute.
+        """
+        comando, args = query
+
+        if comando in ("COMPONENTES_CONEXOS", "CONECTADOS"):
+            return comando, args[0]
+
+        if comando == "ORDEN_FALLOS":
+            return (comando,) + args
+
+        if comando == "CAMINO_MINIMO":
+            origen, destino, busqueda = args
+            busqueda = busqueda or self.busqueda
+            if busqueda != "DIJKSTRA":
+                return busqueda, origen, destino
+            if use_matrix:
+                return ("MATRIZ_DISTANCIAS",)
+            return "ARBOL", origen, frozenset()
+
+        if comando == "CAMINO_MINIMO_SIMULAR_CORTE":
+            bloqueados, origen, _ = args
+            return "CORTE", origen, bloqueados
+
+        if comando == "PLANTAS_ASIGNADAS":
+            # The assignment does not depend on the order of the plants
+            return comando, frozenset(args)
+
+        if comando in ("UBICAR_PLANTAS", "CAMINO_RECOLECCION_BASURA"):
+            return (comando,) + args
+
+        if comando == "ERROR":
+            return None
+
+        return (comando,)
+
+    def plan(self, queries):
+        """
+        Groups query positions by unit of work.
+
+        Returns:
+            OrderedDict {unit_key: [positions]} in order of first appearance
+        """
+        use_matrix = self.precompute or self.distancias is not None or any(
+            comando == "MATRIZ_DISTANCIAS" for comando, _ in queries
+        )
+
+        units = OrderedDict()
+        for i, query in enumerate(queries):
+            units.setdefault(self.unit_key(query, use_matrix), []).append(i)
+        return units
+
+    # ===============================================================
+    # EXECUTION
+    # ===============================================================
+
+    def compute(self, key):
+        """Runs one unit of work and returns its raw result."""
+        operacion = key[0]
+        road = self.graphs["VIAL"]
+
+        if operacion == "COMPONENTES_CONEXOS":
+            return self.componentes[key[1]].components()
+
+        if operacion == "CONECTADOS":
+            return self.componentes[key[1]]
+
+        if operacion == "ORDEN_FALLOS":
+            return self.grados[key[1]].grupos(key[2])
+
+        if operacion == "ARBOL":
+            return self._tree(key[1], key[2])
+
+        if operacion == "CORTE":
+            _, origen, bloqueados = key
+            if self._positivos is None:
+                self._positivos = all(w > 0 for vecinos in road.values() for _, w in vecinos)
+            return SimulacionCorte(
+                origen, bloqueados,
+                self._tree(origen),
+                lambda: self._tree(origen, bloqueados),
+                exacto=self._positivos,
+            )
+
+        if operacion == "BIDIRECCIONAL":
+            stats = self._stats()
+            resultado = dijkstra_bidireccional(road, key[1], key[2], stats=stats)
+            self._registrar("bidireccional", stats)
+            return resultado
+
+        if operacion == "A_ESTRELLA":
+            if self.coordenadas and self._escala is None:
+                self._escala = escala_heuristica(road, self.coordenadas)
+            stats = self._stats()
+            resultado = a_estrella(road, key[1], key[2], self.coordenadas, self._escala, stats=stats)
+            self._registrar("a_estrella", stats)
+            return resultado
+
+        if operacion == "CH":
+            if self.jerarquia is None:
+                self.jerarquia = ContractionHierarchy.build(road)
+            stats = self._stats()
+            resultado = self.jerarquia.camino(key[1], key[2], stats=stats)
+            self._registrar("ch", stats)
+            return resultado
+
+        if operacion == "MATRIZ_DISTANCIAS":
+            if self.distancias is None:
+                self.distancias = all_pairs(road)
+            return self.distancias
+
+        if operacion == "CAMINO_RECOLECCION_BASURA":
+            if key[1] is None:
+                return self._recoleccion().dfs()
+            return self._recoleccion().ruta(key[1])
+
+        if operacion == "CAMINO_RECOLECCION_CALLES":
+            # Odd-degree barrios come from the same degree index as ORDEN_FALLOS
+            return self._recoleccion().calles(self.grados["VIAL"].orden_fallos())
+
+        if operacion == "PLANTAS_ASIGNADAS":
+            stats = self._stats()
+            grupos = self._particion().asignar(key[1], stats)
+            self._registrar("bfs", stats)
+            return grupos
+
+        if operacion == "UBICAR_PLANTAS":
+            _, k, criterio, candidatas = key
+            if self._ubicador is None:
+                numpy_graph = self._numpy_graph("HIDRICA") if self.backend == "numpy" else None
+                self._ubicador = UbicadorPlantas(self.graphs["HIDRICA"], numpy_graph)
+            stats = self._stats()
+            ubicacion = self._ubicador.ubicar(k, criterio, candidatas, stats)
+            grupos = self._particion().asignar(ubicacion["plantas"], stats)
+            self._registrar("bfs", stats)
+            return ubicacion, grupos
+
+        if operacion == "PUENTES_Y_ARTICULACIONES":
+            return tarjan(self.graphs["HIDRICA"])
+
+        raise ValueError(f"Unknown unit of work: {key!r}")
+
+    def render(self, query, result) -> str:
+        """Formats the answer to one query from the result of its unit."""
+        comando, args = query
+
+        if comando == "COMPONENTES_CONEXOS":
+            text = format_componentes_conexos(result, ordenados=True)
+
+        elif comando == "ORDEN_FALLOS":
+            red, top = args
+            text = format_orden_fallos_agrupado(result, None if top is None else len(self.grados[red]),
+                                                red=red)
+
+        elif comando == "CONECTADOS":
+            red, origen, destino = args
+            text = format_conectados(red, origen, destino, result.connected(origen, destino))
+
+        elif comando == "CAMINO_MINIMO":
+            origen, destino, busqueda = args
+            if (busqueda or self.busqueda) != "DIJKSTRA":
+                dist, camino = result
+            elif isinstance(result, DistanceMatrix):
+                dist, camino = result.camino(origen, destino)
+            else:
+                dist, camino = camino_en_arbol(*result, origen, destino)
+            text = format_camino_minimo(origen, destino, dist, camino)
+
+        elif comando == "CAMINO_MINIMO_SIMULAR_CORTE":
+            bloqueados, origen, destino = args
+            dist, camino = result.camino(destino)
+            text = format_simulacion_corte(origen, destino, bloqueados, dist, camino)
+
+        elif comando == "MATRIZ_DISTANCIAS":
+            text = format_matriz_distancias(result.as_dict())
+
+        elif comando == "CAMINO_RECOLECCION_BASURA":
+            if args[0] is None:
+                text = format_ruta_recoleccion(result)
+            else:
+                camino, minutos = result
+                text = format_ruta_recoleccion(camino, minutos=minutos, modo=args[0])
+
+        elif comando == "CAMINO_RECOLECCION_CALLES":
+            text = format_recorrido_calles(result)
+
+        elif comando == "PLANTAS_ASIGNADAS":
+            text = format_plantas_agrupadas(list(args), result)
+
+        elif comando == "UBICAR_PLANTAS":
+            text = format_ubicacion_plantas(*result)
+
+        elif comando == "PUENTES_Y_ARTICULACIONES":
+            puentes, articulaciones = result
+            text = format_puentes_y_articulaciones(articulaciones, puentes)
+
+        else:
+            return self.error(*args)
+
+        return text + "\n"
+
+    def record(self, query, result) -> dict:
+        """Builds the record of one query from the result of its unit."""
+        comando, args = query
+
+        if comando == "COMPONENTES_CONEXOS":
+            return record_componentes_conexos(args[0], result)
+
+        if comando == "ORDEN_FALLOS":
+            red, top = args
+            return record_orden_fallos(red, result, top, len(self.grados[red]))
+
+        if comando == "CONECTADOS":
+            red, origen, destino = args
+            return record_conectados(red, origen, destino, result.connected(origen, destino))
+
+        if comando == "CAMINO_MINIMO":
+            origen, destino, busqueda = args
+            busqueda = busqueda or self.busqueda
+            if busqueda != "DIJKSTRA":
+                dist, camino = result
+            elif isinstance(result, DistanceMatrix):
+                dist, camino = result.camino(origen, destino)
+            else:
+                dist, camino = camino_en_arbol(*result, origen, destino)
+            return record_camino_minimo(origen, destino, dist, camino, busqueda)
+
+        if comando == "CAMINO_MINIMO_SIMULAR_CORTE":
+            bloqueados, origen, destino = args
+            dist, camino = result.camino(destino)
+            return record_simulacion_corte(origen, destino, bloqueados, dist, camino)
+
+        if comando == "MATRIZ_DISTANCIAS":
+            return record_matriz_distancias(result.as_dict())
+
+        if comando == "CAMINO_RECOLECCION_BASURA":
+            if args[0] is None:
+                return record_ruta_recoleccion(result)
+            camino, minutos = result
+            return record_ruta_recoleccion(camino, minutos, args[0])
+
+        if comando == "CAMINO_RECOLECCION_CALLES":
+            return record_recorrido_calles(result)
+
+        if comando == "PLANTAS_ASIGNADAS":
+            return record_plantas_asignadas(list(args), result)
+
+        if comando == "UBICAR_PLANTAS":
+            return record_ubicacion_plantas(*result)
+
+        if comando == "PUENTES_Y_ARTICULACIONES":
+            puentes, articulaciones = result
+            return record_puentes_y_articulaciones(articulaciones, puentes)
+
+        return self.error(*args)
+
+    def error(self, linea, motivo=None):
+        """Answer to a line that cannot be answered, as text or record like every other answer."""
+        if self.records:
+            return record_error(linea, motivo)
+        return f"ERROR: {motivo or 'comando desconocido'} → {linea}\n\n"
+
+    def validate(self, query):
+        """
+        Checks the arguments that depend on the current networks.
+
+        Returns:
+            query, or ("ERROR", (line, motivo)) if it cannot be answered
+        """
+        comando, args = query
+        if comando == "UBICAR_PLANTAS":
+            k, criterio, candidatas = args
+            g = self.graphs["HIDRICA"]
+            linea = " ".join([comando, str(k), criterio, *sorted(candidatas)])
+            desconocidas = sorted(c for c in candidatas if c not in g)
+            if desconocidas:
+                return "ERROR", (linea, f"barrio desconocido: {', '.join(desconocidas)}")
+            limite = max_candidatas(len(g))
+            if len(candidatas) > limite:
+                return "ERROR", (linea, f"más de {limite} candidatas")
+        return query
+
+    def run_unit(self, key, queries):
+        """
+        Computes one unit of work and renders the queries that need it.
+
+        Returns:
+            The output blocks of queries, in the same order
+        """
+        if self.perfil is not None:
+            return self._run_unit_perfil(key, queries)
+
+        result = self.compute(key) if key is not None else None
+
+        # Identical queries also share the formatted answer
+        render = self.record if self.records else self.render
+        rendered = {}
+        outputs = []
+        for query in queries:
+            text = rendered.get(query)
+            if text is None:
+                text = rendered[query] = render(query, result)
+            outputs.append(text)
+        return outputs
+
+    def _run_unit_perfil(self, key, queries):
+        """
+        run_unit timing the computation and every rendering. The unit is
+        charged to the wall time of the first query that needed it.
+        """
+        perfil = self.perfil
+        inicio = time.perf_counter()
+        result = self.compute(key) if key is not None else None
+        calculo = time.perf_counter() - inicio
+        if key is not None:
+            perfil.tiempo("calculo", key[0], calculo)
+
+        render = self.record if self.records else self.render
+        rendered = {}
+        outputs = []
+        for query in queries:
+            inicio = time.perf_counter()
+            text = rendered.get(query)
+            if text is None:
+                text = rendered[query] = render(query, result)
+            formato = time.perf_counter() - inicio
+            perfil.tiempo("formato", query[0], formato)
+            perfil.tiempo("consulta", query[0], calculo + formato)
+            calculo = 0.0
+            outputs.append(text)
+        return outputs
+
+    def answer(self, queries, workers=1):
+        """
+        Answers a batch of parsed queries.
+
+        Mutations (AGREGAR_ARISTA, QUITAR_ARISTA, QUITAR_NODO) split the batch:
+        the queries between two mutations are planned and run together, and
+        each mutation is applied before the queries that follow it.
+
+        Args:
+            queries: Parsed queries, as returned by parse_query
+            workers: Processes to spread the units of work over (1 = serial)
+
+        Returns:
+            (outputs, plan_stats): one output block per query, in input
+            order, and counts of queries, units computed and deduplicated
+            computations
+        """
+        plan_stats = {}
+        outputs = list(self.answers(queries, workers, plan_stats))
+        return outputs, plan_stats
+
+    def answers(self, queries, workers=1, plan_stats=None):
+        """
+        Same as answer, yielding each output block as soon as it and every
+        block before it are ready, so they can be written while the rest of
+        the batch runs. Units run in the order of their first query.
+
+        Args:
+            plan_stats: dict that receives the counts answer returns, if given
+        """
+        if plan_stats is None:
+            plan_stats = {}
+        plan_stats.update(queries=len(queries), units=0, deduplicated=0)
+
+        start = 0
+        for i in range(len(queries) + 1):
+            if i < len(queries) and queries[i][0] not in MUTATIONS:
+                continue
+
+            yield from self._answer_segment(queries, start, i, workers, plan_stats)
+            if i < len(queries):
+                inicio = time.perf_counter()
+                output = self.apply(queries[i])
+                if self.perfil is not None:
+                    segundos = time.perf_counter() - inicio
+                    self.perfil.tiempo("calculo", queries[i][0], segundos)
+                    self.perfil.tiempo("consulta", queries[i][0], segundos)
+                yield output
+            start = i + 1
+
+    def _answer_segment(self, queries, start, end, workers, plan_stats):
+        # Validated against the networks as they are after the previous mutation
+        segment = [self.validate(query) for query in queries[start:end]]
+        if not segment:
+            return
+
+        units = self.plan(segment)
+        tasks = [(key, [segment[i] for i in positions]) for key, positions in units.items()]
+
+        planned = sum(len(p) for key, p in units.items() if key is not None)
+        computed = sum(1 for key in units if key is not None)
+        plan_stats["units"] += computed
+        plan_stats["deduplicated"] += planned - computed
+
+        # Worker processes would keep their timings to themselves
+        if workers > 1 and len(tasks) > 1 and self.perfil is None:
+            results = self._run_parallel(tasks, workers)
+        else:
+            results = (self.run_unit(key, unit_queries) for key, unit_queries in tasks)
+
+        # Blocks of later queries wait here until every earlier one is out
+        listos = {}
+        siguiente = 0
+        for positions, texts in zip(units.values(), results):
+            listos.update(zip(positions, texts))
+            while siguiente in listos:
+                yield listos.pop(siguiente)
+                siguiente += 1
+
+    def _run_parallel(self, tasks, workers):
+        """
+        Runs tasks on a process pool and yields their results in task order.
+
+        With the fork start method the workers inherit this engine (graphs,
+        caches, precomputed distances) from the parent's memory; elsewhere it
+        is pickled once per worker through the pool initializer. Tasks only
+        carry unit keys and query tuples.
+        """
+        global _worker_engine
+
+        chunksize = max(1, len(tasks) // (workers * 4))
+
+        if "fork" in multiprocessing.get_all_start_methods():
+            _worker_engine = self
+            try:
+                context = multiprocessing.get_context("fork")
+                with ProcessPoolExecutor(workers, mp_context=context) as pool:
+                    yield from pool.map(_run_task, tasks, chunksize=chunksize)
+            finally:
+                _worker_engine = None
+            return
+
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(self,)) as pool:
+            yield from pool.map(_run_task, tasks, chunksize=chunksize)
+
+
+    # ===============================================================
+    # MUTATIONS
+    # ===============================================================
+
+    def apply(self, query):
+        """Applies a mutation query and returns its formatted answer (or record)."""
+        comando, args = query
+        red = args[0]
+
+        if comando == "AGREGAR_ARISTA":
+            _, u, v, peso = args
+            nueva = self.add_edge(red, u, v, peso)
+            if self.records:
+                return record_modificacion(comando, red, {"origen": u, "destino": v, "peso": peso},
+                                           nueva=nueva)
+            detalle = f"{u} ↔ {v}" + (f" ({peso} minutos)" if red == "VIAL" else "")
+            if nueva:
+                resultado = "ARISTA AGREGADA"
+            elif red == "VIAL":
+                resultado = "LA ARISTA YA EXISTÍA (peso actualizado)"
+            else:
+                resultado = "LA ARISTA YA EXISTÍA"
+            text = format_modificacion("AGREGAR ARISTA", red, detalle, resultado)
+
+        elif comando == "QUITAR_ARISTA":
+            _, u, v = args
+            existia = self.remove_edge(red, u, v)
+            if self.records:
+                return record_modificacion(comando, red, {"origen": u, "destino": v},
+                                           existia=existia)
+            resultado = "ARISTA ELIMINADA" if existia else "LA ARISTA NO EXISTE"
+            text = format_modificacion("QUITAR ARISTA", red, f"{u} ↔ {v}", resultado)
+
+        else:
+            _, v = args
+            aristas = self.remove_vertex(red, v)
+            if self.records:
+                return record_modificacion(comando, red, {"nodo": v}, aristas=aristas)
+            if aristas is None:
+                resultado = "EL NODO NO EXISTE"
+            else:
+                resultado = f"NODO ELIMINADO ({aristas} aristas)"
+            text = format_modificacion("QUITAR NODO", red, v, resultado)
+
+        return text + "\n"
+
+    def add_edge(self, red, u, v, peso=1) -> bool:
+        """
+        Adds the edge u-v to a network in O(deg), creating missing vertices.
+        On the weighted VIAL network an existing edge gets the new weight.
+
+        Returns:
+            True if the edge is new
+        """
+        g = self.graphs[red]
+        orden = self._orden[red]
+        for x in (u, v):
+            if x not in orden:
+                orden[x] = self._siguiente[red]
+                self._siguiente[red] += 1
+
+        nueva = self._insert(g, orden, red, u, v, peso)
+        if u != v:
+            self._insert(g, orden, red, v, u, peso)
+
+        self.componentes[red].add_edge(u, v)
+        for x in (u, v):
+            self.grados[red].update(g, x)
+        self._changed(red)
+        return nueva
+
+    def remove_edge(self, red, u, v) -> bool:
+        """
+        Removes the edge u-v from a network in O(deg). Vertices left without
+        edges disappear from the adjacency dict, as in a reload.
+
+        Returns:
+            True if the edge existed
+        """
+        g = self.graphs[red]
+        if not self._discard(g, red, u, v):
+            return False
+        if u != v:
+            self._discard(g, red, v, u)
+
+        index = self.componentes[red]
+        index.remove_edge(g, u, v)
+        for x in (u, v):
+            if x not in g:
+                index.discard(x)
+            self.grados[red].update(g, x)
+
+        self._changed(red)
+        return True
+
+    def remove_vertex(self, red, v):
+        """
+        Removes a vertex and its edges from a network in O(deg).
+
+        Returns:
+            The number of edges removed, or None if the vertex did not exist
+        """
+        g = self.graphs[red]
+        self._orden[red].pop(v, None)
+        if v not in g:
+            return None
+
+        vecinos = g.pop(v)
+
+        for x in vecinos:
+            x = x[0] if red == "VIAL" else x
+            if x != v:
+                self._discard(g, red, x, v)
+
+        index = self.componentes[red]
+        index.remove_vertex(g, v, vecinos)
+        self.grados[red].update(g, v)
+        for x in vecinos:
+            x = x[0] if red == "VIAL" else x
+            if x not in g:
+                index.discard(x)
+            self.grados[red].update(g, x)
+
+        self._changed(red)
+        return len(vecinos)
+
+    def _insert(self, g, orden, red, u, v, peso):
+        vecinos = g.setdefault(u, [])
+
+        if red == "VIAL":
+            for k, (x, _) in enumerate(vecinos):
+                if x == v:
+                    vecinos[k] = (v, peso)
+                    return False
+            insort(vecinos, (v, peso), key=lambda item: orden[item[0]])
+        else:
+            if v in vecinos:
+                return False
+            insort(vecinos, v, key=orden.__getitem__)
+        return True
+
+    def _discard(self, g, red, u, v):
+        vecinos = g.get(u)
+        if vecinos is None:
+            return False
+
+        for k, x in enumerate(vecinos):
+            if (x[0] if red == "VIAL" else x) == v:
+                del vecinos[k]
+                break
+        else:
+            return False
+
+        if not vecinos:
+            del g[u]
+        return True
+
+    def _changed(self, red):
+        """Invalidates what was derived from a network that just changed."""
+        self.version += 1
+        self._numpy.pop(red, None)
+        if red == "HIDRICA":
+            self._voronoi = None
+            self._ubicador = None
+        if red == "VIAL":
+            # Trees of older versions can never be hit again
+            self.spt_cache.invalidate()
+            self.distancias = None
+            self._escala = None
+            self.jerarquia = None
+            self._positivos = None
+            self._rutas = None
+
+
+# ===============================================================
+# PROCESS POOL WORKERS
+# ===============================================================
+
+_worker_engine = None
+
+
+def _init_worker(engine):
+    global _worker_engine
+    _worker_engine = engine
+
+
+def _run_task(task):
+    key, queries = task
+    return _worker_engine.run_unit(key, queries)
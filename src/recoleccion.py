@@ -0,0 +1,527 @@
+"""
+Garbage-collection routes for CAMINO_RECOLECCION_BASURA and
+CAMINO_RECOLECCION_CALLES.
+
+The original route is the DFS visiting order of the road network, which
+says nothing about travel time: consecutive stops are often not adjacent
+(the DFS backtracks), so the truck drives a shortest path between them.
+RutaRecoleccion prices a route as the sum of those legs, and builds an
+improved one over the same road metric: a nearest-neighbor tour (grown with
+an incremental Dijkstra that stops at the first unvisited barrio) refined
+with 2-opt moves restricted to each barrio's nearest neighbors.
+
+CAMINO_RECOLECCION_CALLES covers streets instead of barrios: a closed walk
+through every road of the network (the Chinese postman problem). Barrios of
+odd degree are paired up, the shortest path of each pair is driven twice,
+and the resulting Eulerian multigraph is walked with Hierholzer's algorithm.
+The pairing is exact for up to MAX_IMPARES_EXACTO odd barrios and a local
+search above that, so the walk of a large network may not be the shortest.
+
+Every distance is computed by a Dijkstra that stops as soon as it reaches
+its target or exceeds the bound that would make a move worthwhile, so legs
+cost time proportional to how local they are, not to the size of the city.
+"""
+
+import heapq
+from collections import deque
+
+from src.algos import dijkstra, orden_fallos, ruta_recoleccion, vecinos_ordenados
+
+MODOS = ("DFS", "MEJORADA")
+
+# Candidate barrios per stop considered by 2-opt
+VECINOS_2OPT = 8
+
+# Candidate partners per odd-degree barrio considered by the street matching,
+# and how many of them are tried at each depth of an alternating cycle
+VECINOS_PAREO = 10
+ANCHURA_PAREO = (10, 5, 3, 2, 2)
+
+# Odd-degree barrios matched exactly (dynamic programming over subsets);
+# above this the matching is the local search
+MAX_IMPARES_EXACTO = 20
+
+
+class RutaRecoleccion:
+    """
+    Collection routes over one version of the road network.
+
+    The alphabetical neighbor lists of the DFS are sorted once here and
+    reused by every query on this network.
+
+    Args:
+        gw: Weighted adjacency dict {barrio: [(vecino, minutos)]}
+    """
+
+    def __init__(self, gw: dict):
+        self.gw = gw
+        self.vecinos = vecinos_ordenados(gw)
+        self.orden = {name: i for i, name in enumerate(gw)}
+        self._tramos = {}  # (a, b) -> exact road distance, both orientations
+        self._cotas = {}  # (a, b) -> bound the distance is known to exceed
+        self._rutas = {}  # modo -> (paradas, minutos)
+        self._calles = None
+
+    def dfs(self):
+        """Same result as algos.ruta_recoleccion."""
+        return ruta_recoleccion(self.gw, self.vecinos)
+
+    def minutos(self, paradas):
+        """Total minutes driving through paradas in order, via shortest paths."""
+        return float(sum(self.tramo(a, b) for a, b in zip(paradas, paradas[1:])))
+
+    def ruta(self, modo="DFS"):
+        """
+        Returns:
+            (paradas, minutos): the stops in visiting order and the minutes
+            needed to drive them in that order
+        """
+        if modo not in MODOS:
+            raise ValueError(f"Unknown collection route mode: {modo!r}")
+        if modo not in self._rutas:
+            if modo == "DFS":
+                paradas = self.dfs()
+                self._rutas[modo] = paradas, self.minutos(paradas)
+            else:
+                self._rutas[modo] = self.mejorada()
+        return self._rutas[modo]
+
+    # ===============================================================
+    # ROAD DISTANCES
+    # ===============================================================
+
+    def tramo(self, a, b, limite=float("inf")):
+        """
+        Road distance from a to b, exact when it is at most limite;
+        float("inf") when it is larger (or b is unreachable).
+        """
+        if a == b:
+            return 0
+        d = self._tramos.get((a, b))
+        if d is not None:
+            return d if d <= limite else float("inf")
+        if limite <= self._cotas.get((a, b), -1):
+            return float("inf")
+
+        gw, orden = self.gw, self.orden
+        dist = {a: 0}
+        heap = [(0, orden[a], a)]
+        while heap:
+            d, _, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+            if d > limite:
+                self._cotas[a, b] = self._cotas[b, a] = limite
+                return float("inf")
+            if u == b:
+                self._guardar(a, b, d)
+                return d
+            for v, w in gw[u]:
+                nd = d + w
+                if nd < dist.get(v, float("inf")):
+                    dist[v] = nd
+                    heapq.heappush(heap, (nd, orden[v], v))
+        return float("inf")
+
+    def _guardar(self, a, b, d):
+        self._tramos[a, b] = d
+        self._tramos[b, a] = d
+
+    def _cercanos(self, a, cantidad, entre=None):
+        """
+        The cantidad barrios nearest to a (by road), nearest first; only
+        barrios in entre count when it is given.
+        """
+        gw, orden = self.gw, self.orden
+        dist = {a: 0}
+        hechos = set()
+        cercanos = []
+        heap = [(0, orden[a], a)]
+        while heap and len(cercanos) < cantidad:
+            d, _, u = heapq.heappop(heap)
+            if u in hechos:
+                continue
+            hechos.add(u)
+            if u != a and (entre is None or u in entre):
+                cercanos.append(u)
+                self._guardar(a, u, d)
+            for v, w in gw[u]:
+                nd = d + w
+                if nd < dist.get(v, float("inf")):
+                    dist[v] = nd
+                    heapq.heappush(heap, (nd, orden[v], v))
+        return cercanos
+
+    # ===============================================================
+    # NEAREST NEIGHBOR + 2-OPT
+    # ===============================================================
+
+    def mejorada(self):
+        """
+        Nearest-neighbor tour from the DFS start, improved with 2-opt.
+        Visits the same barrios as the DFS route.
+
+        Returns:
+            (paradas, minutos)
+        """
+        paradas, minutos = self._vecino_mas_cercano()
+        minutos -= self._dos_opt(paradas)
+        return paradas, float(minutos)
+
+    def _vecino_mas_cercano(self):
+        """Greedy tour: always drive to the nearest barrio not yet visited."""
+        gw, orden = self.gw, self.orden
+        actual = min(gw)
+        visitados = {actual}
+        paradas = [actual]
+        total = 0
+
+        while True:
+            # Incremental Dijkstra from actual, stopped at the first unvisited barrio
+            dist = {actual: 0}
+            hechos = set()
+            heap = [(0, orden[actual], actual)]
+            siguiente = None
+            while heap:
+                d, _, u = heapq.heappop(heap)
+                if u in hechos:
+                    continue
+                hechos.add(u)
+                if u not in visitados:
+                    siguiente = u
+                    break
+                for v, w in gw[u]:
+                    nd = d + w
+                    if nd < dist.get(v, float("inf")):
+                        dist[v] = nd
+                        heapq.heappush(heap, (nd, orden[v], v))
+
+            if siguiente is None:
+                return paradas, total
+
+            self._guardar(actual, siguiente, d)
+            total += d
+            visitados.add(siguiente)
+            paradas.append(siguiente)
+            actual = siguiente
+
+    def _dos_opt(self, paradas):
+        """
+        Applies improving 2-opt moves to the open route paradas in place,
+        keeping the first stop. A move reverses paradas[p+1..q], replacing
+        legs (p, p+1) and (q, q+1) by (p, q) and (p+1, q+1); only q among
+        the VECINOS_2OPT nearest barrios of p or vice versa is tried.
+
+        Returns:
+            Total minutes saved
+        """
+        n = len(paradas)
+        pos = {barrio: i for i, barrio in enumerate(paradas)}
+        cercanos = {barrio: self._cercanos(barrio, VECINOS_2OPT) for barrio in paradas}
+        tramo = self.tramo
+
+        def pierna(i):
+            # Length of the leg leaving position i (nothing leaves the last stop)
+            return tramo(paradas[i], paradas[i + 1]) if i + 1 < n else 0
+
+        ahorro = 0
+        pendientes = deque(paradas)
+        en_cola = set(paradas)
+        while pendientes:
+            a = pendientes.popleft()
+            en_cola.discard(a)
+            i = pos[a]
+            sale_a = pierna(i)
+
+            for c in cercanos[a]:
+                d_ac = tramo(a, c)
+                if i + 1 < n and d_ac >= sale_a:
+                    break  # neighbors are sorted: no new leg from a can be shorter
+                j = pos[c]
+                p, q = (i, j) if i < j else (j, i)
+                if q - p < 2:
+                    continue
+
+                quitado = pierna(p) + pierna(q)
+                if q + 1 < n:
+                    limite = quitado - d_ac
+                    nuevo = d_ac + tramo(paradas[p + 1], paradas[q + 1], limite)
+                else:
+                    nuevo = d_ac
+                if nuevo < quitado:
+                    ahorro += quitado - nuevo
+                    extremos = [paradas[p], paradas[p + 1], paradas[q]]
+                    if q + 1 < n:
+                        extremos.append(paradas[q + 1])
+                    paradas[p + 1:q + 1] = paradas[q:p:-1]
+                    pos.update(zip(paradas[p + 1:q + 1], range(p + 1, q + 1)))
+                    for barrio in extremos:
+                        if barrio not in en_cola:
+                            en_cola.add(barrio)
+                            pendientes.append(barrio)
+                    break
+
+        return ahorro
+
+
+    # ===============================================================
+    # STREET COVERAGE (CHINESE POSTMAN)
+    # ===============================================================
+
+    def calles(self, grados=None):
+        """
+        Minimum-cost closed walk through every road, from the first barrio
+        (alphabetically) that has one.
+
+        Up to MAX_IMPARES_EXACTO odd-degree barrios are matched exactly, so
+        the walk is optimal. Above that they are matched greedily by road
+        distance (closest pairs first, among each barrio's VECINOS_PAREO
+        nearest odd barrios) and then improved along alternating cycles
+        (see _ciclo_alternante); an optimal matching would need a weighted
+        blossom algorithm, and this local search only stays close to it.
+
+        Args:
+            grados: orden_fallos(gw), [(barrio, grado)], if already computed
+
+        Returns:
+            dict with the "circuito" (barrios in walking order, first and
+            last equal), "minutos" (total driving time), "minutos_calles"
+            (time of the roads themselves), "calles" (how many roads),
+            "impares" (odd-degree barrios), "exacto" (whether the walk is
+            known to be optimal) and "repetidas" ([(u, v, veces)]: roads
+            driven more than once and how many extra times); None if the
+            roads do not form a single connected network
+        """
+        if self._calles is None:
+            self._calles = self._cartero(grados if grados is not None else orden_fallos(self.gw))
+        return self._calles
+
+    def _cartero(self, grados):
+        gw, orden = self.gw, self.orden
+
+        # Every road once: list entries u -> v with u before v, self-loops as they are
+        aristas = []
+        for u, vecinos in gw.items():
+            for v, w in vecinos:
+                if v == u or orden[u] < orden[v]:
+                    aristas.append((u, v, w))
+        if not aristas:
+            return None
+
+        # orden_fallos counts list entries; a self-loop adds 2 to the real degree
+        lazos = {}
+        for u, v, _ in aristas:
+            if u == v:
+                lazos[u] = lazos.get(u, 0) + 1
+        impares = [u for u, grado in grados if (grado + lazos.get(u, 0)) % 2]
+
+        inicio = min(u for u, v, _ in aristas)
+        if not self._conexa(aristas, inicio):
+            return None
+
+        # Drive the shortest path of every pair once more, over its lightest roads
+        mas_liviana = {}
+        for i, (u, v, w) in enumerate(aristas):
+            for clave in ((u, v), (v, u)):
+                j = mas_liviana.get(clave)
+                if j is None or w < aristas[j][2]:
+                    mas_liviana[clave] = i
+
+        extra = [0] * len(aristas)
+        for a, b in self._parear(impares):
+            _, camino = dijkstra(gw, a, b)
+            for x, y in zip(camino, camino[1:]):
+                extra[mas_liviana[x, y]] += 1
+
+        circuito = _hierholzer(aristas, extra, inicio)
+        minutos_calles = sum(w for _, _, w in aristas)
+        repetidas = sorted(
+            (u, v, veces) if u <= v else (v, u, veces)
+            for (u, v, _), veces in zip(aristas, extra) if veces
+        )
+        return {
+            "circuito": circuito,
+            "minutos": float(minutos_calles + sum(w * veces for (_, _, w), veces in zip(aristas, extra))),
+            "minutos_calles": float(minutos_calles),
+            "calles": len(aristas),
+            "impares": len(impares),
+            "exacto": len(impares) <= MAX_IMPARES_EXACTO,
+            "repetidas": repetidas,
+        }
+
+    def _conexa(self, aristas, inicio):
+        """True if every barrio with a road is reachable from inicio."""
+        con_calles = {u for u, _, _ in aristas} | {v for _, v, _ in aristas}
+        visit = {inicio}
+        pila = [inicio]
+        while pila:
+            u = pila.pop()
+            for v, _ in self.gw[u]:
+                if v not in visit:
+                    visit.add(v)
+                    pila.append(v)
+        return con_calles <= visit
+
+    def _ciclo_alternante(self, a, pareja, cercanos):
+        """
+        Looks for a cheaper way to pair a and the barrios around it.
+
+        Walks an alternating cycle a - b = c - d = ... - a, dropping the
+        current pairs (a, b), (c, d), ... and taking (b, c), (d, e), ...,
+        (last, a) instead, as long as the dropped minutes exceed the taken
+        ones at every step (the Lin-Kernighan gain criterion). At most
+        len(ANCHURA_PAREO) pairs are exchanged, trying fewer candidates
+        the deeper the cycle.
+
+        Returns:
+            The new pairs if an improving cycle was found, else None
+        """
+        tramo = self.tramo
+        b = pareja[a]
+
+        def buscar(x, ganancia, usados, tomados, nivel):
+            for c in cercanos[x][:ANCHURA_PAREO[nivel]]:
+                if c in usados:
+                    continue
+                neta = ganancia - tramo(x, c)
+                if neta <= 0:
+                    break  # candidates are sorted: the rest cost even more
+                y = pareja[c]
+                if y in usados:
+                    continue
+                neta += tramo(c, y)
+                if tramo(y, a, neta) < neta:
+                    return tomados + [(x, c), (y, a)]
+                if nivel + 1 < len(ANCHURA_PAREO):
+                    nuevos = buscar(y, neta, usados | {c, y}, tomados + [(x, c)], nivel + 1)
+                    if nuevos is not None:
+                        return nuevos
+            return None
+
+        return buscar(b, tramo(a, b), {a, b}, [], 0)
+
+    def _parear(self, impares):
+        """Pairs up the odd-degree barrios; returns [(a, b)]."""
+        if len(impares) <= MAX_IMPARES_EXACTO:
+            return self._parear_exacto(impares)
+
+        tramo = self.tramo
+        conjunto = set(impares)
+        cercanos = {a: self._cercanos(a, VECINOS_PAREO, conjunto) for a in impares}
+
+        # Greedy: closest candidate pairs first
+        pares = sorted(
+            (tramo(a, c), self.orden[a], self.orden[c], a, c)
+            for a in impares for c in cercanos[a]
+        )
+        pareja = {}
+        for _, _, _, a, c in pares:
+            if a not in pareja and c not in pareja:
+                pareja[a], pareja[c] = c, a
+
+        # Barrios whose candidates were all taken: nearest unmatched one
+        for a in impares:
+            if a not in pareja:
+                libres = conjunto.difference(pareja)
+                libres.discard(a)
+                c = self._cercanos(a, 1, libres)[0]
+                pareja[a], pareja[c] = c, a
+
+        # Re-pair along improving alternating cycles until none is found
+        pendientes = deque(impares)
+        en_cola = set(impares)
+        while pendientes:
+            a = pendientes.popleft()
+            en_cola.discard(a)
+            nuevos = self._ciclo_alternante(a, pareja, cercanos)
+            if nuevos is None:
+                continue
+            for x, y in nuevos:
+                pareja[x], pareja[y] = y, x
+                for barrio in (x, y):
+                    if barrio not in en_cola:
+                        en_cola.add(barrio)
+                        pendientes.append(barrio)
+
+        return [(a, b) for a, b in pareja.items() if self.orden[a] < self.orden[b]]
+
+    def _parear_exacto(self, impares):
+        """
+        Minimum-cost pairing of the odd-degree barrios: the first barrio
+        left unpaired is tried with every other one, memoizing the best
+        cost of each remaining subset (a bitmask over impares). Only the
+        subsets reachable that way are visited, about 11000 for 20 barrios.
+        """
+        n = len(impares)
+        # One Dijkstra per barrio, until it has reached every other odd one
+        for i, a in enumerate(impares[:-1]):
+            self._cercanos(a, n - 1 - i, set(impares[i + 1:]))
+        d = [[self.tramo(a, b) for b in impares] for a in impares]
+
+        mejor = {0: (0, None)}  # remaining subset -> (cost, partner of its first barrio)
+
+        def costo(resto):
+            if resto not in mejor:
+                i = (resto & -resto).bit_length() - 1
+                sin_i = resto ^ (1 << i)
+                elegido = (float("inf"), None)
+                otros = sin_i
+                while otros:
+                    bit = otros & -otros
+                    otros ^= bit
+                    j = bit.bit_length() - 1
+                    c = d[i][j] + costo(sin_i ^ bit)
+                    if c < elegido[0]:
+                        elegido = (c, j)
+                mejor[resto] = elegido
+            return mejor[resto][0]
+
+        resto = (1 << n) - 1
+        costo(resto)
+        pares = []
+        while resto:
+            i = (resto & -resto).bit_length() - 1
+            j = mejor[resto][1]
+            a, b = impares[i], impares[j]
+            pares.append((a, b) if self.orden[a] < self.orden[b] else (b, a))
+            resto ^= (1 << i) | (1 << j)
+        return pares
+
+
+def _hierholzer(aristas, extra, inicio):
+    """
+    Eulerian circuit from inicio over aristas, each driven 1 + extra[i]
+    times. Iterative, with one stack of barrios.
+
+    Returns:
+        Barrios in walking order, starting and ending at inicio
+    """
+    salidas = {}
+    usos = []
+    for i, (u, v, _) in enumerate(aristas):
+        for _ in range(1 + extra[i]):
+            k = len(usos)
+            usos.append(False)
+            salidas.setdefault(u, []).append((k, v))
+            if v != u:
+                salidas.setdefault(v, []).append((k, u))
+
+    siguiente = dict.fromkeys(salidas, 0)
+    pila = [inicio]
+    circuito = []
+    while pila:
+        u = pila[-1]
+        lista = salidas[u]
+        i = siguiente[u]
+        while i < len(lista) and usos[lista[i][0]]:
+            i += 1
+        siguiente[u] = i
+        if i == len(lista):
+            circuito.append(pila.pop())
+        else:
+            k, v = lista[i]
+            usos[k] = True
+            pila.append(v)
+
+    circuito.reverse()
+    return circuito
@@ -0,0 +1,114 @@
+"""
+Structured records of query answers, for the jsonl and msgpack outputs.
+
+Each builder mirrors the formatter of the same name in src.output but
+returns a plain dict (strings, numbers, booleans, None, lists and dicts)
+built straight from the algorithm results, with no text formatting.
+Lists come in the same order the text report prints them. Unreachable
+distances, float("inf") in the algorithms, are None.
+"""
+
+import math
+
+
+def _distancia(d):
+    return None if d is None or math.isinf(d) else d
+
+
+def record_componentes_conexos(red, componentes):
+    componentes = sorted(componentes, key=lambda c: (-len(c), c[0] if c else ""))
+    return {"comando": "COMPONENTES_CONEXOS", "red": red, "componentes": componentes}
+
+
+def record_orden_fallos(red, grupos, top=None, total=None):
+    return {
+        "comando": "ORDEN_FALLOS",
+        "red": red,
+        "top": top,
+        "total": total,
+        "grupos": [{"grado": grado, "nodos": nodos} for grado, nodos in grupos],
+    }
+
+
+def record_conectados(red, origen, destino, conectados):
+    return {"comando": "CONECTADOS", "red": red, "origen": origen, "destino": destino,
+            "conectados": conectados}
+
+
+def record_camino_minimo(origen, destino, distancia, camino, busqueda):
+    return {"comando": "CAMINO_MINIMO", "origen": origen, "destino": destino,
+            "busqueda": busqueda, "distancia": _distancia(distancia), "camino": camino}
+
+
+def record_simulacion_corte(origen, destino, cortes, distancia, camino):
+    return {"comando": "CAMINO_MINIMO_SIMULAR_CORTE", "origen": origen, "destino": destino,
+            "cortes": sorted(cortes), "distancia": _distancia(distancia), "camino": camino}
+
+
+def record_matriz_distancias(matriz):
+    """Finite distances only, as the text report lists them."""
+    return {
+        "comando": "MATRIZ_DISTANCIAS",
+        "distancias": {
+            origen: {
+                destino: d for destino, d in sorted(fila.items())
+                if destino != origen and not math.isinf(d)
+            }
+            for origen, fila in sorted(matriz.items())
+        },
+    }
+
+
+def record_ruta_recoleccion(camino, minutos=None, modo=None):
+    return {"comando": "CAMINO_RECOLECCION_BASURA", "modo": modo, "paradas": camino,
+            "minutos": minutos}
+
+
+def record_recorrido_calles(recorrido):
+    if recorrido is None:
+        return {"comando": "CAMINO_RECOLECCION_CALLES", "conexa": False}
+    return {
+        "comando": "CAMINO_RECOLECCION_CALLES",
+        "conexa": True,
+        "calles": recorrido["calles"],
+        "impares": recorrido["impares"],
+        "minutos_calles": recorrido["minutos_calles"],
+        "minutos": recorrido["minutos"],
+        "exacto": recorrido["exacto"],
+        "repetidas": [{"origen": u, "destino": v, "veces": veces}
+                      for u, v, veces in recorrido["repetidas"]],
+        "circuito": recorrido["circuito"],
+    }
+
+
+def record_plantas_asignadas(plantas, grupos):
+    ranking = sorted(set(plantas))
+    return {"comando": "PLANTAS_ASIGNADAS", "plantas": ranking,
+            "barrios": {planta: grupos.get(planta, []) for planta in ranking}}
+
+
+def record_ubicacion_plantas(ubicacion, grupos):
+    record = {"comando": "UBICAR_PLANTAS"}
+    record.update(ubicacion)
+    record["barrios"] = {planta: grupos.get(planta, []) for planta in ubicacion["plantas"]}
+    return record
+
+
+def record_puentes_y_articulaciones(articulaciones, puentes):
+    return {"comando": "PUENTES_Y_ARTICULACIONES",
+            "articulaciones": sorted(articulaciones),
+            "puentes": [list(p) for p in sorted(puentes)]}
+
+
+def record_modificacion(comando, red, detalle, **resultado):
+    record = {"comando": comando, "red": red}
+    record.update(detalle)
+    record.update(resultado)
+    return record
+
+
+def record_error(linea, motivo=None):
+    record = {"comando": "ERROR", "linea": linea}
+    if motivo is not None:
+        record["motivo"] = motivo
+    return record
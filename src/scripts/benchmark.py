@@ -0,0 +1,927 @@
+"""
+Benchmarks for the graph storages and algorithms.
+
+Every benchmark works over synthetic square grid graphs so results are
+reproducible without the private city datasets.
+
+Usage:
+    uv run benchmark storage --sizes 500 2000 20000
+    uv run benchmark load --sizes 100000 1000000
+    uv run benchmark snapshot --sizes 100000 1000000
+    uv run benchmark dijkstra --sizes 100 1000 10000 100000 1000000
+    uv run benchmark search --sizes 10000 100000 --pairs 50
+    uv run benchmark ch --sizes 1000 10000 40000 --pairs 200
+    uv run benchmark corte --sizes 10000 100000 --closures 500
+    uv run benchmark backend --sizes 10000 100000 1000000
+    uv run benchmark plantas --sizes 100000 --plants 10 1000 5000
+    uv run benchmark ubicacion --sizes 2500 10000 --candidates 200 --k 5 20
+    uv run benchmark recoleccion --sizes 2500 10000
+    uv run benchmark calles --sizes 2500 10000
+    uv run benchmark fallos --sizes 10000 100000 1000000 --top 300
+    uv run benchmark output --queries 100000
+    uv run benchmark server --queries 2000 --clients 1 4 16
+    uv run benchmark tarjan --sizes 1000 1000000
+    uv run benchmark workers --queries 10000 --workers 1 2 4
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from src.algos import (
+    a_estrella,
+    arbol_caminos_minimos,
+    componentes_conexos,
+    dijkstra,
+    dijkstra_bidireccional,
+    escala_heuristica,
+    orden_fallos,
+    plantas_asignadas,
+    reconstruir_camino,
+    ruta_recoleccion,
+    tarjan,
+)
+from src.contraction import ContractionHierarchy, read_hierarchy, write_hierarchy
+from src.degrees import DegreeIndex
+from src.graphs.sparse_graph import SparseGraph
+from src.main import STORAGES, distancia_bfs, load_graph, load_weighted_graph, process_queries
+from src.numpy_backend import HAVE_NUMPY, NumpyGraph
+from src.output import (
+    format_orden_fallos,
+    format_orden_fallos_agrupado,
+    format_plantas_agrupadas,
+    wrap_list,
+)
+from src.recoleccion import RutaRecoleccion
+from src.ubicacion import CRITERIOS, UbicadorPlantas
+from src.voronoi import ParticionVoronoi
+from src.queries import QueryEngine, parse_query
+from src.writer import OutputWriter
+
+
+# ===============================================================
+# SYNTHETIC GRAPHS
+# ===============================================================
+
+def grid_edges(n, weighted=False, seed=0):
+    """
+    Yields the edges of a square grid with (about) n vertices.
+
+    Vertices are named "R<row>C<col>"; weighted edges get a random
+    travel time between 1 and 20 minutes.
+    """
+    rng = random.Random(seed)
+    side = max(1, int(n ** 0.5))
+
+    for r in range(side):
+        for c in range(side):
+            u = f"R{r}C{c}"
+            neighbors = []
+            if c + 1 < side:
+                neighbors.append(f"R{r}C{c + 1}")
+            if r + 1 < side:
+                neighbors.append(f"R{r + 1}C{c}")
+            for v in neighbors:
+                if weighted:
+                    yield u, v, rng.randint(1, 20)
+                else:
+                    yield u, v
+
+
+def grid_graph(n, weighted=False, seed=0):
+    """Returns the adjacency dict of grid_edges(n) built in memory."""
+    graph = SparseGraph(isDirected=False, weighted=weighted)
+    for edge in grid_edges(n, weighted=weighted, seed=seed):
+        graph.add_edge(*edge)
+    return graph.get_adjacency_dict()
+
+
+def grid_coordinates(g):
+    """Returns {vertex: (col, row)} for the vertices of a grid graph."""
+    coordenadas = {}
+    for name in g:
+        r, c = name[1:].split("C")
+        coordenadas[name] = (float(c), float(r))
+    return coordenadas
+
+
+def path_graph(n):
+    """Returns the adjacency dict of a path P0 - P1 - ... - P(n-1)."""
+    names = [f"P{i}" for i in range(n)]
+    g = {name: [] for name in names}
+    for u, v in zip(names, names[1:]):
+        g[u].append(v)
+        g[v].append(u)
+    return g
+
+
+def grid_corners(g):
+    """Returns the first and last vertices of a grid graph (opposite corners)."""
+    keys = list(g)
+    return keys[0], keys[-1]
+
+
+def write_edge_file(edges, directory):
+    """Writes edges in the repository text format and returns the file path."""
+    fd, path = tempfile.mkstemp(suffix=".txt", dir=directory)
+    with os.fdopen(fd, "w") as file:
+        for edge in edges:
+            file.write(" ".join(str(x) for x in edge))
+            file.write("\n")
+    return path
+
+
+def measure(fn, *args, trace_memory=True, **kwargs):
+    """
+    Runs fn once and returns (result, seconds, peak_bytes).
+
+    tracemalloc slows allocation-heavy code down noticeably, so pure timing
+    benchmarks pass trace_memory=False (peak_bytes is then 0).
+    """
+    gc.collect()
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    peak = 0
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def print_table(header, rows):
+    widths = [max(len(str(x)) for x in col) for col in zip(header, *rows)]
+    line = "  ".join(f"{{:>{w}}}" for w in widths)
+    print(line.format(*header))
+    for row in rows:
+        print(line.format(*row))
+
+
+# ===============================================================
+# BENCHMARKS
+# ===============================================================
+
+def bench_storage(args):
+    """Load time and peak memory of every graph storage."""
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.sizes:
+            path = write_edge_file(grid_edges(n, weighted=args.weighted), tmp)
+            loader = load_weighted_graph if args.weighted else load_graph
+
+            for storage in STORAGES:
+                if storage == "matrix" and n > args.matrix_max:
+                    rows.append((n, storage, "-", "-"))
+                    continue
+                _, elapsed, peak = measure(loader, path, storage=storage)
+                rows.append((n, storage, f"{elapsed:.3f}", f"{peak / 2**20:.1f}"))
+
+    print_table(("vertices", "storage", "load s", "peak MiB"), rows)
+
+
+def _dijkstra_lineal(gw: dict, origen: str, destino: str, bloqueados: set | None = None):
+    """The original Dijkstra with a linear-scan selection, O(V^2), for reference."""
+
+    if bloqueados is None:
+        bloqueados = set()
+
+    if (
+        origen not in gw
+        or destino not in gw
+        or origen in bloqueados
+        or destino in bloqueados
+    ):
+        return float("inf"), []
+
+    dist = {n: float("inf") for n in gw.keys()}
+    prev = {}
+    visitados = set()
+    dist[origen] = 0.0
+
+    while True:
+        u = None
+        mejor = float("inf")
+        for n in dist.keys():
+            if n in visitados or n in bloqueados:
+                continue
+            if dist[n] < mejor:
+                mejor = dist[n]
+                u = n
+
+        if u is None:
+            break
+        if u == destino:
+            break
+
+        visitados.add(u)
+
+        for v, w in gw[u]:
+            if v in visitados or v in bloqueados:
+                continue
+            nd = dist[u] + float(w)
+            if nd < dist[v]:
+                dist[v] = nd
+                prev[v] = u
+
+    if dist[destino] == float("inf"):
+        return float("inf"), []
+
+    return float(dist[destino]), reconstruir_camino(prev, origen, destino)
+
+
+def bench_dijkstra(args):
+    """Heap Dijkstra vs. the original O(V^2) linear scan, corner to corner."""
+    rows = []
+    for n in args.sizes:
+        g = grid_graph(n, weighted=True)
+        origen, destino = grid_corners(g)
+
+        heap_res, heap_s, _ = measure(dijkstra, g, origen, destino, trace_memory=False)
+        if n <= args.legacy_max:
+            scan_res, scan_s, _ = measure(_dijkstra_lineal, g, origen, destino,
+                                           trace_memory=False)
+            assert scan_res == heap_res, "heap and linear scan disagree"
+            scan_col, ratio = f"{scan_s:.4f}", f"{scan_s / heap_s:.1f}x"
+        else:
+            scan_col, ratio = "-", "-"
+
+        rows.append((len(g), f"{heap_s:.4f}", scan_col, ratio))
+
+    print_table(("vertices", "heap s", "scan s", "speedup"), rows)
+
+
+def bench_search(args):
+    """Unidirectional vs. bidirectional Dijkstra vs. A* on random grid pairs."""
+    rows = []
+    for n in args.sizes:
+        g = grid_graph(n, weighted=True)
+        coordenadas = grid_coordinates(g)
+        escala = escala_heuristica(g, coordenadas)
+        rng = random.Random(0)
+        names = list(g)
+        pairs = [(rng.choice(names), rng.choice(names)) for _ in range(args.pairs)]
+
+        searches = {
+            "dijkstra": lambda o, d, stats: dijkstra(g, o, d, stats=stats),
+            "bidireccional": lambda o, d, stats: dijkstra_bidireccional(g, o, d, stats=stats),
+            "a_estrella": lambda o, d, stats: a_estrella(g, o, d, coordenadas, escala, stats=stats),
+        }
+
+        reference = None
+        for name, search in searches.items():
+            distances, settled, elapsed = [], 0, 0.0
+            for o, d in pairs:
+                stats = {}
+                (dist, _), seconds, _ = measure(search, o, d, stats, trace_memory=False)
+                distances.append(dist)
+                settled += stats["asentados"]
+                elapsed += seconds
+
+            if reference is None:
+                reference, base = distances, elapsed
+            assert distances == reference, f"{name} and dijkstra disagree"
+            rows.append((len(g), name, f"{settled / len(pairs):,.0f}",
+                         f"{elapsed / len(pairs) * 1e3:.2f}", f"{base / elapsed:.1f}x"))
+
+    print_table(("vertices", "search", "settled/query", "ms/query", "speedup"), rows)
+
+
+def bench_ch(args):
+    """Contraction hierarchy: preprocessing, reload from disk and query latency."""
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.sizes:
+            path = write_edge_file(grid_edges(n, weighted=True), tmp)
+            g = load_weighted_graph(path)
+
+            ch, build_s, _ = measure(ContractionHierarchy.build, g, trace_memory=False)
+            write_hierarchy(ch, path)
+            ch, read_s, _ = measure(read_hierarchy, path, trace_memory=False)
+
+            rng = random.Random(0)
+            names = list(g)
+            pairs = [(rng.choice(names), rng.choice(names)) for _ in range(args.pairs)]
+
+            ch_s = dijkstra_s = 0.0
+            for o, d in pairs:
+                (ch_dist, _), seconds, _ = measure(ch.camino, o, d, trace_memory=False)
+                ch_s += seconds
+                (dist, _), seconds, _ = measure(dijkstra, g, o, d, trace_memory=False)
+                dijkstra_s += seconds
+                assert ch_dist == dist, "contraction hierarchy and dijkstra disagree"
+
+            rows.append((len(g), f"{build_s:.1f}", f"{read_s:.3f}", f"{ch.edges():,}",
+                         f"{ch_s / len(pairs) * 1e3:.3f}", f"{dijkstra_s / len(pairs) * 1e3:.2f}",
+                         f"{dijkstra_s / ch_s:.0f}x"))
+
+    print_table(("vertices", "build s", "reload s", "up edges", "ch ms", "dijkstra ms", "speedup"), rows)
+
+
+def bench_corte(args):
+    """SIMULAR_CORTE closures: one Dijkstra per closure vs. the tree-reusing engine."""
+    rows = []
+    for n in args.sizes:
+        g = grid_graph(n, weighted=True)
+        rng = random.Random(0)
+        names = list(g)
+        origins = rng.sample(names, min(args.origins, len(names)))
+
+        queries = []
+        for _ in range(args.closures):
+            bloqueados = frozenset(rng.sample(names, args.blocked))
+            queries.append(("CAMINO_MINIMO_SIMULAR_CORTE",
+                            (bloqueados, rng.choice(origins), rng.choice(names))))
+
+        def per_query():
+            return [dijkstra(g, o, d, set(b)) for _, (b, o, d) in queries]
+
+        reference, dijkstra_s, _ = measure(per_query, trace_memory=False)
+
+        engine = QueryEngine({}, g, {})
+        units = engine.plan(queries)
+        results = {key: engine.compute(key) for key in units}
+        (outputs, _), engine_s, _ = measure(QueryEngine({}, g, {}).answer, queries, trace_memory=False)
+
+        # Same queries against the units computed above, to count reused paths
+        for key, positions in units.items():
+            for i in positions:
+                assert results[key].camino(queries[i][1][2]) == reference[i], "corte engine disagrees"
+        reused = sum(r.reutilizados for r in results.values())
+
+        rows.append((len(g), len(queries), f"{dijkstra_s:.2f}", f"{engine_s:.2f}",
+                     f"{dijkstra_s / engine_s:.1f}x", f"{reused / len(queries):.0%}"))
+
+    print_table(("vertices", "closures", "dijkstra s", "engine s", "speedup", "reused"), rows)
+
+
+def bench_backend(args):
+    """NumPy/SciPy backend vs. pure Python: parity check and timings."""
+    if not HAVE_NUMPY:
+        raise SystemExit("The numpy backend needs numpy and scipy installed")
+
+    rows = []
+    for n in args.sizes:
+        g = grid_graph(n)
+        gw = grid_graph(n, weighted=True)
+        origen, _ = grid_corners(g)
+        plantas = random.Random(0).sample(list(g), args.plants)
+
+        ng, convert_s, _ = measure(NumpyGraph, g, trace_memory=False)
+        nw, _, _ = measure(NumpyGraph, gw, weighted=True, trace_memory=False)
+
+        pairs = {
+            "componentes": (lambda: componentes_conexos(g), ng.componentes_conexos),
+            "orden_fallos": (lambda: orden_fallos(g), ng.orden_fallos),
+            "distancia_bfs": (lambda: distancia_bfs(g, origen), lambda: ng.distancia_bfs(origen)),
+            "plantas": (lambda: plantas_asignadas(g, plantas), lambda: ng.plantas_asignadas(plantas)),
+            "arbol": (lambda: arbol_caminos_minimos(gw, origen),
+                      lambda: nw.arbol_caminos_minimos(gw, origen)),
+        }
+
+        for name, (python_fn, numpy_fn) in pairs.items():
+            expected, python_s, _ = measure(python_fn, trace_memory=False)
+            result, numpy_s, _ = measure(numpy_fn, trace_memory=False)
+            assert result == expected, f"{name}: numpy and python backends disagree"
+            rows.append((len(g), name, f"{python_s:.3f}", f"{numpy_s:.3f}",
+                         f"{python_s / numpy_s:.1f}x"))
+        rows.append((len(g), "(conversion)", "-", f"{convert_s:.3f}", "-"))
+
+    print_table(("vertices", "algorithm", "python s", "numpy s", "speedup"), rows)
+
+
+def _format_plantas_por_planta(plantas, asignaciones):
+    """The original PLANTAS_ASIGNADAS report, re-scanning every assignment per plant."""
+    output = ["=" * 60, "PLANTAS DE AGUA ASIGNADAS POR BARRIO", "=" * 60]
+    plantas_sorted = sorted(plantas)
+    output.append(f"Plantas disponibles: {', '.join(plantas_sorted)}")
+    output.append("")
+    for planta in plantas_sorted:
+        barrios = sorted([b for b, p in asignaciones.items() if p == planta])
+        output.append(f"Planta {planta} ({len(barrios)} barrios):")
+        output.append(wrap_list(barrios))
+        output.append("")
+    output.append("")
+    return "\n".join(output)
+
+
+def bench_plantas(args):
+    """PLANTAS_ASIGNADAS: BFS + per-plant report vs. the grouped Voronoi partition."""
+    rows = []
+    for n in args.sizes:
+        g = grid_graph(n)
+        particiones = {"python": ParticionVoronoi(g)}
+        if HAVE_NUMPY:
+            particiones["numpy"] = ParticionVoronoi(g, NumpyGraph(g))
+
+        for count in args.plants:
+            plantas = random.Random(0).sample(list(g), min(count, len(g)))
+
+            def original():
+                return _format_plantas_por_planta(plantas, plantas_asignadas(g, plantas))
+
+            expected, original_s, _ = measure(original, trace_memory=False)
+            row = [len(g), len(plantas), f"{original_s:.3f}"]
+
+            for particion in particiones.values():
+                def voronoi():
+                    return format_plantas_agrupadas(plantas, particion.asignar(plantas))
+
+                text, seconds, _ = measure(voronoi, trace_memory=False)
+                assert text == expected, "Voronoi partition and original report differ"
+                row.append(f"{seconds:.3f}")
+            rows.append(row)
+
+    header = ("vertices", "plants", "original s") + tuple(f"{name} s" for name in particiones)
+    print_table(header, rows)
+
+
+def bench_ubicacion(args):
+    """UBICAR_PLANTAS: greedy + swap search in pure Python vs. NumPy."""
+    rows = []
+    for n in args.sizes:
+        g = grid_graph(n)
+        candidatas = random.Random(0).sample(list(g), min(args.candidates, len(g)))
+        ubicadores = {"python": UbicadorPlantas(g)}
+        if HAVE_NUMPY:
+            ubicadores["numpy"] = UbicadorPlantas(g, NumpyGraph(g))
+
+        for k in args.k:
+            for criterio in CRITERIOS:
+                row = [len(g), len(candidatas), k, criterio]
+                resultados = []
+                for ubicador in ubicadores.values():
+                    # First run includes the BFS of every candidate, the second reuses them
+                    ubicacion, frio_s, _ = measure(ubicador.ubicar, k, criterio, candidatas,
+                                                   trace_memory=False)
+                    _, caliente_s, _ = measure(ubicador.ubicar, k, criterio, candidatas,
+                                               trace_memory=False)
+                    resultados.append(ubicacion)
+                    row += [f"{frio_s:.3f}", f"{caliente_s:.3f}"]
+                assert all(r == resultados[0] for r in resultados), "backends chose different plants"
+                row += [resultados[0]["distancia_maxima"], resultados[0]["distancia_total"],
+                        resultados[0]["intercambios"]]
+                rows.append(row)
+
+    header = ("vertices", "candidates", "k", "criterion")
+    for name in ubicadores:
+        header += (f"{name} cold s", f"{name} warm s")
+    print_table(header + ("max", "total", "swaps"), rows)
+
+
+def _ruta_recursiva(g):
+    """The original recursive DFS collection route, for reference."""
+    visit = set()
+    camino = []
+
+    def dfs(u):
+        visit.add(u)
+        camino.append(u)
+        for v in sorted([v for v, _ in g[u]]):
+            if v not in visit:
+                dfs(v)
+
+    dfs(sorted(g.keys())[0])
+    return camino
+
+
+def bench_recoleccion(args):
+    """Collection routes: recursive vs. iterative DFS, route minutes, NN + 2-opt."""
+    rows = []
+    for n in args.sizes:
+        g = grid_graph(n, weighted=True)
+
+        try:
+            expected, recursive_s, _ = measure(_ruta_recursiva, g, trace_memory=False)
+            recursive = f"{recursive_s:.3f}"
+        except RecursionError:
+            expected, recursive = None, "RecursionError"
+
+        camino, dfs_s, _ = measure(ruta_recoleccion, g, trace_memory=False)
+        assert expected is None or camino == expected, "iterative DFS visits in another order"
+
+        rutas = RutaRecoleccion(g)
+        (_, dfs_min), minutos_s, _ = measure(rutas.ruta, "DFS", trace_memory=False)
+        (_, mejor_min), mejorada_s, _ = measure(rutas.ruta, "MEJORADA", trace_memory=False)
+
+        rows.append((len(g), recursive, f"{dfs_s:.3f}", f"{minutos_s:.3f}", f"{dfs_min:,.0f}",
+                     f"{mejorada_s:.3f}", f"{mejor_min:,.0f}", f"{1 - mejor_min / dfs_min:.1%}"))
+
+    print_table(("vertices", "recursive s", "iterative s", "DFS minutes s", "DFS min",
+                 "improved s", "improved min", "saved"), rows)
+
+
+def bench_calles(args):
+    """Street coverage (Chinese postman) on grids with some streets removed."""
+    rows = []
+    for n in args.sizes:
+        g = grid_graph(n, weighted=True)
+
+        # Remove a share of the streets so plenty of barrios have odd degree
+        rng = random.Random(0)
+        for u in list(g):
+            for v, w in list(g[u]):
+                if u < v and rng.random() < args.removed and len(g[u]) > 1 and len(g[v]) > 1:
+                    g[u].remove((v, w))
+                    g[v].remove((u, w))
+
+        recorrido, seconds, _ = measure(RutaRecoleccion(g).calles, trace_memory=False)
+        if recorrido is None:
+            rows.append((len(g), "-", "-", "-", "-", f"{seconds:.3f}"))
+            continue
+        rows.append((len(g), recorrido["calles"], recorrido["impares"],
+                     f"{recorrido['minutos_calles']:,.0f}", f"{recorrido['minutos']:,.0f}",
+                     f"{seconds:.3f}"))
+
+    print_table(("vertices", "streets", "odd", "street min", "route min", "seconds"), rows)
+
+
+def bench_fallos(args):
+    """ORDEN_FALLOS: sort + regroup per query vs. the degree index (full and TOP k)."""
+    rows = []
+    for n in args.sizes:
+        g = grid_graph(n)
+
+        # Knock out some edges so the low-degree buckets are not just the border
+        rng = random.Random(0)
+        for u in list(g):
+            for v in list(g[u]):
+                if u < v and rng.random() < 0.1:
+                    g[u].remove(v)
+                    g[v].remove(u)
+
+        def original():
+            return format_orden_fallos(orden_fallos(g))
+
+        expected, original_s, _ = measure(original, trace_memory=False)
+        index, build_s, _ = measure(DegreeIndex.from_graph, g, trace_memory=False)
+        text, full_s, _ = measure(lambda: format_orden_fallos_agrupado(index.grupos()),
+                                  trace_memory=False)
+        assert text == expected, "degree index and original report differ"
+        top, top_s, _ = measure(index.orden_fallos, args.top, trace_memory=False)
+        assert top == orden_fallos(g)[:args.top]
+
+        rows.append((len(g), f"{original_s:.3f}", f"{build_s:.3f}", f"{full_s:.3f}",
+                     f"{top_s * 1e3:.3f}"))
+
+    print_table(("vertices", "sort+format s", "index build s", "index format s",
+                 f"TOP {args.top} ms"), rows)
+
+
+def bench_tarjan(args):
+    """Iterative Tarjan on path graphs, far deeper than the recursion limit."""
+    rows = []
+    for n in args.sizes:
+        g = path_graph(n)
+        (puentes, articulaciones), elapsed, _ = measure(tarjan, g, trace_memory=False)
+        assert len(puentes) == n - 1 and len(articulaciones) == max(0, n - 2)
+        rows.append((n, f"{elapsed:.3f}", f"{elapsed / n * 1e6:.2f}"))
+
+    print_table(("vertices", "tarjan s", "us/vertex"), rows)
+
+
+def _load_line_by_line(path):
+    """The original loader loop (line iteration + add_edge), for reference."""
+    graph = SparseGraph(isDirected=False, weighted=True)
+    with open(path, "r") as file:
+        for line in file:
+            line = line.strip()
+            if not line or line[0] == "#":
+                continue
+            u, v, w = line.split(" ")
+            graph.add_edge(u, v, int(w))
+    return graph.get_adjacency_dict()
+
+
+def bench_load(args):
+    """Streaming chunked loader throughput vs. the original line loop."""
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.sizes:
+            path = write_edge_file(grid_edges(n, weighted=True), tmp)
+
+            stats = {}
+            _, stream_s, _ = measure(load_weighted_graph, path, stats=stats, trace_memory=False)
+            _, lines_s, _ = measure(_load_line_by_line, path, trace_memory=False)
+
+            rows.append((stats["vertices"], stats["edges"], f"{stream_s:.3f}",
+                         f"{stats['edges_per_s']:,.0f}", f"{lines_s:.3f}"))
+
+    print_table(("vertices", "edges", "stream s", "edges/s", "line loop s"), rows)
+
+
+def bench_snapshot(args):
+    """Text parse vs. mmap snapshot startup."""
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.sizes:
+            path = write_edge_file(grid_edges(n, weighted=True), tmp)
+
+            text, text_s, _ = measure(load_weighted_graph, path, trace_memory=False)
+            load_weighted_graph(path, snapshot=True)  # writes the snapshot
+            snap, snap_s, _ = measure(load_weighted_graph, path, snapshot=True, trace_memory=False)
+            assert snap == text, "snapshot and text loads disagree"
+
+            rows.append((len(text), f"{text_s:.3f}", f"{snap_s:.3f}", f"{text_s / snap_s:.1f}x"))
+
+    print_table(("vertices", "text s", "snapshot s", "speedup"), rows)
+
+
+def write_query_file(g, count, origins, directory, seed=0):
+    """
+    Writes a synthetic query file over grid graph g: mostly CAMINO_MINIMO
+    from a pool of origins, plus some cut simulations and whole-graph queries.
+    """
+    rng = random.Random(seed)
+    names = list(g)
+    pool = rng.sample(names, min(origins, len(names)))
+
+    fd, path = tempfile.mkstemp(suffix=".txt", dir=directory)
+    with os.fdopen(fd, "w") as file:
+        for _ in range(count):
+            r = rng.random()
+            if r < 0.8:
+                file.write(f"CAMINO_MINIMO {rng.choice(pool)} {rng.choice(names)}\n")
+            elif r < 0.95:
+                corte = ",".join(rng.sample(names, 3))
+                file.write(f"CAMINO_MINIMO_SIMULAR_CORTE {{{corte}}} {rng.choice(pool)} {rng.choice(names)}\n")
+            else:
+                file.write(rng.choice([
+                    "COMPONENTES_CONEXOS ELECTRICA",
+                    "ORDEN_FALLOS ELECTRICA",
+                    "PUENTES_Y_ARTICULACIONES",
+                ]) + "\n")
+    return path
+
+
+def bench_workers(args):
+    """Serial vs. process-pool query execution on one synthetic query file."""
+    with tempfile.TemporaryDirectory() as tmp:
+        road_file = write_edge_file(grid_edges(args.vertices, weighted=True), tmp)
+        plain_file = write_edge_file(grid_edges(args.vertices), tmp)
+        road = load_weighted_graph(road_file)
+        plain = load_graph(plain_file)
+        queries_file = write_query_file(road, args.queries, args.origins, tmp)
+
+        rows = []
+        reference = None
+        for workers in args.workers:
+            output_file = os.path.join(tmp, f"out-{workers}.txt")
+            _, elapsed, _ = measure(process_queries, queries_file, output_file,
+                                    plain, road, plain, workers=workers, trace_memory=False)
+            with open(output_file, "rb") as file:
+                output = file.read()
+            if reference is None:
+                reference, base = output, elapsed
+            assert output == reference, f"output with {workers} workers differs"
+            rows.append((workers, f"{elapsed:.2f}", f"{base / elapsed:.1f}x"))
+
+    print_table(("workers", "seconds", "speedup"), rows)
+
+
+def _wrap_list_concat(items, prefix="  ", max_width=72):
+    """The original wrap_list (one string grown by concatenation), for reference."""
+    lines = []
+    line = prefix
+    for j, item in enumerate(items):
+        if len(line) + len(item) + 2 > max_width:
+            lines.append(line)
+            line = prefix
+        line += item
+        if j < len(items) - 1:
+            line += ", "
+    lines.append(line)
+    return "\n".join(lines)
+
+
+def _write_per_answer(path, outputs):
+    """The original output loop: answer and separator written separately."""
+    with open(path, "w", encoding="utf-8") as out:
+        for text in outputs:
+            out.write(text[:-1])
+            out.write("\n")
+
+
+def bench_output(args):
+    """Answer writing: one write per answer vs. OutputWriter; wrap_list."""
+    with tempfile.TemporaryDirectory() as tmp:
+        road = load_weighted_graph(write_edge_file(grid_edges(args.vertices, weighted=True), tmp))
+        plain = load_graph(write_edge_file(grid_edges(args.vertices), tmp))
+        with open(write_query_file(road, args.queries, args.origins, tmp), encoding="utf-8") as file:
+            queries = [q for q in map(parse_query, file) if q is not None]
+
+        engine = QueryEngine(plain, road, plain)
+        (outputs, _), answer_s, _ = measure(engine.answer, queries, trace_memory=False)
+
+        original_file = os.path.join(tmp, "original.txt")
+        _, original_s, _ = measure(_write_per_answer, original_file, outputs, trace_memory=False)
+
+        def buffered():
+            with OutputWriter(os.path.join(tmp, "buffered.txt")) as out:
+                out.write_all(outputs)
+
+        _, buffered_s, _ = measure(buffered, trace_memory=False)
+        with open(original_file, "rb") as a, open(os.path.join(tmp, "buffered.txt"), "rb") as b:
+            data = a.read()
+            assert data == b.read(), "buffered output differs"
+
+    print_table(("queries", "MB", "answer s", "per-answer write s", "buffered write s"),
+                [(len(queries), f"{len(data) / 2**20:.1f}", f"{answer_s:.2f}",
+                  f"{original_s:.3f}", f"{buffered_s:.3f}")])
+    print()
+
+    items = sorted(f"B{i}" for i in range(args.wrap))
+    expected, concat_s, _ = measure(_wrap_list_concat, items, trace_memory=False)
+    text, parts_s, _ = measure(wrap_list, items, trace_memory=False)
+    assert text == expected, "wrap_list output differs"
+    print_table(("wrap_list items", "concat s", "joined s"),
+                [(len(items), f"{concat_s:.3f}", f"{parts_s:.3f}")])
+
+
+def _percentil(ordenadas, p):
+    return ordenadas[min(len(ordenadas) - 1, len(ordenadas) * p // 100)]
+
+
+async def _clientes(socket_path, lines, clients):
+    """Sends lines over clients connections, one query at a time each; returns latencies."""
+    latencias = []
+
+    async def cliente(parte):
+        reader, writer = await asyncio.open_unix_connection(socket_path, limit=1 << 24)
+        for line in parte:
+            start = time.perf_counter()
+            writer.write(line.encode("utf-8"))
+            response = json.loads(await reader.readline())
+            latencias.append(time.perf_counter() - start)
+            assert "respuesta" in response, response
+        writer.close()
+
+    await asyncio.gather(*(cliente(lines[i::clients]) for i in range(clients)))
+    return latencias
+
+
+def bench_server(args):
+    """Per-query latency of the resident server vs. a one-shot run.py batch."""
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    with tempfile.TemporaryDirectory() as tmp:
+        road_file = write_edge_file(grid_edges(args.vertices, weighted=True), tmp)
+        plain_file = write_edge_file(grid_edges(args.vertices), tmp)
+        road = load_weighted_graph(road_file)
+        queries_file = write_query_file(road, args.queries, args.origins, tmp)
+        with open(queries_file, encoding="utf-8") as file:
+            lines = file.readlines()
+
+        # One-shot CLI answering a single query: startup + load + answer
+        single = os.path.join(tmp, "single.txt")
+        with open(single, "w", encoding="utf-8") as file:
+            file.write(lines[0])
+        _, oneshot_s, _ = measure(subprocess.run, [
+            sys.executable, os.path.join(root, "run.py"), plain_file, road_file, plain_file,
+            single, os.path.join(tmp, "out.txt"), "--no-draw"],
+            cwd=root, check=True, stdout=subprocess.DEVNULL, trace_memory=False)
+
+        socket_path = os.path.join(tmp, "server.sock")
+        server = subprocess.Popen([sys.executable, "-m", "src.server", plain_file, road_file, plain_file,
+                                   "--socket", socket_path], cwd=root, stdout=subprocess.DEVNULL)
+        try:
+            while not os.path.exists(socket_path):
+                if server.poll() is not None:
+                    raise RuntimeError("server exited during startup")
+                time.sleep(0.01)
+
+            rows = []
+            for clients in args.clients:
+                latencias, elapsed, _ = measure(asyncio.run, _clientes(socket_path, lines, clients),
+                                                trace_memory=False)
+                latencias.sort()
+                rows.append((clients, len(latencias), f"{len(latencias) / elapsed:,.0f}",
+                             f"{_percentil(latencias, 50) * 1000:.2f}",
+                             f"{_percentil(latencias, 95) * 1000:.2f}",
+                             f"{_percentil(latencias, 99) * 1000:.2f}"))
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f"one-shot run.py, 1 query: {oneshot_s * 1000:.0f} ms")
+    print_table(("clients", "queries", "queries/s", "p50 ms", "p95 ms", "p99 ms"), rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest="benchmark", required=True)
+
+    p = sub.add_parser("storage", help="graph storage load time and memory")
+    p.add_argument("--sizes", type=int, nargs="+", default=[500, 2000, 20000])
+    p.add_argument("--weighted", action="store_true")
+    p.add_argument("--matrix-max", type=int, default=2000,
+                   help="skip the dense matrix storage above this many vertices")
+    p.set_defaults(run=bench_storage)
+
+    p = sub.add_parser("load", help="streaming loader throughput")
+    p.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    p.set_defaults(run=bench_load)
+
+    p = sub.add_parser("snapshot", help="binary snapshot startup vs. text parse")
+    p.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    p.set_defaults(run=bench_snapshot)
+
+    p = sub.add_parser("dijkstra", help="heap vs. linear-scan Dijkstra scaling")
+    p.add_argument("--sizes", type=int, nargs="+",
+                   default=[100, 1000, 10000, 100000, 1000000])
+    p.add_argument("--legacy-max", type=int, default=10000,
+                   help="skip the O(V^2) linear scan above this many vertices")
+    p.set_defaults(run=bench_dijkstra)
+
+    p = sub.add_parser("search", help="bidirectional and A* point-to-point searches")
+    p.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    p.add_argument("--pairs", type=int, default=50,
+                   help="random origin/destination pairs per size")
+    p.set_defaults(run=bench_search)
+
+    p = sub.add_parser("ch", help="contraction hierarchy preprocessing and queries")
+    p.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 40000])
+    p.add_argument("--pairs", type=int, default=200,
+                   help="random origin/destination pairs per size")
+    p.set_defaults(run=bench_ch)
+
+    p = sub.add_parser("corte", help="blocked-node path simulations")
+    p.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    p.add_argument("--closures", type=int, default=500)
+    p.add_argument("--origins", type=int, default=20,
+                   help="distinct origins among the simulations")
+    p.add_argument("--blocked", type=int, default=3, help="barrios closed per simulation")
+    p.set_defaults(run=bench_corte)
+
+    p = sub.add_parser("backend", help="NumPy/SciPy backend parity and speed")
+    p.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    p.add_argument("--plants", type=int, default=10, help="plants for PLANTAS_ASIGNADAS")
+    p.set_defaults(run=bench_backend)
+
+    p = sub.add_parser("plantas", help="PLANTAS_ASIGNADAS with many candidate plants")
+    p.add_argument("--sizes", type=int, nargs="+", default=[100000])
+    p.add_argument("--plants", type=int, nargs="+", default=[10, 1000, 5000])
+    p.set_defaults(run=bench_plantas)
+
+    p = sub.add_parser("ubicacion", help="k-center/k-median plant placement")
+    p.add_argument("--sizes", type=int, nargs="+", default=[2500, 10000])
+    p.add_argument("--candidates", type=int, default=200, help="candidate barrios")
+    p.add_argument("--k", type=int, nargs="+", default=[5, 20])
+    p.set_defaults(run=bench_ubicacion)
+
+    p = sub.add_parser("recoleccion", help="garbage-collection route engine")
+    p.add_argument("--sizes", type=int, nargs="+", default=[2500, 10000])
+    p.set_defaults(run=bench_recoleccion)
+
+    p = sub.add_parser("calles", help="street coverage closed walk (Chinese postman)")
+    p.add_argument("--sizes", type=int, nargs="+", default=[2500, 10000])
+    p.add_argument("--removed", type=float, default=0.15, help="share of streets removed")
+    p.set_defaults(run=bench_calles)
+
+    p = sub.add_parser("fallos", help="ORDEN_FALLOS degree index and TOP k")
+    p.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    p.add_argument("--top", type=int, default=300)
+    p.set_defaults(run=bench_fallos)
+
+    p = sub.add_parser("output", help="answer writing and wrap_list")
+    p.add_argument("--vertices", type=int, default=2500)
+    p.add_argument("--queries", type=int, default=100000)
+    p.add_argument("--origins", type=int, default=200,
+                   help="distinct CAMINO_MINIMO origins")
+    p.add_argument("--wrap", type=int, default=1000000, help="items for wrap_list")
+    p.set_defaults(run=bench_output)
+
+    p = sub.add_parser("server", help="resident query server latency with concurrent clients")
+    p.add_argument("--vertices", type=int, default=10000)
+    p.add_argument("--queries", type=int, default=2000)
+    p.add_argument("--origins", type=int, default=200,
+                   help="distinct CAMINO_MINIMO origins")
+    p.add_argument("--clients", type=int, nargs="+", default=[1, 4, 16])
+    p.set_defaults(run=bench_server)
+
+    p = sub.add_parser("tarjan", help="iterative bridges/articulation points on paths")
+    p.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000, 1000000])
+    p.set_defaults(run=bench_tarjan)
+
+    p = sub.add_parser("workers", help="parallel query execution speedup")
+    p.add_argument("--vertices", type=int, default=5000)
+    p.add_argument("--queries", type=int, default=10000)
+    p.add_argument("--origins", type=int, default=500,
+                   help="distinct origins among the CAMINO_MINIMO queries")
+    p.add_argument("--workers", type=int, nargs="+", default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    p.set_defaults(run=bench_workers)
+
+    args = parser.parse_args()
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,358 @@
+"""
+Long-running query server.
+
+The three networks are loaded once and kept in memory, so every query
+skips interpreter startup, graph loading and the .dot drawings of a
+run.py batch. Clients connect over a Unix socket or localhost TCP and
+send queries one per line, in the query-file syntax. Each query gets one
+response, in order, with its latency:
+
+    {"id": 3, "comando": "CAMINO_MINIMO", "ms": 0.21, "respuesta": ...}
+
+"respuesta" is the formatted text block (format "text") or the record of
+src.records ("jsonl" and "msgpack"). Responses are JSON lines, or
+MessagePack values with the msgpack format. A query that fails gets
+"error" with the exception, and as "respuesta" the same ERROR answer an
+unknown command gets in a query file; so does a line that is not UTF-8 or
+longer than LINE_LIMIT. The connection stays open either way. The server
+command METRICAS answers with the latency summary per command.
+
+Any number of clients can be connected. Queries run one at a time on a
+single engine thread, in arrival order, so mutations (AGREGAR_ARISTA,
+QUITAR_ARISTA, QUITAR_NODO) are seen by every query that arrives after
+them, whichever client sent it.
+
+With --watch the three graph files are polled and, once a change has
+settled, a new engine is loaded on a background thread and swapped in
+with the next version number (in every response as "version"). A query
+already running finishes on the engine it started with, whose caches go
+away with it; mutations made on the old version are not carried over.
+
+Usage:
+    uv run serve <electric_file> <road_file> <water_file> --socket /tmp/grafos.sock
+    uv run serve <electric_file> <road_file> <water_file> --port 8765 --watch 2
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from src.main import load_coordinates, load_graph, load_hierarchy, load_weighted_graph
+from src.queries import BUSQUEDAS, QueryEngine, parse_query
+from src.watcher import FileWatcher
+from src.writer import ENCODERS, FORMATS
+
+# Server-side command, answered without touching the engine
+METRICAS = "METRICAS"
+
+# Latencies kept per command for the percentiles
+MUESTRAS = 10000
+
+# Longest query line accepted (long CAMINO_MINIMO_SIMULAR_CORTE closures)
+LINE_LIMIT = 1 << 20
+
+class LatencyMetrics:
+    """Query count and latency percentiles per command."""
+
+    def __init__(self, muestras=MUESTRAS):
+        self.muestras = muestras
+        self.total = {}  # comando -> queries answered
+        self.latencias = {}  # comando -> last latencies, in seconds
+
+    def add(self, comando, segundos) -> None:
+        self.total[comando] = self.total.get(comando, 0) + 1
+        latencias = self.latencias.get(comando)
+        if latencias is None:
+            latencias = self.latencias[comando] = deque(maxlen=self.muestras)
+        latencias.append(segundos)
+
+    def resumen(self) -> dict:
+        """{comando: {"consultas", "p50_ms", "p95_ms", "p99_ms", "max_ms"}}"""
+        resumen = {}
+        for comando in sorted(self.total):
+            ordenadas = sorted(self.latencias[comando])
+            n = len(ordenadas)
+            resumen[comando] = {
+                "consultas": self.total[comando],
+                "p50_ms": _ms(ordenadas[(n - 1) // 2]),
+                "p95_ms": _ms(ordenadas[min(n - 1, n * 95 // 100)]),
+                "p99_ms": _ms(ordenadas[min(n - 1, n * 99 // 100)]),
+                "max_ms": _ms(ordenadas[-1]),
+            }
+        return resumen
+
+
+def _ms(segundos):
+    return round(segundos * 1000, 3)
+
+
+async def _leer_linea(reader):
+    """
+    Next line of a client (b"" at end of stream). A line longer than the
+    reader limit is dropped whole and raises ValueError, so the next read
+    starts at the following line.
+    """
+    try:
+        return await reader.readuntil(b"\n")
+    except asyncio.IncompleteReadError as exc:
+        return exc.partial  # last line without a newline
+    except asyncio.LimitOverrunError:
+        pass
+
+    while True:
+        try:
+            await reader.readuntil(b"\n")
+            break
+        except asyncio.LimitOverrunError as exc:
+            await reader.readexactly(exc.consumed)
+        except asyncio.IncompleteReadError:
+            break
+    raise ValueError(f"query line longer than {LINE_LIMIT} bytes")
+
+
+class QueryServer:
+    """
+    Answers query lines from any number of connections with one engine.
+
+    Args:
+        engine: QueryEngine over the loaded networks (records=True for the
+            jsonl and msgpack formats)
+        formato: Response format, one of FORMATS
+        loader: Callable returning a new QueryEngine from the graph files,
+            used to reload them
+        paths: Graph files whose changes trigger a reload
+    """
+
+    def __init__(self, engine, formato="text", loader=None, paths=()):
+        if formato not in FORMATS:
+            raise ValueError(f"Unknown output format: {formato!r}")
+        self.formato = formato
+        # Text answers travel inside JSON lines too
+        self._encode = ENCODERS["msgpack" if formato == "msgpack" else "jsonl"]
+        self.metrics = LatencyMetrics()
+        self.conexiones = 0
+
+        # The engine and its caches are not thread-safe: one thread runs
+        # every query, which also keeps mutations in arrival order
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="engine")
+
+        # Engine and version are swapped together as one tuple, so a query
+        # always reads a matching pair
+        self._actual = (engine, 1)
+        self.loader = loader
+        self.paths = list(paths)
+        self.recargas = 0
+        self._cargador = ThreadPoolExecutor(max_workers=1, thread_name_prefix="reload")
+
+    @property
+    def engine(self):
+        return self._actual[0]
+
+    @property
+    def version(self):
+        return self._actual[1]
+
+    def answer(self, query):
+        """
+        Answers one parsed query (same answer as in a query file).
+
+        Returns:
+            (answer, version of the networks that answered it)
+        """
+        engine, version = self._actual
+        outputs, _ = engine.answer([query])
+        return outputs[0], version
+
+    async def reload(self) -> int:
+        """
+        Loads a new engine with the loader, off the engine thread, and swaps
+        it in. Queries keep being answered by the current version meanwhile.
+
+        Returns:
+            The new version number
+        """
+        loop = asyncio.get_running_loop()
+        engine = await loop.run_in_executor(self._cargador, self.loader)
+        self._actual = (engine, self.version + 1)
+        self.recargas += 1
+        return self.version
+
+    async def watch(self, interval) -> None:
+        """Reloads whenever the graph files change, polling every interval seconds."""
+        watcher = FileWatcher(self.paths)
+        while True:
+            await asyncio.sleep(interval)
+            if not watcher.poll():
+                continue
+            start = time.perf_counter()
+            try:
+                version = await self.reload()
+            except Exception as exc:  # a bad file keeps the current version
+                print(f"  ✗ Reload failed, still serving version {self.version}: "
+                      f"{type(exc).__name__}: {exc}", flush=True)
+            else:
+                print(f"  → Graph files changed: version {version} loaded in "
+                      f"{time.perf_counter() - start:.3f}s", flush=True)
+
+    async def handle(self, reader, writer):
+        """Serves one connection until the client closes it."""
+        loop = asyncio.get_running_loop()
+        self.conexiones += 1
+        numero = 0
+        try:
+            while True:
+                inicio = None
+                line = ""
+                comando = "ERROR"
+                try:
+                    data = await _leer_linea(reader)
+                    if not data:
+                        break
+                    inicio = time.perf_counter()
+                    line = data.decode("utf-8").strip()
+
+                    if line.upper() == METRICAS:
+                        comando, respuesta = METRICAS, self.metrics.resumen()
+                        version = self.version
+                    else:
+                        query = parse_query(line)
+                        if query is None:
+                            continue
+                        comando = query[0]
+                        respuesta, version = await loop.run_in_executor(self._executor, self.answer,
+                                                                        query)
+                    error = None
+                except (ConnectionResetError, BrokenPipeError):
+                    raise
+                except Exception as exc:  # a bad line or query must not end the session
+                    if inicio is None:
+                        inicio = time.perf_counter()
+                    respuesta, version = self.engine.error(line), self.version
+                    error = f"{type(exc).__name__}: {exc}"
+
+                numero += 1
+                segundos = time.perf_counter() - inicio
+                if comando != METRICAS:
+                    self.metrics.add(comando, segundos)
+
+                response = {"id": numero, "comando": comando, "version": version,
+                            "ms": _ms(segundos), "respuesta": respuesta}
+                if error is not None:
+                    response["error"] = error
+                writer.write(self._encode(response))
+                await writer.drain()
+        except (ConnectionResetError, BrokenPipeError):
+            pass
+        except asyncio.CancelledError:  # server shutting down with the client still connected
+            pass
+        finally:
+            self.conexiones -= 1
+            writer.close()
+
+    async def serve(self, socket_path=None, host="127.0.0.1", port=8765, ready=None, watch=None):
+        """
+        Listens on socket_path (Unix socket) or host:port until cancelled.
+        ready, if given, is called with the listening address. With watch
+        (seconds) the graph files are polled for reloads.
+        """
+        if socket_path is not None:
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+            server = await asyncio.start_unix_server(self.handle, socket_path, limit=LINE_LIMIT)
+            address = socket_path
+        else:
+            server = await asyncio.start_server(self.handle, host, port, limit=LINE_LIMIT)
+            address = "{}:{}".format(*server.sockets[0].getsockname()[:2])
+
+        watcher = None
+        if watch and self.loader is not None:
+            watcher = asyncio.ensure_future(self.watch(watch))
+
+        if ready is not None:
+            ready(address)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+            if socket_path is not None and os.path.exists(socket_path):
+                os.unlink(socket_path)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        self._cargador.shutdown(wait=True)
+
+
+# ===============================================================
+# ENTRY POINT
+# ===============================================================
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Query server with the networks kept in memory")
+    parser.add_argument("electric_file")
+    parser.add_argument("road_file")
+    parser.add_argument("water_file")
+    listen = parser.add_mutually_exclusive_group()
+    listen.add_argument("--socket", metavar="PATH", help="Listen on a Unix socket")
+    listen.add_argument("--port", type=int, default=8765,
+                        help="Listen on localhost TCP (default: 8765)")
+    parser.add_argument("--host", default="127.0.0.1", help="TCP address (default: 127.0.0.1)")
+    parser.add_argument("--format", choices=FORMATS, default="text",
+                        help="Answers as text blocks (default), or jsonl/msgpack records")
+    parser.add_argument("--snapshot", action="store_true",
+                        help="Load graphs from binary snapshots next to the text files")
+    parser.add_argument("--precompute", action="store_true",
+                        help="Precompute all-pairs road distances before serving")
+    parser.add_argument("--search", choices=[b.lower() for b in BUSQUEDAS], default="dijkstra",
+                        help="Default CAMINO_MINIMO search strategy (default: dijkstra)")
+    parser.add_argument("--coords", metavar="FILE",
+                        help="Barrio coordinates (BARRIO X Y per line) for the a_estrella heuristic")
+    parser.add_argument("--backend", choices=["auto", "python", "numpy"], default="auto",
+                        help="Algorithm backend (default: auto)")
+    parser.add_argument("--watch", type=float, nargs="?", const=1.0, metavar="SECONDS",
+                        help="Reload the graph files when they change, polling every SECONDS "
+                             "(default: 1)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    coordenadas = load_coordinates(args.coords) if args.coords else None
+    paths = [args.electric_file, args.road_file, args.water_file]
+
+    def load_engine():
+        electric = load_graph(args.electric_file, snapshot=args.snapshot)
+        road = load_weighted_graph(args.road_file, snapshot=args.snapshot)
+        water = load_graph(args.water_file, snapshot=args.snapshot)
+        hierarchy = load_hierarchy(args.road_file, road) if args.search == "ch" else None
+        return QueryEngine(electric, road, water, precompute=args.precompute,
+                           busqueda=args.search.upper(), coordenadas=coordenadas,
+                           jerarquia=hierarchy, backend=args.backend,
+                           records=args.format != "text")
+
+    start = time.perf_counter()
+    server = QueryServer(load_engine(), args.format, loader=load_engine, paths=paths)
+    print(f"  → Networks loaded in {time.perf_counter() - start:.3f}s")
+
+    def ready(address):
+        watching = f", reloading changed files every {args.watch:g}s" if args.watch else ""
+        print(f"✓ Serving queries on {address} ({args.format}{watching}); Ctrl+C to stop", flush=True)
+
+    try:
+        asyncio.run(server.serve(args.socket, args.host, args.port, ready=ready, watch=args.watch))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        for comando, stats in server.metrics.resumen().items():
+            print(f"  {comando}: {stats['consultas']} consultas, p50 {stats['p50_ms']} ms, "
+                  f"p95 {stats['p95_ms']} ms, max {stats['max_ms']} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+"""
+Water plant placement for UBICAR_PLANTAS.
+
+Chooses k plant locations among candidate barrios so that every barrio is
+close (in BFS hops) to its nearest plant, either minimizing the largest
+distance (k-center, CENTRO) or the total distance (k-median, MEDIANA).
+Both problems are NP-hard; the placement is a greedy construction followed
+by swap local search, the usual heuristics for them.
+
+The hop distances of every candidate are computed once (one BFS per
+candidate, cached across queries). The search reads every candidate row
+at every step, so the rows are kept in memory and their number is capped
+by MAX_CELDAS: without a candidate list, a large network is searched over
+its best-connected barrios only. During the search every barrio keeps
+its distance to the nearest and second nearest chosen plant, so a swap
+(remove plant i, add candidate c) is evaluated in O(V) without looking at
+the other k - 1 plants: barrios served by i fall back to their second
+plant, the rest keep the first, and then take c if it is closer.
+"""
+
+from src.algos import distancia_bfs
+from src.numpy_backend import NumpyGraph
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+CRITERIOS = ("CENTRO", "MEDIANA")
+
+# Full passes of swap local search before settling for the current placement
+MAX_PASADAS = 10
+
+# Distance cells (candidates x barrios) kept for one search
+MAX_CELDAS = 4_000_000
+
+
+def max_candidatas(n):
+    """Candidates whose distance rows fit in MAX_CELDAS for a network of n barrios."""
+    return max(1, MAX_CELDAS // max(n, 1))
+
+
+class UbicadorPlantas:
+    """
+    Plant placement over the water network.
+
+    Args:
+        g: Unweighted adjacency dict {barrio: [vecinos]}
+        numpy_graph: NumpyGraph of g to run the BFS and the candidate
+            evaluations as arrays (pure Python when None). Both give the
+            same placement.
+    """
+
+    def __init__(self, g: dict, numpy_graph: NumpyGraph | None = None):
+        self.g = g
+        self.names = list(g)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.numpy_graph = numpy_graph
+
+        # Stand-in distance for unreachable barrios, larger than any real one
+        self.lejos = len(self.names)
+
+        self._filas = {}  # candidate -> hop distances to every barrio, by id
+        self._por_grado = None  # default candidates of a large network
+
+    def _candidatas(self, limite):
+        """Every barrio, or the limite of highest degree (ties by name) when they do not fit."""
+        if len(self.names) <= limite:
+            return sorted(self.names)
+        if self._por_grado is None or len(self._por_grado) != limite:
+            por_grado = sorted(self.names, key=lambda v: (-len(self.g[v]), v))
+            self._por_grado = sorted(por_grado[:limite])
+        return self._por_grado
+
+    def _distancias(self, candidatas, stats=None):
+        """Distance rows of the candidates, running a BFS only for the new ones."""
+        if len(self._filas) + len(candidatas) > max_candidatas(len(self.names)):
+            # Keep the cache within MAX_CELDAS: only rows this search uses
+            self._filas = {c: self._filas[c] for c in candidatas if c in self._filas}
+        faltan = [c for c in candidatas if c not in self._filas]
+
+        if faltan and self.numpy_graph is not None:
+            ids = [self.index[c] for c in faltan]
+            for c, fila in zip(faltan, self.numpy_graph.matriz_bfs(ids, self.lejos)):
+                self._filas[c] = fila
+                if stats is not None:
+                    niveles = np.bincount(fila[fila < self.lejos])
+                    stats.setdefault("fronteras", []).extend(niveles[niveles > 0].tolist())
+        else:
+            for c in faltan:
+                dist = distancia_bfs(self.g, c, stats)
+                self._filas[c] = [
+                    d if d != float("inf") else self.lejos
+                    for d in map(dist.__getitem__, self.names)
+                ]
+
+        filas = [self._filas[c] for c in candidatas]
+        if self.numpy_graph is not None:
+            return np.stack(filas) if filas else np.zeros((0, len(self.names)), dtype=np.int32)
+        return filas
+
+    def ubicar(self, k, criterio="MEDIANA", candidatas=None, stats=None):
+        """
+        Chooses k plants among candidatas. By default every barrio is a
+        candidate, or only the max_candidatas of highest degree in a network
+        too large for all of them. If a stats dict is given, the level sizes
+        of the BFS runs it needed are appended to its "fronteras" list.
+
+        Returns:
+            dict with the chosen "plantas" (sorted), "criterio", "k",
+            "candidatas" (how many were evaluated), "limitadas" (whether the
+            default candidates were capped), "distancia_maxima" and
+            "distancia_total" over the covered barrios, "sin_cobertura"
+            (barrios no plant reaches) and "intercambios" (swaps applied)
+
+        Raises:
+            KeyError: for an unknown candidate
+            ValueError: for more candidates than max_candidatas
+        """
+        if criterio not in CRITERIOS:
+            raise ValueError(f"Unknown placement criterion: {criterio!r}")
+
+        limite = max_candidatas(len(self.names))
+        if candidatas:
+            candidatas = sorted(set(candidatas))
+            for c in candidatas:
+                if c not in self.index:
+                    raise KeyError(c)
+            if len(candidatas) > limite:
+                raise ValueError(f"{len(candidatas)} candidates, at most {limite} for "
+                                 f"{len(self.names)} barrios")
+            limitadas = False
+        else:
+            candidatas = self._candidatas(limite)
+            limitadas = len(candidatas) < len(self.names)
+        k = max(0, min(k, len(candidatas)))
+
+        filas = self._distancias(candidatas, stats)
+        if self.numpy_graph is not None:
+            elegidas, intercambios = _buscar_numpy(filas, k, criterio, self.lejos)
+            cercana = filas[elegidas].min(axis=0).tolist() if elegidas else []
+        else:
+            elegidas, intercambios = _buscar(filas, k, criterio, self.lejos)
+            cercana = [min(col) for col in zip(*(filas[i] for i in elegidas))] if elegidas else []
+
+        cubiertas = [d for d in cercana if d < self.lejos]
+        return {
+            "plantas": sorted(candidatas[i] for i in elegidas),
+            "criterio": criterio,
+            "k": k,
+            "candidatas": len(candidatas),
+            "limitadas": limitadas,
+            "distancia_maxima": max(cubiertas, default=0),
+            "distancia_total": sum(cubiertas),
+            "sin_cobertura": len(self.names) - len(cubiertas) if elegidas else len(self.names),
+            "intercambios": intercambios,
+        }
+
+
+# ===============================================================
+# PURE PYTHON SEARCH
+# ===============================================================
+
+def _clave(dist, criterio):
+    """Objective to minimize: (max, total) for CENTRO, total for MEDIANA."""
+    if criterio == "CENTRO":
+        return max(dist), sum(dist)
+    return sum(dist)
+
+
+def _buscar(filas, k, criterio, lejos):
+    """Greedy + swap local search over distance rows; returns (chosen rows, swaps)."""
+    n = len(filas[0]) if filas else 0
+    elegidas = []
+    cercana = [lejos] * n
+
+    # Greedy: add the candidate that best improves the objective
+    for _ in range(k):
+        mejor, mejor_clave = None, None
+        for c, fila in enumerate(filas):
+            if c in elegidas:
+                continue
+            clave = _clave(list(map(min, cercana, fila)), criterio)
+            if mejor_clave is None or clave < mejor_clave:
+                mejor, mejor_clave = c, clave
+        elegidas.append(mejor)
+        cercana = list(map(min, cercana, filas[mejor]))
+
+    # Swap local search with first/second nearest plant per barrio
+    intercambios = 0
+    actual = _clave(cercana, criterio) if elegidas else None
+    for _ in range(MAX_PASADAS):
+        mejoro = False
+        for pos in range(len(elegidas)):
+            d1, quien, d2 = _dos_cercanas(filas, elegidas, lejos, n)
+            sin_pos = [b if q == pos else a for a, q, b in zip(d1, quien, d2)]
+
+            mejor, mejor_clave = None, actual
+            for c, fila in enumerate(filas):
+                if c in elegidas:
+                    continue
+                clave = _clave(list(map(min, sin_pos, fila)), criterio)
+                if clave < mejor_clave:
+                    mejor, mejor_clave = c, clave
+
+            if mejor is not None:
+                elegidas[pos] = mejor
+                actual = mejor_clave
+                intercambios += 1
+                mejoro = True
+        if not mejoro:
+            break
+
+    return elegidas, intercambios
+
+
+def _dos_cercanas(filas, elegidas, lejos, n):
+    """Per barrio: distance to the nearest chosen plant, its position, and the second distance."""
+    d1 = [lejos] * n
+    quien = [-1] * n
+    d2 = [lejos] * n
+    for pos, c in enumerate(elegidas):
+        for v, d in enumerate(filas[c]):
+            if d < d1[v]:
+                d2[v] = d1[v]
+                d1[v], quien[v] = d, pos
+            elif d < d2[v]:
+                d2[v] = d
+    return d1, quien, d2
+
+
+# ===============================================================
+# NUMPY SEARCH
+# ===============================================================
+
+def _claves_numpy(dist, criterio, lejos):
+    """
+    Objective of every row of dist as one int64 per row, ordered like
+    _clave: for CENTRO the maximum is scaled above any possible total.
+    """
+    total = dist.sum(axis=1, dtype=np.int64)
+    if criterio == "CENTRO":
+        return dist.max(axis=1).astype(np.int64) * (dist.shape[1] * (lejos + 1) + 1) + total
+    return total
+
+
+def _mejor_numpy(claves, excluidas):
+    """Position of the smallest key (first on ties), skipping excluded rows."""
+    claves = claves.copy()
+    claves[excluidas] = np.iinfo(np.int64).max
+    return int(np.argmin(claves)), int(claves.min())
+
+
+def _buscar_numpy(filas, k, criterio, lejos):
+    """Same search as _buscar, evaluating all candidates at once."""
+    n = filas.shape[1]
+    elegidas = []
+    cercana = np.full(n, lejos, dtype=np.int32)
+
+    for _ in range(k):
+        claves = _claves_numpy(np.minimum(cercana, filas), criterio, lejos)
+        mejor, _ = _mejor_numpy(claves, elegidas)
+        elegidas.append(mejor)
+        cercana = np.minimum(cercana, filas[mejor])
+
+    intercambios = 0
+    if not elegidas:
+        return elegidas, intercambios
+
+    actual = int(_claves_numpy(cercana[None, :], criterio, lejos)[0])
+    for _ in range(MAX_PASADAS):
+        mejoro = False
+        for pos in range(len(elegidas)):
+            elegidas_filas = filas[elegidas]
+            if len(elegidas) > 1:
+                orden = np.argsort(elegidas_filas, axis=0, kind="stable")
+                columnas = np.arange(n)
+                d1 = elegidas_filas[orden[0], columnas]
+                d2 = elegidas_filas[orden[1], columnas]
+                sin_pos = np.where(orden[0] == pos, d2, d1)
+            else:
+                sin_pos = np.full(n, lejos, dtype=np.int32)
+
+            claves = _claves_numpy(np.minimum(sin_pos, filas), criterio, lejos)
+            mejor, clave = _mejor_numpy(claves, elegidas)
+            if clave < actual:
+                elegidas[pos] = mejor
+                actual = clave
+                intercambios += 1
+                mejoro = True
+        if not mejoro:
+            break
+
+    return elegidas, intercambios
@@ -0,0 +1,49 @@
+"""
+Change detection for the graph source files.
+
+Files are polled by (mtime, size) signature rather than through OS
+notifications, which keeps it dependency-free and portable. A change is
+reported only once the signatures hold still for a whole poll interval,
+so a file that is still being written is not loaded half-way.
+"""
+
+import os
+
+
+class FileWatcher:
+    """
+    Args:
+        paths: Files to watch
+    """
+
+    def __init__(self, paths):
+        self.paths = list(paths)
+        self.firmas = self._firmas()
+        self._pendiente = None  # signatures seen changed, waiting to settle
+
+    def _firmas(self):
+        firmas = []
+        for path in self.paths:
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:  # mid-replace, or removed
+                firmas.append(None)
+            else:
+                firmas.append((st.st_mtime_ns, st.st_size))
+        return tuple(firmas)
+
+    def poll(self) -> bool:
+        """
+        Returns True once per settled change: the files differ from the last
+        accepted version and did not change since the previous poll.
+        """
+        actuales = self._firmas()
+        if actuales == self.firmas:
+            self._pendiente = None
+            return False
+        if actuales != self._pendiente or None in actuales:
+            self._pendiente = actuales
+            return False
+        self.firmas = actuales
+        self._pendiente = None
+        return True
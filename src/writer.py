@@ -0,0 +1,98 @@
+"""
+Buffered writers for the answers file.
+
+Answers are written one by one as the engine produces them, through the
+file's own buffer of BUFFER_SIZE bytes, so a run with hundreds of thousands
+of queries makes a few dozen write calls instead of one (or more) per answer
+and never holds every answer in memory. The text file is opened the way
+process_queries always opened it (UTF-8 text, default newlines), so the
+bytes on disk are the same. RecordWriter does the same for the
+machine-readable formats, encoding one record per query.
+"""
+
+import json
+
+from src.packing import pack
+
+# Output formats: the text report, JSON Lines, or concatenated MessagePack records
+FORMATS = ("text", "jsonl", "msgpack")
+
+# Bytes buffered before the file is written
+BUFFER_SIZE = 1 << 20
+
+
+class OutputWriter:
+    """
+    Args:
+        path: Output file, truncated on open
+        buffer_size: Bytes to buffer before writing
+    """
+
+    def __init__(self, path, buffer_size=BUFFER_SIZE):
+        self.buffer_size = buffer_size
+        self._file = self._open(path)
+
+        # Counter exposed for tuning
+        self.sections = 0
+
+    def _open(self, path):
+        return open(path, "w", encoding="utf-8", buffering=self.buffer_size)
+
+    def write(self, text) -> None:
+        """Writes one formatted section."""
+        self._file.write(text)
+        self.sections += 1
+
+    def write_all(self, texts) -> None:
+        """Writes every section of an iterable, in order, as it is produced."""
+        for text in texts:
+            self.write(text)
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class RecordWriter(OutputWriter):
+    """
+    Writes query records (dicts from src.records) as JSON Lines (one
+    compact UTF-8 JSON object per line) or as MessagePack values.
+
+    Args:
+        path: Output file, truncated on open
+        format: "jsonl" or "msgpack"
+        buffer_size: Bytes to buffer before writing
+    """
+
+    def __init__(self, path, format="jsonl", buffer_size=BUFFER_SIZE):
+        if format not in ENCODERS:
+            raise ValueError(f"Unknown record format: {format!r}")
+        self._encode = ENCODERS[format]
+        super().__init__(path, buffer_size)
+
+    def _open(self, path):
+        return open(path, "wb", buffering=self.buffer_size)
+
+    def write(self, record) -> None:
+        """Writes one record."""
+        super().write(self._encode(record))
+
+
+_json = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def _encode_json(record) -> bytes:
+    return (_json.encode(record) + "\n").encode("utf-8")
+
+
+# Record format -> encoder of one record to bytes
+ENCODERS = {"jsonl": _encode_json, "msgpack": pack}
@@ -0,0 +1,110 @@
+"""The NumPy/SciPy backend answers every query exactly like the Python one."""
+
+import copy
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("scipy")
+
+from src.main import load_graph, load_weighted_graph  # noqa: E402
+from src.queries import QueryEngine, parse_query  # noqa: E402
+
+RESOURCES = Path(__file__).resolve().parent.parent / "resources"
+
+# Two components, an isolated barrio, a self-loop and a parallel edge
+ELECTRICA = {
+    "A": ["B", "C"], "B": ["A", "C", "C"], "C": ["A", "B", "B", "C"],
+    "D": ["E"], "E": ["D", "F"], "F": ["E"],
+    "G": [],
+}
+
+# Zero and fractional minutes; A-B-D and A-C-D tie, E is only reachable at 0 minutes
+VIAL = {
+    "A": [("B", 1.5), ("C", 1)],
+    "B": [("A", 1.5), ("D", 0.5)],
+    "C": [("A", 1), ("D", 1)],
+    "D": [("B", 0.5), ("C", 1), ("E", 0), ("F", 2.25)],
+    "E": [("D", 0), ("F", 2.25)],
+    "F": [("D", 2.25), ("E", 2.25)],
+    "Z": [],
+}
+
+# A path with barrios halfway between two plants, and an unreachable one
+HIDRICA = {
+    "P1": ["X1"], "X1": ["P1", "X2"], "X2": ["X1", "X3"], "X3": ["X2", "P2"],
+    "P2": ["X3", "Y1"], "Y1": ["P2", "Y2"], "Y2": ["Y1"],
+    "Solo": [],
+}
+
+QUERIES = """
+COMPONENTES_CONEXOS ELECTRICA
+COMPONENTES_CONEXOS VIAL
+COMPONENTES_CONEXOS HIDRICA
+CONECTADOS ELECTRICA A C
+CONECTADOS ELECTRICA A G
+ORDEN_FALLOS ELECTRICA
+ORDEN_FALLOS HIDRICA TOP 3
+CAMINO_MINIMO A D
+CAMINO_MINIMO A E
+CAMINO_MINIMO E A
+CAMINO_MINIMO A F
+CAMINO_MINIMO A Z
+CAMINO_MINIMO_SIMULAR_CORTE {B} A E
+CAMINO_MINIMO_SIMULAR_CORTE {D} A F
+MATRIZ_DISTANCIAS
+PLANTAS_ASIGNADAS P1 P2
+PLANTAS_ASIGNADAS P2 P1
+PLANTAS_ASIGNADAS X2 Y2 Solo
+UBICAR_PLANTAS 2
+UBICAR_PLANTAS 2 CENTRO
+UBICAR_PLANTAS 1 MEDIANA P1 X3 Y2
+AGREGAR_ARISTA VIAL A E 0
+CAMINO_MINIMO A F
+AGREGAR_ARISTA ELECTRICA C D
+COMPONENTES_CONEXOS ELECTRICA
+QUITAR_NODO HIDRICA P2
+PLANTAS_ASIGNADAS P1 Y2
+"""
+
+
+def parse(text):
+    return [q for q in map(parse_query, text.splitlines()) if q is not None]
+
+
+def answers(backend, graphs, queries, records=False):
+    engine = QueryEngine(*copy.deepcopy(graphs), backend=backend, records=records)
+    outputs, _ = engine.answer(queries)
+    return outputs
+
+
+@pytest.mark.parametrize("records", [False, True], ids=["text", "records"])
+def test_small_networks(records):
+    graphs = (ELECTRICA, VIAL, HIDRICA)
+    queries = parse(QUERIES)
+    assert answers("numpy", graphs, queries, records) == answers("python", graphs, queries, records)
+
+
+def test_shortest_paths_with_zero_and_fractional_weights():
+    graphs = (ELECTRICA, VIAL, HIDRICA)
+    queries = parse("\n".join(f"CAMINO_MINIMO {a} {b}" for a in VIAL for b in VIAL))
+    python = answers("python", graphs, queries, records=True)
+    assert answers("numpy", graphs, queries, records=True) == python
+    assert python[queries.index(("CAMINO_MINIMO", ("A", "E", None)))]["distancia"] == 2
+
+
+@pytest.mark.parametrize("directory, electric, road, water, queries", [
+    ("ejemplo-48", "grafo_electrico_48.txt", "grafo_vial_48.txt", "grafo_hidrico_48.txt", "consultas.txt"),
+    ("ejemplo", "ejemplo_electrico.txt", "ejemplo_vial.txt", "ejemplo_hidrico.txt", "ejemplo_consultas.txt"),
+], ids=["ejemplo-48", "ejemplo"])
+def test_examples(directory, electric, road, water, queries):
+    base = RESOURCES / directory
+    graphs = (load_graph(base / electric), load_weighted_graph(base / road), load_graph(base / water))
+    names = sorted(graphs[2])
+    with open(base / queries, encoding="utf-8") as file:
+        parsed = [q for q in map(parse_query, file) if q is not None]
+    # Every barrio as a plant once, so every BFS tie-break is exercised
+    parsed += parse("\n".join(f"PLANTAS_ASIGNADAS {a} {b}" for a, b in zip(names, names[1:])))
+    parsed += parse("UBICAR_PLANTAS 3\nUBICAR_PLANTAS 4 CENTRO\nMATRIZ_DISTANCIAS")
+    assert answers("numpy", graphs, parsed) == answers("python", graphs, parsed)
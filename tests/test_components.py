@@ -0,0 +1,93 @@
+"""Incremental component and degree indexes of QueryEngine under random network changes."""
+
+import random
+
+import pytest
+
+from src.algos import componentes_conexos, orden_fallos
+from src.numpy_backend import HAVE_NUMPY
+from src.queries import QueryEngine, parse_query
+
+REDES = ("ELECTRICA", "VIAL", "HIDRICA")
+BACKENDS = [
+    "python",
+    pytest.param("numpy", marks=pytest.mark.skipif(not HAVE_NUMPY, reason="needs numpy and scipy")),
+]
+
+
+def random_networks(rng, names):
+    """The three networks as the loaders return them, plus a plain {u: {v}} model of each."""
+    graphs, modelos = [], {}
+    for red in REDES:
+        modelo = {}
+        for _ in range(len(names)):
+            u, v = rng.choice(names), rng.choice(names)
+            modelo.setdefault(u, set()).add(v)
+            modelo.setdefault(v, set()).add(u)
+        if red == "VIAL":
+            graphs.append({u: [(v, rng.randint(1, 5)) for v in sorted(vs)] for u, vs in modelo.items()})
+        else:
+            graphs.append({u: sorted(vs) for u, vs in modelo.items()})
+        modelos[red] = modelo
+    return graphs, modelos
+
+
+def random_change(rng, names, modelo, red):
+    """A mutation line, applied to the model the way the engine should apply it."""
+    u, v = rng.choice(names), rng.choice(names)
+    accion = rng.random()
+    if accion < 0.45:
+        modelo.setdefault(u, set()).add(v)
+        modelo.setdefault(v, set()).add(u)
+        return f"AGREGAR_ARISTA {red} {u} {v} {rng.randint(1, 9)}"
+    if accion < 0.85:
+        if v in modelo.get(u, ()):
+            for x, y in ((u, v), (v, u)):
+                modelo[x].discard(y)
+                if not modelo[x]:
+                    del modelo[x]
+        return f"QUITAR_ARISTA {red} {u} {v}"
+    for x in modelo.pop(u, ()):
+        if x != u:
+            modelo[x].discard(u)
+            if not modelo[x]:
+                del modelo[x]
+    return f"QUITAR_NODO {red} {u}"
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("seed", range(6))
+def test_indexes_match_full_recompute(backend, seed):
+    rng = random.Random(seed)
+    names = [f"B{i:02d}" for i in range(14)]
+    graphs, modelos = random_networks(rng, names)
+    engine = QueryEngine(*graphs, backend=backend, records=True)
+    pares = [(a, b) for a in names for b in names if a < b]
+
+    for _ in range(120):
+        red = rng.choice(REDES)
+        modelo = modelos[red]
+        linea = random_change(rng, names, modelo, red)
+        a, b = rng.choice(pares)
+        # The query after the change must already see it
+        engine.answer([parse_query(linea), parse_query(f"CONECTADOS {red} {a} {b}")])
+
+        g = engine.graphs[red]
+        vecinos = {u: {x[0] if red == "VIAL" else x for x in vs} for u, vs in g.items()}
+        assert vecinos == modelo, linea
+
+        comps = componentes_conexos(modelo)
+        assert engine.componentes[red].components() == comps, linea
+        componente = {v: i for i, comp in enumerate(comps) for v in comp}
+        consultas = [parse_query(f"CONECTADOS {red} {x} {y}") for x, y in pares]
+        respuestas, _ = engine.answer(consultas)
+        for (x, y), respuesta in zip(pares, respuestas):
+            esperado = x in componente and y in componente and componente[x] == componente[y]
+            assert respuesta["conectados"] == esperado, (linea, x, y)
+
+        assert engine.grados[red].orden_fallos() == orden_fallos(modelo), linea
+        grupos = {}
+        for v, grado in orden_fallos(modelo):
+            grupos.setdefault(grado, []).append(v)
+        (respuesta,), _ = engine.answer([parse_query(f"ORDEN_FALLOS {red}")])
+        assert [(grupo["grado"], grupo["nodos"]) for grupo in respuesta["grupos"]] == list(grupos.items())
@@ -0,0 +1,126 @@
+"""Contraction hierarchy queries and its .gch file, against plain Dijkstra."""
+
+import os
+import random
+
+import pytest
+
+from src.algos import dijkstra
+from src.contraction import ContractionHierarchy, hierarchy_path, read_hierarchy, write_hierarchy
+
+
+def random_road_graph(seed, n, extra, pesos):
+    """Weighted adjacency dict: a random forest plus extra edges, with some parallel edges."""
+    rng = random.Random(seed)
+    names = [f"B{i:03d}" for i in range(n)]
+    rng.shuffle(names)
+    gw = {name: [] for name in names}
+
+    def conectar(u, v):
+        w = rng.choice(pesos)
+        gw[u].append((v, w))
+        gw[v].append((u, w))
+
+    for i in range(1, n):
+        if rng.random() < 0.9:  # a few trees, so some pairs are unreachable
+            conectar(names[i], names[rng.randrange(i)])
+    for _ in range(extra):
+        u, v = rng.sample(names, 2)
+        conectar(u, v)
+    return gw
+
+
+def assert_valid_path(gw, camino, origen, destino, distancia):
+    assert camino[0] == origen and camino[-1] == destino
+    total = 0
+    for a, b in zip(camino, camino[1:]):
+        pesos = [w for v, w in gw[a] if v == b]
+        assert pesos, f"{a} - {b} is not a road"
+        total += min(pesos)
+    assert total == pytest.approx(distancia)
+
+
+@pytest.mark.parametrize("seed", range(12))
+@pytest.mark.parametrize("pesos", [(1, 2, 3, 5, 8), (0, 1, 2.5, 4, 7.25)], ids=["int", "zero-float"])
+def test_paths_match_dijkstra(seed, pesos):
+    gw = random_road_graph(seed, n=10 + 5 * seed, extra=2 * seed + 5, pesos=pesos)
+    ch = ContractionHierarchy.build(gw)
+    for origen in gw:
+        for destino in gw:
+            esperado, _ = dijkstra(gw, origen, destino)
+            distancia, camino = ch.camino(origen, destino)
+            assert distancia == pytest.approx(esperado)
+            if esperado == float("inf"):
+                assert camino == []
+            else:
+                assert_valid_path(gw, camino, origen, destino, distancia)
+
+
+def test_unknown_barrio():
+    ch = ContractionHierarchy.build({"A": [("B", 1)], "B": [("A", 1)]})
+    assert ch.camino("A", "Z") == (float("inf"), [])
+
+
+def write_source(path, gw):
+    with open(path, "w", encoding="utf-8") as file:
+        for u, vecinos in gw.items():
+            for v, w in vecinos:
+                if u < v:
+                    file.write(f"{u} {v} {w}\n")
+
+
+@pytest.mark.parametrize("pesos", [(1, 2, 3), (0.5, 1.25, 3)], ids=["int", "float"])
+def test_file_round_trip(tmp_path, pesos):
+    gw = random_road_graph(3, n=40, extra=30, pesos=pesos)
+    source = tmp_path / "vial.txt"
+    write_source(source, gw)
+
+    ch = ContractionHierarchy.build(gw)
+    assert write_hierarchy(ch, source) == hierarchy_path(source)
+    leida = read_hierarchy(source)
+
+    assert leida is not None
+    assert leida.names == ch.names
+    assert leida.rank == ch.rank
+    assert leida.up == ch.up
+    for origen in list(gw)[:10]:
+        for destino in gw:
+            assert leida.camino(origen, destino) == ch.camino(origen, destino)
+
+
+def test_file_rejected_when_source_changes(tmp_path):
+    gw = random_road_graph(5, n=20, extra=10, pesos=(1, 2, 3))
+    source = tmp_path / "vial.txt"
+    write_source(source, gw)
+    write_hierarchy(ContractionHierarchy.build(gw), source)
+    st = os.stat(source)
+
+    # Same bytes with a new mtime: the SHA-256 still matches
+    os.utime(source, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert read_hierarchy(source) is not None
+
+    # Same size, different bytes
+    data = bytearray(source.read_bytes())
+    data[-2] = ord("9") if data[-2] != ord("9") else ord("8")
+    source.write_bytes(bytes(data))
+    os.utime(source, ns=(st.st_atime_ns, st.st_mtime_ns + 2 * 10**9))
+    assert read_hierarchy(source) is None
+
+    # Different size
+    with open(source, "a", encoding="utf-8") as file:
+        file.write("Nuevo Otro 4\n")
+    assert read_hierarchy(source) is None
+
+
+def test_missing_and_corrupt_files(tmp_path):
+    gw = random_road_graph(7, n=15, extra=5, pesos=(1, 2))
+    source = tmp_path / "vial.txt"
+    write_source(source, gw)
+    assert read_hierarchy(source) is None
+
+    path = write_hierarchy(ContractionHierarchy.build(gw), source)
+    data = bytearray(open(path, "rb").read())
+    data[-1] ^= 0xFF
+    with open(path, "wb") as file:
+        file.write(data)
+    assert read_hierarchy(source) is None
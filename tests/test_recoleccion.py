@@ -0,0 +1,110 @@
+"""Street coverage walks (CAMINO_RECOLECCION_CALLES) of RutaRecoleccion."""
+
+import random
+from collections import Counter
+from functools import lru_cache
+
+import pytest
+
+import src.recoleccion as recoleccion
+from src.algos import dijkstra
+from src.recoleccion import RutaRecoleccion
+
+
+def random_road_graph(seed, n, extra):
+    """Connected weighted adjacency dict with zero and fractional minutes, no parallel edges."""
+    rng = random.Random(seed)
+    names = [f"B{i:02d}" for i in range(n)]
+    gw = {name: [] for name in names}
+    calles = set()
+
+    def conectar(u, v):
+        if u != v and (u, v) not in calles:
+            calles.update([(u, v), (v, u)])
+            w = rng.choice((0, 1, 2, 2.5, 4, 7))
+            gw[u].append((v, w))
+            gw[v].append((u, w))
+
+    for i in range(1, n):
+        conectar(names[i], names[rng.randrange(i)])
+    for _ in range(extra):
+        conectar(*rng.sample(names, 2))
+    return gw
+
+
+def min_matching(gw, impares):
+    """Brute-force minimum-cost perfect matching of impares by road distance."""
+    d = {(a, b): dijkstra(gw, a, b)[0] for a in impares for b in impares}
+
+    @lru_cache(maxsize=None)
+    def mejor(resto):
+        if not resto:
+            return 0
+        a, otros = resto[0], resto[1:]
+        return min(d[a, b] + mejor(otros[:i] + otros[i + 1:]) for i, b in enumerate(otros))
+
+    return mejor(tuple(impares))
+
+
+def assert_covers_every_street(gw, recorrido):
+    circuito = recorrido["circuito"]
+    inicio = min(u for u, vecinos in gw.items() if vecinos)
+    assert circuito[0] == circuito[-1] == inicio
+
+    usadas = Counter(frozenset(par) for par in zip(circuito, circuito[1:]))
+    calles = {frozenset((u, v)): w for u, vecinos in gw.items() for v, w in vecinos}
+    assert set(usadas) == set(calles)  # every street, and only streets
+
+    extra = {frozenset((u, v)): veces for u, v, veces in recorrido["repetidas"]}
+    for calle, veces in usadas.items():
+        assert veces == 1 + extra.get(calle, 0)
+
+    minutos = sum(calles[frozenset(par)] for par in zip(circuito, circuito[1:]))
+    assert minutos == pytest.approx(recorrido["minutos"])
+    assert recorrido["minutos_calles"] == pytest.approx(sum(calles.values()))
+
+
+@pytest.mark.parametrize("seed", range(25))
+def test_exact_walk_is_optimal(seed):
+    rng = random.Random(seed)
+    gw = random_road_graph(seed, n=rng.randint(4, 16), extra=rng.randint(0, 14))
+    impares = [u for u, vecinos in gw.items() if len(vecinos) % 2]
+
+    recorrido = RutaRecoleccion(gw).calles()
+
+    assert recorrido["impares"] == len(impares)
+    assert recorrido["exacto"]
+    assert_covers_every_street(gw, recorrido)
+    repetido = recorrido["minutos"] - recorrido["minutos_calles"]
+    assert repetido == pytest.approx(min_matching(gw, impares))
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_local_search_walk_is_valid(monkeypatch, seed):
+    monkeypatch.setattr(recoleccion, "MAX_IMPARES_EXACTO", 0)
+    gw = random_road_graph(100 + seed, n=30, extra=25)
+    impares = [u for u, vecinos in gw.items() if len(vecinos) % 2]
+
+    recorrido = RutaRecoleccion(gw).calles()
+
+    assert not recorrido["exacto"]
+    assert_covers_every_street(gw, recorrido)
+    repetido = recorrido["minutos"] - recorrido["minutos_calles"]
+    assert repetido >= min_matching(gw, impares) - 1e-9
+
+
+def test_eulerian_network_repeats_nothing():
+    gw = {
+        "A": [("B", 1), ("C", 2)],
+        "B": [("A", 1), ("C", 3)],
+        "C": [("A", 2), ("B", 3)],
+    }
+    recorrido = RutaRecoleccion(gw).calles()
+    assert recorrido["repetidas"] == []
+    assert recorrido["minutos"] == recorrido["minutos_calles"] == 6.0
+    assert_covers_every_street(gw, recorrido)
+
+
+def test_disconnected_network_has_no_walk():
+    gw = {"A": [("B", 1)], "B": [("A", 1)], "C": [("D", 1)], "D": [("C", 1)]}
+    assert RutaRecoleccion(gw).calles() is None
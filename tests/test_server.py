@@ -0,0 +1,123 @@
+"""Graph file watching and hot reload of the query server."""
+
+import asyncio
+import json
+import os
+import threading
+
+from src.main import load_graph, load_weighted_graph
+from src.queries import QueryEngine
+from src.server import QueryServer
+from src.watcher import FileWatcher
+
+INTERVALO = 0.05
+
+
+def write(path, text, mtime_ns=None):
+    path.write_text(text, encoding="utf-8")
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_watcher_reports_a_change_once_it_settles(tmp_path):
+    path = tmp_path / "vial.txt"
+    write(path, "A B 5\n", 10**18)
+    watcher = FileWatcher([path])
+    assert not watcher.poll()
+
+    write(path, "A B 9\nB C 1\n", 2 * 10**18)
+    assert not watcher.poll()  # changed since the last poll: may still be written
+    write(path, "A B 9\nB C 1\nC D 2\n", 3 * 10**18)
+    assert not watcher.poll()  # still moving
+    assert watcher.poll()  # held still for a whole interval
+    assert not watcher.poll()  # reported once
+
+
+def test_watcher_waits_for_a_replaced_file(tmp_path):
+    path = tmp_path / "vial.txt"
+    write(path, "A B 5\n", 10**18)
+    watcher = FileWatcher([path])
+
+    path.unlink()
+    assert not watcher.poll()
+    assert not watcher.poll()  # missing: never reported
+    write(path, "A B 7\n", 2 * 10**18)
+    assert not watcher.poll()
+    assert watcher.poll()
+
+
+def test_reload_swaps_engines_without_touching_running_queries(tmp_path):
+    electrica, vial, hidrica = (tmp_path / name for name in ("electrica.txt", "vial.txt", "hidrica.txt"))
+    write(electrica, "A B\n")
+    write(vial, "A B 5\nB C 1\n")
+    write(hidrica, "A B\n")
+
+    def loader():
+        return QueryEngine(load_graph(electrica), load_weighted_graph(vial), load_graph(hidrica),
+                           records=True)
+
+    server = QueryServer(loader(), formato="jsonl", loader=loader, paths=[electrica, vial, hidrica])
+
+    # The first query on the original engine blocks until released
+    empezada, liberar = threading.Event(), threading.Event()
+    original = server.engine
+    responder = original.answer
+
+    def answer_lento(queries, workers=1):
+        empezada.set()
+        liberar.wait(10)
+        return responder(queries, workers)
+
+    original.answer = answer_lento
+
+    async def escenario():
+        listo = asyncio.get_running_loop().create_future()
+        tarea = asyncio.ensure_future(server.serve(host="127.0.0.1", port=0, watch=INTERVALO,
+                                                   ready=listo.set_result))
+        host, port = (await listo).rsplit(":", 1)
+        reader, writer = await asyncio.open_connection(host, int(port))
+
+        async def consultar(line):
+            writer.write(line.encode("utf-8") + b"\n")
+            await writer.drain()
+            return json.loads(await reader.readline())
+
+        try:
+            en_curso = asyncio.ensure_future(consultar("CAMINO_MINIMO A C"))
+            while not empezada.is_set():
+                await asyncio.sleep(0.01)
+
+            # Rewrite the road file while that query is running
+            write(vial, "A B 10\nB C 1\n")
+            for _ in range(200):
+                if server.recargas:
+                    break
+                await asyncio.sleep(0.01)
+            assert server.recargas == 1
+            assert server.engine is not original
+
+            liberar.set()
+            viejo = await en_curso
+            assert viejo["version"] == 1
+            assert viejo["respuesta"]["distancia"] == 6
+
+            nuevo = await consultar("CAMINO_MINIMO A C")
+            assert nuevo["version"] == 2
+            assert nuevo["respuesta"]["distancia"] == 11
+
+            # Nothing else changed: no further reloads
+            await asyncio.sleep(10 * INTERVALO)
+            assert server.recargas == 1
+        finally:
+            liberar.set()
+            writer.close()
+            tarea.cancel()
+            try:
+                await tarea
+            except asyncio.CancelledError:
+                pass
+
+    try:
+        asyncio.run(escenario())
+    finally:
+        server.close()
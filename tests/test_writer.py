@@ -0,0 +1,79 @@
+"""Answer files written by process_queries and the writers in src.writer."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from src.main import load_graph, load_weighted_graph, process_queries
+from src.packing import unpack
+from src.writer import OutputWriter, RecordWriter
+
+RESOURCES = Path(__file__).resolve().parent.parent / "resources"
+
+# (directory, electric, road, water, queries); output.txt is the expected answers file
+EXAMPLES = [
+    ("ejemplo-48", "grafo_electrico_48.txt", "grafo_vial_48.txt", "grafo_hidrico_48.txt", "consultas.txt"),
+    ("ejemplo", "ejemplo_electrico.txt", "ejemplo_vial.txt", "ejemplo_hidrico.txt", "ejemplo_consultas.txt"),
+]
+
+
+def run_example(example, output, **kwargs):
+    directory, electric, road, water, queries = example
+    base = RESOURCES / directory
+    process_queries(base / queries, output, load_graph(base / electric),
+                    load_weighted_graph(base / road), load_graph(base / water), **kwargs)
+    return base / "output.txt"
+
+
+@pytest.mark.parametrize("example", EXAMPLES, ids=[e[0] for e in EXAMPLES])
+@pytest.mark.parametrize("workers", [1, 2])
+def test_text_output_matches_example(tmp_path, example, workers):
+    output = tmp_path / "output.txt"
+    expected = run_example(example, output, workers=workers)
+    assert output.read_bytes() == expected.read_bytes()
+
+
+@pytest.mark.parametrize("example", EXAMPLES, ids=[e[0] for e in EXAMPLES])
+def test_records_match_between_formats(tmp_path, example):
+    run_example(example, tmp_path / "output.jsonl", formato="jsonl")
+    run_example(example, tmp_path / "output.msgpack", formato="msgpack")
+    lines = (tmp_path / "output.jsonl").read_bytes().decode("utf-8").splitlines()
+    records = [json.loads(line) for line in lines]
+    assert records
+    assert list(unpack((tmp_path / "output.msgpack").read_bytes())) == records
+
+
+def test_small_buffer_writes_the_same_bytes(tmp_path):
+    sections = [f"Sección {i}: ñandú\n\n" * (i % 7) for i in range(500)]
+    with OutputWriter(tmp_path / "small.txt", buffer_size=16) as out:
+        out.write_all(sections)
+    with open(tmp_path / "plain.txt", "w", encoding="utf-8") as file:
+        for text in sections:
+            file.write(text)
+    assert (tmp_path / "small.txt").read_bytes() == (tmp_path / "plain.txt").read_bytes()
+    assert out.sections == len(sections)
+
+
+def test_write_all_consumes_sections_as_produced(tmp_path):
+    escritas = []
+
+    def sections():
+        for i in range(3):
+            # Every earlier section reached the writer before this one is produced
+            assert escritas == list(range(i))
+            yield f"{i}\n"
+
+    class Recorder(OutputWriter):
+        def write(self, text):
+            escritas.append(int(text))
+            super().write(text)
+
+    with Recorder(tmp_path / "out.txt") as out:
+        out.write_all(sections())
+    assert (tmp_path / "out.txt").read_text(encoding="utf-8") == "0\n1\n2\n"
+
+
+def test_record_writer_rejects_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        RecordWriter(tmp_path / "out.bin", "xml")